@@ -6,6 +6,8 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
+import contextlib
 import logging
 
 # Import configuration and logging
@@ -13,6 +15,10 @@ from .config import get_settings
 from .logging_config import setup_logging
 from .exceptions import APIException
 
+from crypto_tools.services import close_price_feed, close_summary_cache, get_coin_registry
+from crypto_tools.services.client import close_async_client, close_session
+from crypto_tools.services.registry import run_coin_list_refresher
+
 # Import routers
 from .routers import general, city_info, crypto, law
 
@@ -29,11 +35,21 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Debug mode: {settings.debug}")
+    coin_registry = get_coin_registry()
+    coin_registry.load()
+    coin_list_refresher = asyncio.create_task(run_coin_list_refresher(coin_registry))
     
     yield
     
     # Shutdown
     logger.info("Shutting down application")
+    coin_list_refresher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await coin_list_refresher
+    await close_price_feed()
+    close_summary_cache()
+    close_session()
+    await close_async_client()
 
 
 # Get settings
@@ -1,6 +1,6 @@
 """Response models for API endpoints."""
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from pydantic import BaseModel, Field
 
 
@@ -55,6 +55,34 @@ class QueryRequest(BaseModel):
     query: str = Field(..., description="The query to send to the agent", min_length=1, max_length=1000)
 
 
+class PredictBatchRequest(BaseModel):
+    """Request model for watchlist-wide trend predictions."""
+    model_config = {"json_schema_extra": {
+        "example": {
+            "coins": ["btc", "eth", "sol"]
+        }
+    }}
+
+    coins: List[str] = Field(..., description="Cryptocurrency names or symbols to predict", min_length=1, max_length=50)
+
+
+class PriceAlertRequest(BaseModel):
+    """Request model for registering a price alert."""
+    model_config = {"json_schema_extra": {
+        "example": {
+            "coin": "btc",
+            "direction": "above",
+            "threshold": 100000,
+            "note": "Take profit"
+        }
+    }}
+
+    coin: str = Field(..., description="Cryptocurrency name or symbol", min_length=1)
+    direction: Literal["above", "below"] = Field(..., description="Trigger when the price goes above or below the threshold")
+    threshold: float = Field(..., description="USD price that triggers the alert", gt=0)
+    note: Optional[str] = Field(None, description="Text returned with the notification", max_length=200)
+
+
 class WeatherResponse(BaseModel):
     """Response model for weather information."""
     city: str = Field(..., description="City name")
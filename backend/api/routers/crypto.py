@@ -1,15 +1,22 @@
 """Router for cryptocurrency endpoints."""
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, Optional
+import asyncio
+import contextlib
+import json
 import logging
 
 from ..services import CryptoService
 from ..agent_manager import AgentManager, get_agent_manager
-from ..models import QueryRequest
+from ..models import PredictBatchRequest, PriceAlertRequest, QueryRequest
 
 logger = logging.getLogger(__name__)
 
+# Seconds without updates after which an SSE comment is sent to keep proxies from closing the stream.
+STREAM_KEEPALIVE_SECONDS = 15
+
 router = APIRouter(
     prefix="/crypto",
     tags=["crypto"],
@@ -33,7 +40,176 @@ async def get_price(crypto: str) -> Dict[str, Any]:
     if not crypto or not crypto.strip():
         raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
 
-    result = CryptoService.get_price(crypto.strip())
+    result = await CryptoService.get_price(crypto.strip())
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/prices",
+          summary="Get Multiple Cryptocurrency Prices",
+          description="Get current USD prices for several cryptocurrencies with a single upstream request")
+async def get_prices(
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'")
+) -> Dict[str, Any]:
+    """
+    Get current prices for several cryptocurrencies.
+
+    Args:
+        coins: Comma-separated cryptocurrency names or symbols
+
+    Returns:
+        Per-coin price results and a combined report
+    """
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="At least one cryptocurrency must be provided")
+
+    result = await CryptoService.get_prices(cryptos)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/correlations",
+          summary="Get Cryptocurrency Return Correlations",
+          description="Correlate the hourly (or, beyond 90 days, daily) returns of several cryptocurrencies")
+async def get_correlations(
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'"),
+    days: int = Query(30, ge=1, le=365, description="Number of days to correlate over")
+) -> Dict[str, Any]:
+    """
+    Get the correlation matrix of several cryptocurrencies' returns.
+
+    Args:
+        coins: Comma-separated cryptocurrency names or symbols
+        days: Number of days to correlate over
+
+    Returns:
+        The coin IDs, their correlation matrix and per-coin returns
+    """
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    if len(cryptos) < 2:
+        raise HTTPException(status_code=400, detail="At least two cryptocurrencies must be provided")
+
+    result = await CryptoService.get_correlations(cryptos, days)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/forecast",
+          summary="Forecast Cryptocurrency Price Bands",
+          description="Monte Carlo 24-hour and 7-day price percentile bands fitted from recent hourly prices")
+async def get_forecast(
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'"),
+    paths: int = Query(10_000, ge=100, le=100_000, description="Number of simulated paths per coin")
+) -> Dict[str, Any]:
+    """
+    Forecast price bands for several cryptocurrencies.
+
+    Args:
+        coins: Comma-separated cryptocurrency names or symbols
+        paths: Number of simulated paths per coin
+
+    Returns:
+        Per-coin percentile bands for each horizon and a combined report
+    """
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="At least one cryptocurrency must be provided")
+
+    result = await CryptoService.forecast(cryptos, paths)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.post("/predict-batch",
+           summary="Predict Trends for a Watchlist",
+           description="Predict the 24-hour price trend of several cryptocurrencies, scoring all of them in one pass")
+async def predict_batch(request: PredictBatchRequest) -> Dict[str, Any]:
+    """
+    Predict the 24-hour price trend for a list of cryptocurrencies.
+
+    Args:
+        request: The coins to predict
+
+    Returns:
+        Per-coin trend predictions and a combined report
+    """
+    cryptos = [coin.strip() for coin in request.coins if coin.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="At least one cryptocurrency must be provided")
+
+    result = await CryptoService.predict_trends(cryptos)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/backtest",
+          summary="Backtest Trend Prediction Signals",
+          description="Replay the trend prediction over stored hourly history and report its hit rates")
+async def backtest_trends(
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'"),
+    days: int = Query(365, ge=1, le=365, description="Number of days of history to replay"),
+    horizon: int = Query(24, ge=1, le=168, description="Hours ahead each prediction is judged at")
+) -> Dict[str, Any]:
+    """
+    Backtest the trend prediction signals for several cryptocurrencies.
+
+    Args:
+        coins: Comma-separated cryptocurrency names or symbols
+        days: Number of days of history to replay
+        horizon: Hours ahead each prediction is judged at
+
+    Returns:
+        Per-coin hit rates of the prediction and each signal, and the replay throughput
+    """
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="At least one cryptocurrency must be provided")
+
+    result = await CryptoService.backtest_trends(cryptos, days, horizon)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/coins/search",
+          summary="Search Cryptocurrencies",
+          description="Find CoinGecko coins whose ID, symbol or name starts with the query")
+async def search_coins(
+    q: str = Query(..., description="Prefix of a coin ID, symbol or name, e.g. 'bit'"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of coins to return")
+) -> Dict[str, Any]:
+    """
+    Search the coin registry.
+
+    Args:
+        q: Prefix of a coin ID, symbol or name
+        limit: Maximum number of coins to return
+
+    Returns:
+        Matching coin IDs and names
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+    result = CryptoService.search_coins(q.strip(), limit)
 
     if result.get("status") == "error":
         raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
@@ -64,7 +240,164 @@ async def get_price_change_summary(crypto: str, days: int) -> Dict[str, Any]:
     if days > 365:
         raise HTTPException(status_code=400, detail="Maximum supported time period is 365 days")
 
-    result = CryptoService.get_price_change_summary(crypto.strip(), days)
+    result = await CryptoService.get_price_change_summary(crypto.strip(), days)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/anomalies/{crypto}",
+          summary="Get Cryptocurrency Price Anomalies",
+          description="Get the unusual price moves of a cryptocurrency flagged by its EWMA z-score detector")
+async def get_anomalies(
+    crypto: str,
+    hours: int = Query(24, ge=1, le=168, description="How many hours back to report anomalies for")
+) -> Dict[str, Any]:
+    """
+    Get recent unusual price moves of a cryptocurrency.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+        hours: How many hours back to report anomalies for
+
+    Returns:
+        The flagged moves with their z-scores and the coin's typical hourly move
+    """
+    if not crypto or not crypto.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    result = await CryptoService.get_anomalies(crypto.strip(), hours)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/price-at/{crypto}",
+          summary="Get Cryptocurrency Price at a Past Time",
+          description="Get the price of a cryptocurrency at a past date or time from locally held history")
+async def get_price_at(
+    crypto: str,
+    at: str = Query(..., description="ISO 8601 date or date-time in UTC (e.g. '2024-03-03') or a Unix timestamp in seconds")
+) -> Dict[str, Any]:
+    """
+    Get the price of a cryptocurrency at a past date or time.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+        at: The date or time to look up
+
+    Returns:
+        The price at that time, the latest price and the change since then
+    """
+    if not crypto or not crypto.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    if not at.strip():
+        raise HTTPException(status_code=400, detail="A date or time must be provided")
+
+    result = await CryptoService.get_price_at(crypto.strip(), at.strip())
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/price-change/{crypto}",
+          summary="Get Cryptocurrency Price Change Between Dates",
+          description="Get a summary of price changes for a cryptocurrency between two dates or times")
+async def get_price_change_between(
+    crypto: str,
+    start: str = Query(..., description="Range start as an ISO 8601 date or date-time in UTC, or a Unix timestamp in seconds"),
+    end: Optional[str] = Query(None, description="Range end in the same formats (default: now)")
+) -> Dict[str, Any]:
+    """
+    Get a summary of price changes for a cryptocurrency between two dates or times.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+        start: Range start
+        end: Range end
+
+    Returns:
+        Price change summary information for the range
+    """
+    if not crypto or not crypto.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    if not start.strip():
+        raise HTTPException(status_code=400, detail="A range start must be provided")
+
+    result = await CryptoService.get_price_change_between(crypto.strip(), start.strip(), end.strip() if end else None)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/history/{crypto}",
+          summary="Get Cryptocurrency Price History",
+          description="Get prices between two times, downsampled to a chart-friendly number of points")
+async def get_price_history(
+    crypto: str,
+    start: Optional[int] = Query(None, ge=0, description="Range start as a Unix timestamp in seconds (default: 30 days before end)"),
+    end: Optional[int] = Query(None, ge=0, description="Range end as a Unix timestamp in seconds (default: now)"),
+    points: int = Query(500, ge=3, le=5000, description="Maximum number of points to return")
+) -> Dict[str, Any]:
+    """
+    Get a historical price range for a cryptocurrency.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+        start: Range start as a Unix timestamp in seconds
+        end: Range end as a Unix timestamp in seconds
+        points: Maximum number of points to return
+
+    Returns:
+        ``[timestamp_ms, price]`` pairs downsampled with Largest-Triangle-Three-Buckets
+    """
+    if not crypto or not crypto.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="The range start must be before its end")
+
+    result = await CryptoService.get_price_history(crypto.strip(), start, end, points)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/ohlc/{crypto}",
+          summary="Get Cryptocurrency OHLC Candles",
+          description="Get open/high/low/close candles of any width resampled from stored price history")
+async def get_ohlc(
+    crypto: str,
+    interval: str = Query("1h", pattern=r"^\d+[mhdMHD]$", description="Candle width, e.g. '5m', '1h', '4h', '1d'"),
+    days: int = Query(7, ge=1, le=365, description="Number of days to cover")
+) -> Dict[str, Any]:
+    """
+    Get OHLC candles for a cryptocurrency.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+        interval: Candle width such as '5m', '1h', '4h' or '1d'
+        days: The number of days to cover
+
+    Returns:
+        ``[open_time_ms, open, high, low, close]`` candles, oldest first
+    """
+    if not crypto or not crypto.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    result = await CryptoService.get_ohlc(crypto.strip(), interval, days)
 
     if result.get("status") == "error":
         raise HTTPException(status_code=500, detail=result.get("error_message", "Unknown error"))
@@ -72,6 +405,196 @@ async def get_price_change_summary(crypto: str, days: int) -> Dict[str, Any]:
     return result
 
 
+@router.get("/cache/stats",
+          summary="Get Price Cache Statistics",
+          description="Get hit, miss, request-coalescing and micro-batching counters for current-price lookups")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the in-process current-price cache.
+
+    Returns:
+        Hit, miss and coalesced counters together with the cache size and TTL,
+        and the number of upstream batches used for micro-batched lookups
+    """
+    return CryptoService.get_cache_stats()
+
+
+@router.get("/circuit-breakers",
+          summary="Get CoinGecko Circuit Breaker States",
+          description="Get the state, failure counters and recent transitions of each CoinGecko endpoint circuit breaker")
+async def get_circuit_breakers() -> Dict[str, Any]:
+    """
+    Get the per-endpoint CoinGecko circuit breakers.
+
+    Returns:
+        Each breaker's state (closed, open or half_open), consecutive failures,
+        rejected calls and its most recent state transitions
+    """
+    return CryptoService.get_circuit_breakers()
+
+
+@router.post("/alerts",
+           summary="Create a Price Alert",
+           description="Register a one-shot alert triggered when a streamed price crosses a threshold")
+async def create_alert(request: PriceAlertRequest) -> Dict[str, Any]:
+    """
+    Register a price alert.
+
+    The alert must lie on the other side of the current price, so it fires
+    when the price crosses the threshold rather than at once. Alerts are
+    checked against every price the shared stream poller fetches.
+    A triggered alert is removed from the active alerts and listed under
+    ``triggered`` by ``GET /crypto/alerts``; it is not pushed to the shared
+    stream, whose subscribers did not create it.
+
+    Args:
+        request: The coin, direction, threshold and optional note
+
+    Returns:
+        The registered alert with its ``alert_id``
+    """
+    if not request.coin.strip():
+        raise HTTPException(status_code=400, detail="Cryptocurrency name cannot be empty")
+
+    result = await CryptoService.create_alert(request.coin.strip(), request.direction, request.threshold, request.note)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/alerts",
+          summary="List Price Alerts",
+          description="List active and recently triggered price alerts")
+async def get_alerts(
+    coin: Optional[str] = Query(None, description="Only list alerts of this cryptocurrency")
+) -> Dict[str, Any]:
+    """
+    List price alerts.
+
+    Args:
+        coin: Optional cryptocurrency name or symbol to filter by
+
+    Returns:
+        The active alerts and the most recently triggered ones
+    """
+    result = CryptoService.get_alerts(coin.strip() if coin and coin.strip() else None)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.delete("/alerts/{alert_id}",
+             summary="Delete a Price Alert",
+             description="Delete an active price alert")
+async def delete_alert(alert_id: str) -> Dict[str, Any]:
+    """
+    Delete a price alert.
+
+    Args:
+        alert_id: The ``alert_id`` returned when the alert was created
+
+    Returns:
+        The deleted alert
+    """
+    result = CryptoService.delete_alert(alert_id)
+
+    if result.get("status") == "error":
+        raise HTTPException(status_code=404, detail=result.get("error_message", "Unknown error"))
+
+    return result
+
+
+@router.get("/stream",
+          summary="Stream Cryptocurrency Prices",
+          description="Push live USD price updates as Server-Sent Events, served from one shared upstream poller")
+async def stream_prices(
+    request: Request,
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'")
+) -> StreamingResponse:
+    """
+    Stream live prices for several cryptocurrencies as Server-Sent Events.
+
+    Each ``price`` event carries one coin's latest price. A client that reads
+    slowly receives only the most recent price per coin, never a backlog.
+
+    Args:
+        coins: Comma-separated cryptocurrency names or symbols
+
+    Returns:
+        A ``text/event-stream`` response
+    """
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    if not cryptos:
+        raise HTTPException(status_code=400, detail="At least one cryptocurrency must be provided")
+
+    crypto_ids, error = CryptoService.resolve_stream(cryptos)
+    if error:
+        raise HTTPException(status_code=400, detail=error.get("error_message", "Unknown error"))
+
+    async def events() -> AsyncIterator[str]:
+        # Subscribing only once the response is being sent means the finally
+        # block below always runs for it, even if the client is already gone.
+        subscription, _ = CryptoService.open_stream(crypto_ids)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    updates = await asyncio.wait_for(subscription.next_updates(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                for update in updates:
+                    yield f"event: price\ndata: {json.dumps(update)}\n\n"
+        finally:
+            CryptoService.close_stream(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/ws")
+async def stream_prices_ws(
+    websocket: WebSocket,
+    coins: str = Query(..., description="Comma-separated cryptocurrency names or symbols, e.g. 'btc,eth,sol'")
+) -> None:
+    """
+    Stream live prices for several cryptocurrencies over a WebSocket.
+
+    Each message is ``{"type": "prices", "updates": [...]}`` with the latest
+    price of every coin that changed since the previous message.
+    """
+    await websocket.accept()
+
+    cryptos = [coin.strip() for coin in coins.split(",") if coin.strip()]
+    subscription, error = CryptoService.open_stream(cryptos)
+    if error:
+        await websocket.send_json({"type": "error", "error_message": error.get("error_message", "Unknown error")})
+        await websocket.close(code=1008)
+        return
+
+    async def forward() -> None:
+        while True:
+            updates = await subscription.next_updates()
+            await websocket.send_json({"type": "prices", "updates": updates})
+
+    sender = asyncio.create_task(forward())
+    try:
+        # Clients only listen; reading is how a disconnect is noticed while no updates flow.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        CryptoService.close_stream(subscription)
+        sender.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await sender
+
+
 @router.post("/agent",
            summary="Crypto Agent (AI-powered)",
            description="Query the AI agent for cryptocurrency information using natural language")
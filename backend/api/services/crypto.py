@@ -1,9 +1,39 @@
 """Cryptocurrency service layer."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
-from crypto_tools.services import get_crypto_price, get_crypto_price_change_summary
+from crypto_tools.services import (
+    backtest_crypto_price_trends_async,
+    close_price_stream,
+    create_price_alert_async,
+    delete_price_alert,
+    forecast_crypto_prices_async,
+    get_anomaly_detector_stats,
+    get_circuit_breaker_states,
+    get_coin_registry_stats,
+    get_crypto_correlations_async,
+    get_crypto_ohlc_async,
+    get_crypto_price_anomalies_async,
+    get_crypto_price_async,
+    get_crypto_price_at_async,
+    get_crypto_price_change_between_async,
+    get_crypto_price_change_summary_async,
+    get_crypto_price_history_async,
+    get_crypto_prices_async,
+    get_price_alert_stats,
+    get_price_alerts,
+    get_price_batcher_stats,
+    get_price_cache_stats,
+    get_price_feed_stats,
+    get_rate_limit_stats,
+    get_summary_cache_stats,
+    open_price_stream,
+    predict_crypto_price_trends_async,
+    resolve_stream_coins,
+    search_coins,
+)
+from crypto_tools.services.stream import PriceSubscription
 
 logger = logging.getLogger(__name__)
 
@@ -12,11 +42,11 @@ class CryptoService:
     """Service for cryptocurrency operations."""
 
     @staticmethod
-    def get_price(crypto: str) -> Dict[str, Any]:
+    async def get_price(crypto: str) -> Dict[str, Any]:
         """Get cryptocurrency price."""
         try:
             logger.info(f"Getting price for cryptocurrency: {crypto}")
-            result = get_crypto_price(crypto)
+            result = await get_crypto_price_async(crypto)
             return result
         except Exception as e:
             logger.error(f"Error getting price for {crypto}: {str(e)}")
@@ -26,11 +56,25 @@ class CryptoService:
             }
 
     @staticmethod
-    def get_price_change_summary(crypto: str, days: int) -> Dict[str, Any]:
+    async def get_prices(cryptos: List[str]) -> Dict[str, Any]:
+        """Get prices for several cryptocurrencies in one upstream call."""
+        try:
+            logger.info(f"Getting prices for cryptocurrencies: {', '.join(cryptos)}")
+            result = await get_crypto_prices_async(cryptos)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting prices for {cryptos}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency prices: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_price_change_summary(crypto: str, days: int) -> Dict[str, Any]:
         """Get cryptocurrency price change summary."""
         try:
             logger.info(f"Getting price change summary for cryptocurrency: {crypto}, days: {days}")
-            result = get_crypto_price_change_summary(crypto, days)
+            result = await get_crypto_price_change_summary_async(crypto, days)
             return result
         except Exception as e:
             logger.error(f"Error getting price change summary for {crypto}: {str(e)}")
@@ -38,3 +82,219 @@ class CryptoService:
                 "status": "error",
                 "error_message": f"Failed to get cryptocurrency price change summary: {str(e)}"
             }
+
+    @staticmethod
+    async def get_price_at(crypto: str, at: str) -> Dict[str, Any]:
+        """Get the cryptocurrency price at a past date or time."""
+        try:
+            logger.info(f"Getting price for cryptocurrency: {crypto} at {at}")
+            result = await get_crypto_price_at_async(crypto, at)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting price for {crypto} at {at}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency price: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_anomalies(crypto: str, hours: int) -> Dict[str, Any]:
+        """Get the unusual price moves of a cryptocurrency flagged by its anomaly detector."""
+        try:
+            logger.info(f"Getting price anomalies for cryptocurrency: {crypto}, hours: {hours}")
+            result = await get_crypto_price_anomalies_async(crypto, hours)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting price anomalies for {crypto}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency price anomalies: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_price_change_between(crypto: str, start: str, end: Optional[str]) -> Dict[str, Any]:
+        """Get a cryptocurrency price change summary between two dates or times."""
+        try:
+            logger.info(f"Getting price change summary for cryptocurrency: {crypto}, start: {start}, end: {end}")
+            result = await get_crypto_price_change_between_async(crypto, start, end)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting price change summary for {crypto}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency price change summary: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_price_history(crypto: str, start: Optional[int], end: Optional[int], points: int) -> Dict[str, Any]:
+        """Get a downsampled historical price range."""
+        try:
+            logger.info(f"Getting price history for cryptocurrency: {crypto}, start: {start}, end: {end}, points: {points}")
+            result = await get_crypto_price_history_async(crypto, start, end, points)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting price history for {crypto}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency price history: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_ohlc(crypto: str, interval: str, days: int) -> Dict[str, Any]:
+        """Get OHLC candles resampled from locally held price history."""
+        try:
+            logger.info(f"Getting {interval} OHLC candles for cryptocurrency: {crypto}, days: {days}")
+            result = await get_crypto_ohlc_async(crypto, interval, days)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting OHLC candles for {crypto}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency OHLC candles: {str(e)}"
+            }
+
+    @staticmethod
+    async def get_correlations(cryptos: List[str], days: int) -> Dict[str, Any]:
+        """Get the return correlation matrix of several cryptocurrencies."""
+        try:
+            logger.info(f"Getting correlations for cryptocurrencies: {', '.join(cryptos)}, days: {days}")
+            result = await get_crypto_correlations_async(cryptos, days)
+            return result
+        except Exception as e:
+            logger.error(f"Error getting correlations for {cryptos}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to get cryptocurrency correlations: {str(e)}"
+            }
+
+    @staticmethod
+    async def forecast(cryptos: List[str], paths: int) -> Dict[str, Any]:
+        """Get Monte Carlo price-band forecasts for a watchlist."""
+        try:
+            logger.info(f"Forecasting prices for cryptocurrencies: {', '.join(cryptos)}, paths: {paths}")
+            result = await forecast_crypto_prices_async(cryptos, paths)
+            return result
+        except Exception as e:
+            logger.error(f"Error forecasting prices for {cryptos}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to forecast cryptocurrency prices: {str(e)}"
+            }
+
+    @staticmethod
+    async def backtest_trends(cryptos: List[str], days: int, horizon: int) -> Dict[str, Any]:
+        """Backtest the trend-prediction signals over stored hourly history."""
+        try:
+            logger.info(f"Backtesting trend signals for cryptocurrencies: {', '.join(cryptos)}, days: {days}, horizon: {horizon}")
+            result = await backtest_crypto_price_trends_async(cryptos, days, horizon)
+            return result
+        except Exception as e:
+            logger.error(f"Error backtesting trend signals for {cryptos}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to backtest cryptocurrency trend signals: {str(e)}"
+            }
+
+    @staticmethod
+    async def predict_trends(cryptos: List[str]) -> Dict[str, Any]:
+        """Predict the 24-hour trend of a whole watchlist in one batch."""
+        try:
+            logger.info(f"Predicting trends for cryptocurrencies: {', '.join(cryptos)}")
+            result = await predict_crypto_price_trends_async(cryptos)
+            return result
+        except Exception as e:
+            logger.error(f"Error predicting trends for {cryptos}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to predict cryptocurrency price trends: {str(e)}"
+            }
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Get current-price cache, micro-batching, streaming and rate limit statistics."""
+        return {
+            "status": "success",
+            "price_cache": get_price_cache_stats(),
+            "price_batching": get_price_batcher_stats(),
+            "summary_cache": get_summary_cache_stats(),
+            "price_feed": get_price_feed_stats(),
+            "anomaly_detection": get_anomaly_detector_stats(),
+            "price_alerts": get_price_alert_stats(),
+            "rate_limit": get_rate_limit_stats(),
+            "coin_registry": get_coin_registry_stats(),
+        }
+
+    @staticmethod
+    async def create_alert(crypto: str, direction: str, threshold: float, note: Optional[str]) -> Dict[str, Any]:
+        """Register a price alert checked against the streaming feed."""
+        try:
+            logger.info(f"Creating price alert for cryptocurrency: {crypto}, {direction} {threshold}")
+            return await create_price_alert_async(crypto, direction, threshold, note)
+        except Exception as e:
+            logger.error(f"Error creating price alert for {crypto}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to create price alert: {str(e)}"
+            }
+
+    @staticmethod
+    def get_alerts(crypto: Optional[str]) -> Dict[str, Any]:
+        """List active and recently triggered price alerts."""
+        try:
+            return get_price_alerts(crypto)
+        except Exception as e:
+            logger.error(f"Error listing price alerts: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to list price alerts: {str(e)}"
+            }
+
+    @staticmethod
+    def delete_alert(alert_id: str) -> Dict[str, Any]:
+        """Delete an active price alert."""
+        try:
+            logger.info(f"Deleting price alert: {alert_id}")
+            return delete_price_alert(alert_id)
+        except Exception as e:
+            logger.error(f"Error deleting price alert {alert_id}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to delete price alert: {str(e)}"
+            }
+
+    @staticmethod
+    def search_coins(query: str, limit: int) -> Dict[str, Any]:
+        """Search the coin registry by ID, symbol or name prefix."""
+        try:
+            logger.info(f"Searching coins for: {query}")
+            return search_coins(query, limit)
+        except Exception as e:
+            logger.error(f"Error searching coins for {query}: {str(e)}")
+            return {
+                "status": "error",
+                "error_message": f"Failed to search cryptocurrencies: {str(e)}"
+            }
+
+    @staticmethod
+    def get_circuit_breakers() -> Dict[str, Any]:
+        """Get the state of the per-endpoint CoinGecko circuit breakers."""
+        return {
+            "status": "success",
+            "circuit_breakers": get_circuit_breaker_states(),
+        }
+
+    @staticmethod
+    def resolve_stream(cryptos: List[str]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """Validate the coins of a live price stream without subscribing."""
+        return resolve_stream_coins(cryptos)
+
+    @staticmethod
+    def open_stream(cryptos: List[str]) -> Tuple[Optional[PriceSubscription], Optional[Dict[str, Any]]]:
+        """Subscribe to the shared live price feed."""
+        logger.info(f"Opening price stream for cryptocurrencies: {', '.join(cryptos)}")
+        return open_price_stream(cryptos)
+
+    @staticmethod
+    def close_stream(subscription: PriceSubscription) -> None:
+        """Release a live price feed subscription."""
+        close_price_stream(subscription)
@@ -2,10 +2,17 @@
 
 from google.adk.agents import Agent
 
-from crypto_tools.services.price import (
+from .tools import (
+    forecast_crypto_prices,
+    get_crypto_correlations,
     get_crypto_price,
+    get_crypto_price_anomalies,
+    get_crypto_price_at,
+    get_crypto_price_change_between,
     get_crypto_price_change_summary,
+    get_crypto_prices,
     predict_crypto_price_trend,
+    predict_crypto_price_trends,
 )
 
 __all__ = [
@@ -25,11 +32,29 @@ root_agent = Agent(
     instruction=(
         "You are a helpful agent who can answer user questions about cryptocurrency prices, price change summaries, and price trend predictions. "
         "Use the get_crypto_price tool to get the current price of a cryptocurrency in USD. "
+        "Use the get_crypto_prices tool with a list of cryptocurrencies when the user asks about several coins at once. "
         "Use the get_crypto_price_change_summary tool to get a summary of price changes over a specified period. "
+        "Use the get_crypto_price_at tool to find what a cryptocurrency cost on a past date (ISO dates like '2024-03-03', within the last year); it also returns the change since then. "
+        "Use the get_crypto_price_change_between tool to summarise the price change between two specific dates. "
+        "Use the get_crypto_price_anomalies tool when the user asks whether anything unusual happened to a coin's price recently (default: last 24 hours). "
+        "Use the get_crypto_correlations tool with two or more cryptocurrencies to tell which coins move together over a number of days. "
         "Use the predict_crypto_price_trend tool to predict whether a cryptocurrency's price will go up or down in the next 24 hours. "
+        "Use the predict_crypto_price_trends tool with a list of cryptocurrencies to predict the trend of several coins at once, e.g. for a watchlist report. "
+        "Use the forecast_crypto_prices tool with a list of cryptocurrencies when the user asks for a likely price range over the next 24 hours or 7 days. "
         "The get_crypto_price tool accepts cryptocurrency names or symbols like 'bitcoin', 'btc', 'ethereum', 'eth', etc. "
         "The get_crypto_price_change_summary tool accepts cryptocurrency names along with the number of days to look back (default 7). "
         "The predict_crypto_price_trend tool analyzes recent price data and technical indicators to provide a trend prediction with confidence level."
     ),
-    tools=[get_crypto_price, get_crypto_price_change_summary, predict_crypto_price_trend],
-)
\ No newline at end of file
+    tools=[
+        get_crypto_price,
+        get_crypto_prices,
+        get_crypto_price_change_summary,
+        get_crypto_price_at,
+        get_crypto_price_change_between,
+        get_crypto_correlations,
+        get_crypto_price_anomalies,
+        predict_crypto_price_trend,
+        predict_crypto_price_trends,
+        forecast_crypto_prices,
+    ],
+)
@@ -0,0 +1,144 @@
+"""Crypto agent tools: the async services exposed under their public tool names."""
+
+from typing import Any
+
+from crypto_tools.services import (
+    forecast_crypto_prices_async,
+    get_crypto_correlations_async,
+    get_crypto_price_anomalies_async,
+    get_crypto_price_async,
+    get_crypto_price_at_async,
+    get_crypto_price_change_between_async,
+    get_crypto_price_change_summary_async,
+    get_crypto_prices_async,
+    predict_crypto_price_trend_async,
+    predict_crypto_price_trends_async,
+)
+
+__all__ = [
+    "forecast_crypto_prices",
+    "get_crypto_correlations",
+    "get_crypto_price",
+    "get_crypto_price_anomalies",
+    "get_crypto_price_at",
+    "get_crypto_price_change_between",
+    "get_crypto_price_change_summary",
+    "get_crypto_prices",
+    "predict_crypto_price_trend",
+    "predict_crypto_price_trends",
+]
+
+
+# The ADK runner awaits coroutine tools, so upstream calls and retry backoff
+# never block the event loop serving the API. The tool name the model sees is
+# the function name, hence these thin wrappers instead of the ``*_async`` services.
+
+
+async def get_crypto_price(crypto: str) -> dict[str, Any]:
+    """
+    Fetch the current price of a cryptocurrency in USD.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+    """
+    return await get_crypto_price_async(crypto)
+
+
+async def get_crypto_prices(cryptos: list[str]) -> dict[str, Any]:
+    """
+    Fetch the current USD prices of several cryptocurrencies at once.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+    """
+    return await get_crypto_prices_async(cryptos)
+
+
+async def get_crypto_price_change_summary(crypto: str, days: int = 7) -> dict[str, Any]:
+    """
+    Summarise how a cryptocurrency's price changed over the last ``days`` days.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        days: The number of days to look back (default 7, max 365)
+    """
+    return await get_crypto_price_change_summary_async(crypto, days)
+
+
+async def get_crypto_price_at(crypto: str, at: str) -> dict[str, Any]:
+    """
+    Look up what a cryptocurrency cost at a past date or time, and the change since then.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        at: An ISO 8601 date or date-time in UTC (e.g., '2024-03-03', '2024-03-03T15:00:00Z'),
+            within the last 365 days
+    """
+    return await get_crypto_price_at_async(crypto, at)
+
+
+async def get_crypto_price_change_between(crypto: str, start: str, end: str | None = None) -> dict[str, Any]:
+    """
+    Summarise how a cryptocurrency's price changed between two dates or times.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        start: Range start as an ISO 8601 date or date-time in UTC, within the last 365 days
+        end: Range end in the same format (default: now)
+    """
+    return await get_crypto_price_change_between_async(crypto, start, end)
+
+
+async def get_crypto_correlations(cryptos: list[str], days: int = 30) -> dict[str, Any]:
+    """
+    Correlate the price returns of two or more cryptocurrencies to show which coins move together.
+
+    Args:
+        cryptos: Two or more cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+        days: Number of days to correlate over (default: 30, max 365)
+    """
+    return await get_crypto_correlations_async(cryptos, days)
+
+
+async def get_crypto_price_anomalies(crypto: str, hours: int = 24) -> dict[str, Any]:
+    """
+    Report unusual price moves of a cryptocurrency in the last ``hours`` hours.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        hours: How many hours back to report anomalies for (default: 24, max 168)
+    """
+    return await get_crypto_price_anomalies_async(crypto, hours)
+
+
+async def predict_crypto_price_trend(crypto: str) -> dict[str, Any]:
+    """
+    Predict whether a cryptocurrency's price will go up or down in the next 24 hours.
+
+    The prediction combines momentum, moving-average and volatility indicators
+    and comes with a confidence level.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+    """
+    return await predict_crypto_price_trend_async(crypto)
+
+
+async def predict_crypto_price_trends(cryptos: list[str]) -> dict[str, Any]:
+    """
+    Predict the 24-hour price trend for a whole watchlist of cryptocurrencies.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+    """
+    return await predict_crypto_price_trends_async(cryptos)
+
+
+async def forecast_crypto_prices(cryptos: list[str]) -> dict[str, Any]:
+    """
+    Forecast likely 24-hour and 7-day price ranges for one or more cryptocurrencies.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+    """
+    return await forecast_crypto_prices_async(cryptos)
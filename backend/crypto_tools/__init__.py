@@ -1,13 +1,83 @@
 """Public exports for the crypto tools package."""
 
 from .services import (
+    CircuitOpenError,
+    PriceSeries,
+    RateLimitExceeded,
+    backtest_crypto_price_trends_async,
+    close_price_feed,
+    close_price_stream,
+    close_summary_cache,
+    create_price_alert_async,
+    delete_price_alert,
+    forecast_crypto_prices_async,
+    get_anomaly_detector_stats,
+    get_circuit_breaker_states,
+    get_coin_registry,
+    get_coin_registry_stats,
+    get_crypto_correlations_async,
+    get_crypto_ohlc_async,
     get_crypto_price,
+    get_crypto_price_anomalies_async,
+    get_crypto_price_async,
+    get_crypto_price_at_async,
+    get_crypto_price_change_between_async,
     get_crypto_price_change_summary,
+    get_crypto_price_change_summary_async,
+    get_crypto_price_history_async,
+    get_crypto_prices_async,
+    get_price_alert_stats,
+    get_price_alerts,
+    get_price_batcher_stats,
+    get_price_cache_stats,
+    get_price_feed_stats,
+    get_rate_limit_stats,
+    get_summary_cache_stats,
+    open_price_stream,
     predict_crypto_price_trend,
+    predict_crypto_price_trend_async,
+    predict_crypto_price_trends_async,
+    resolve_stream_coins,
+    search_coins,
 )
 
 __all__ = [
+    "CircuitOpenError",
+    "PriceSeries",
+    "RateLimitExceeded",
+    "backtest_crypto_price_trends_async",
+    "close_price_feed",
+    "close_price_stream",
+    "close_summary_cache",
+    "create_price_alert_async",
+    "delete_price_alert",
+    "forecast_crypto_prices_async",
+    "get_anomaly_detector_stats",
+    "get_circuit_breaker_states",
+    "get_coin_registry",
+    "get_coin_registry_stats",
+    "get_crypto_correlations_async",
+    "get_crypto_ohlc_async",
     "get_crypto_price",
+    "get_crypto_price_anomalies_async",
+    "get_crypto_price_async",
+    "get_crypto_price_at_async",
+    "get_crypto_price_change_between_async",
     "get_crypto_price_change_summary",
+    "get_crypto_price_change_summary_async",
+    "get_crypto_price_history_async",
+    "get_crypto_prices_async",
+    "get_price_alert_stats",
+    "get_price_alerts",
+    "get_price_batcher_stats",
+    "get_price_cache_stats",
+    "get_price_feed_stats",
+    "get_rate_limit_stats",
+    "get_summary_cache_stats",
+    "open_price_stream",
     "predict_crypto_price_trend",
+    "predict_crypto_price_trend_async",
+    "predict_crypto_price_trends_async",
+    "resolve_stream_coins",
+    "search_coins",
 ]
\ No newline at end of file
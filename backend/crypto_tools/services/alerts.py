@@ -0,0 +1,192 @@
+"""Price alerts indexed by threshold so each price update only touches the alerts it crosses."""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any
+
+ALERT_DIRECTIONS = ("above", "below")
+
+
+def validate_alert(direction: str, threshold: float) -> None:
+    """Raise ``ValueError`` for an unknown direction or a non-positive threshold."""
+    if direction not in ALERT_DIRECTIONS:
+        raise ValueError(f"Alert direction must be one of: {', '.join(ALERT_DIRECTIONS)}.")
+    if not threshold > 0:
+        raise ValueError("Alert threshold must be a positive price.")
+
+
+class ThresholdIndex:
+    """
+    Alert IDs sorted by threshold, as parallel lists searched with ``bisect``.
+
+    Crossed alerts always form a prefix (``above``: thresholds at or below the
+    price) or a suffix (``below``: thresholds at or above the price) of the
+    lists, so finding them is one binary search and removing them one slice.
+    """
+
+    __slots__ = ("thresholds", "ids")
+
+    def __init__(self):
+        self.thresholds: list[float] = []
+        self.ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, threshold: float, alert_id: str) -> None:
+        index = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(index, threshold)
+        self.ids.insert(index, alert_id)
+
+    def remove(self, threshold: float, alert_id: str) -> bool:
+        index = bisect_left(self.thresholds, threshold)
+        while index < len(self.ids) and self.thresholds[index] == threshold:
+            if self.ids[index] == alert_id:
+                del self.thresholds[index], self.ids[index]
+                return True
+            index += 1
+        return False
+
+    def pop_at_or_below(self, price: float) -> list[str]:
+        """Remove and return the alerts with a threshold at or below ``price``."""
+        index = bisect_right(self.thresholds, price)
+        if not index:
+            return []
+        crossed = self.ids[:index]
+        del self.thresholds[:index], self.ids[:index]
+        return crossed
+
+    def pop_at_or_above(self, price: float) -> list[str]:
+        """Remove and return the alerts with a threshold at or above ``price``."""
+        index = bisect_left(self.thresholds, price)
+        if index == len(self.ids):
+            return []
+        crossed = self.ids[index:]
+        del self.thresholds[index:], self.ids[index:]
+        return crossed
+
+
+class AlertBook:
+    """
+    One-shot price alerts per coin, triggered when the price crosses the threshold.
+
+    An alert is registered with the current price and must lie on the other
+    side of it, so it fires on a crossing rather than on a level the price
+    already satisfies. Every coin has an ``above`` and a ``below`` ``ThresholdIndex``. ``evaluate``
+    runs two binary searches per price update and removes only the alerts the
+    price crossed, so its cost does not grow with the number of alerts
+    registered. Triggered alerts are kept in a bounded history.
+    """
+
+    def __init__(self, max_alerts: int = 100_000, history_size: int = 1_000):
+        self.max_alerts = max_alerts
+        self._alerts: dict[str, dict[str, Any]] = {}
+        self._indexes: dict[str, dict[str, ThresholdIndex]] = {}
+        self._triggered: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.triggered = 0
+
+    def add(
+        self, coin_id: str, direction: str, threshold: float, current_price: float, note: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Register an alert and return it.
+
+        Raises ``ValueError`` for invalid alerts, for alerts ``current_price``
+        already satisfies and when the book is full.
+        """
+        validate_alert(direction, threshold)
+        if direction == "above" and current_price >= threshold:
+            raise ValueError(
+                f"The price (${current_price:,.2f}) is already at or above ${threshold:,.2f}; the alert would trigger immediately."
+            )
+        if direction == "below" and current_price <= threshold:
+            raise ValueError(
+                f"The price (${current_price:,.2f}) is already at or below ${threshold:,.2f}; the alert would trigger immediately."
+            )
+
+        with self._lock:
+            if len(self._alerts) >= self.max_alerts:
+                raise ValueError(f"A maximum of {self.max_alerts} active alerts is supported.")
+            alert = {
+                "alert_id": uuid.uuid4().hex,
+                "crypto_id": coin_id,
+                "direction": direction,
+                "threshold": float(threshold),
+                "note": note,
+                "price_at_creation": float(current_price),
+                "created_at": int(time.time() * 1000),
+            }
+            self._alerts[alert["alert_id"]] = alert
+            indexes = self._indexes.setdefault(coin_id, {name: ThresholdIndex() for name in ALERT_DIRECTIONS})
+            indexes[direction].add(alert["threshold"], alert["alert_id"])
+            return dict(alert)
+
+    def remove(self, alert_id: str) -> dict[str, Any] | None:
+        """Delete an active alert, returning it, or ``None`` if it is unknown or already triggered."""
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is None:
+                return None
+            indexes = self._indexes[alert["crypto_id"]]
+            indexes[alert["direction"]].remove(alert["threshold"], alert_id)
+            if not any(indexes.values()):
+                del self._indexes[alert["crypto_id"]]
+            return alert
+
+    def evaluate(self, coin_id: str, price: float, timestamp: int) -> list[dict[str, Any]]:
+        """Trigger and return the alerts of ``coin_id`` crossed by ``price``."""
+        with self._lock:
+            self.evaluations += 1
+            indexes = self._indexes.get(coin_id)
+            if indexes is None:
+                return []
+            crossed = indexes["above"].pop_at_or_below(price) + indexes["below"].pop_at_or_above(price)
+            if not crossed:
+                return []
+            if not any(indexes.values()):
+                del self._indexes[coin_id]
+
+            triggered = []
+            for alert_id in crossed:
+                alert = self._alerts.pop(alert_id)
+                alert.update(triggered_price=price, triggered_at=timestamp)
+                self._triggered.append(alert)
+                triggered.append(dict(alert))
+            self.triggered += len(triggered)
+            return triggered
+
+    def active(self, coin_id: str | None = None) -> list[dict[str, Any]]:
+        """Return the active alerts, optionally of one coin, oldest first."""
+        with self._lock:
+            return [dict(alert) for alert in self._alerts.values() if coin_id is None or alert["crypto_id"] == coin_id]
+
+    def recently_triggered(self, coin_id: str | None = None) -> list[dict[str, Any]]:
+        """Return the most recently triggered alerts, optionally of one coin, newest first."""
+        with self._lock:
+            return [
+                dict(alert) for alert in reversed(self._triggered) if coin_id is None or alert["crypto_id"] == coin_id
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._alerts.clear()
+            self._indexes.clear()
+            self._triggered.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return active alert, coin, evaluation and trigger counters."""
+        with self._lock:
+            return {
+                "active_alerts": len(self._alerts),
+                "coins": len(self._indexes),
+                "evaluations": self.evaluations,
+                "triggered": self.triggered,
+                "max_alerts": self.max_alerts,
+            }
@@ -0,0 +1,943 @@
+"""Trend predictions, correlations, forecasts, backtests and anomaly reports over stored price history."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any
+
+import numpy as np
+import requests
+
+from .backtest import backtest_trend_signals
+from .correlation import align_series, correlation_matrix, log_returns
+from .forecast import FORECAST_PERCENTILES, fit_drift_volatility, simulate_price_bands
+from .history import (
+    _DAY_MS,
+    _format_time,
+    _load_histories_async,
+    _load_price_history,
+    _load_price_history_async,
+    _stored_history,
+    _validate_days,
+)
+from .indicators import MIN_TREND_HISTORY, compute_trend_indicators, price_matrix
+from .live import ANOMALY_Z_THRESHOLD, _anomaly_book
+from .price import (
+    _get_cached_price,
+    _get_cached_price_async,
+    _get_cached_prices_async,
+    _request_error_message,
+    _resolve_batch,
+    _resolve_crypto_id,
+    _tag_last_known_good,
+    _unsupported_crypto_error,
+)
+from .series import PriceSeries
+from .timeseries import INTERVAL_STEP_MS, get_price_store
+
+# Upper bound on the coins of one correlation matrix.
+MAX_CORRELATION_COINS = 25
+
+# Monte Carlo forecasts: hourly history fitted, horizons reported and simulated paths per coin.
+FORECAST_LOOKBACK_DAYS = 30
+MIN_FORECAST_HISTORY = 48
+FORECAST_HORIZONS = (("24h", 24), ("7d", 168))
+FORECAST_DEFAULT_PATHS = 10_000
+FORECAST_MAX_PATHS = 100_000
+
+# Longest horizon, in hours, at which backtested trend predictions are judged.
+BACKTEST_MAX_HORIZON = 168
+
+# Days of hourly history a price anomaly detector is seeded from.
+ANOMALY_HISTORY_DAYS = 7
+
+
+def _build_trend_prediction(crypto: str, crypto_id: str, indicators: dict[str, np.ndarray], row: int = 0) -> dict[str, Any]:
+    """Describe row ``row`` of ``compute_trend_indicators`` output as a trend prediction result."""
+    current_price = float(indicators["current_price"][row])
+    momentum = float(indicators["momentum"][row])
+    ma_72h = float(indicators["ma_72h"][row])
+    volatility = float(indicators["volatility"][row])
+    recent_change = float(indicators["recent_change"][row])
+
+    signals = []
+
+    # Signal 1: Momentum (last 24 hours vs previous 24 hours)
+    momentum_vote = indicators["momentum_vote"][row]
+    if momentum_vote > 0:
+        signals.append(f"Bullish momentum: +{momentum:.2f}% gain in last 24h average vs prior 24h")
+    elif momentum_vote < 0:
+        signals.append(f"Bearish momentum: {momentum:.2f}% loss in last 24h average vs prior 24h")
+    else:
+        signals.append(f"Neutral momentum: {momentum:.2f}% change")
+
+    # Signal 2: MA crossover (short-term vs medium-term)
+    if indicators["ma_cross_vote"][row] > 0:
+        signals.append("Short-term MA (12h) above medium-term MA (24h) - bullish signal")
+    else:
+        signals.append("Short-term MA (12h) below medium-term MA (24h) - bearish signal")
+
+    # Signal 3: Price vs longer-term MA
+    if indicators["ma_72h_vote"][row] > 0:
+        signals.append(f"Current price above 72h MA (${ma_72h:,.2f}) - bullish signal")
+    else:
+        signals.append(f"Current price below 72h MA (${ma_72h:,.2f}) - bearish signal")
+
+    # Signal 4: Recent price action (last 6 hours trend)
+    recent_vote = indicators["recent_vote"][row]
+    if recent_vote > 0:
+        signals.append(f"Positive recent momentum: +{recent_change:.2f}% in last 6 hours")
+    elif recent_vote < 0:
+        signals.append(f"Negative recent momentum: {recent_change:.2f}% in last 6 hours")
+
+    bullish_signals = int(indicators["bullish_signals"][row])
+    bearish_signals = int(indicators["bearish_signals"][row])
+    prediction = {1: "UP", -1: "DOWN", 0: "NEUTRAL"}[int(indicators["prediction"][row])]
+
+    # Volatility adjustment (higher volatility = lower confidence, applied by the indicator engine)
+    if volatility > 5:
+        signals.append(f"High volatility ({volatility:.2f}%) reduces prediction confidence")
+    elif volatility > 3:
+        signals.append(f"Moderate volatility ({volatility:.2f}%)")
+    else:
+        signals.append(f"Low volatility ({volatility:.2f}%) supports prediction stability")
+
+    confidence = round(float(indicators["confidence"][row]) * 100, 1)
+
+    # Generate report
+    if prediction == "UP":
+        trend_description = "likely to increase"
+    elif prediction == "DOWN":
+        trend_description = "likely to decrease"
+    else:
+        trend_description = "expected to remain relatively stable"
+
+    report = (
+        f"Price Trend Prediction for {crypto.upper()} ({crypto_id}) - Next 24 Hours:\n\n"
+        f"📊 PREDICTION: {prediction}\n"
+        f"📈 Current Price: ${current_price:,.2f}\n"
+        f"🎯 Confidence: {confidence}%\n\n"
+        f"The price is {trend_description} over the next 24 hours.\n\n"
+        f"Analysis Signals:\n" + "\n".join(f"• {s}" for s in signals) + "\n\n"
+        "⚠️ DISCLAIMER: This prediction is based on technical analysis of historical data and should not be considered financial advice. "
+        "Cryptocurrency markets are highly volatile and past performance does not guarantee future results."
+    )
+
+    return {
+        "status": "success",
+        "report": report,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "prediction": prediction,
+        "confidence_percentage": confidence,
+        "current_price_usd": current_price,
+        "momentum_24h": round(momentum, 2),
+        "volatility_percentage": round(volatility, 2),
+        "bullish_signals": bullish_signals,
+        "bearish_signals": bearish_signals,
+        "signals": signals,
+    }
+
+
+def _score_trends(histories: list[np.ndarray], current_prices: list[float | None]) -> dict[str, np.ndarray]:
+    """Compute the trend indicators for several hourly histories in one vectorized pass."""
+    current = np.array([np.nan if price is None else price for price in current_prices], dtype=np.float64)
+    return compute_trend_indicators(price_matrix(histories), current)
+
+
+def _last_good_trend(crypto: str, crypto_id: str) -> dict[str, Any] | None:
+    """Predict the trend from the locally stored hourly history when CoinGecko is unavailable."""
+    stored = _stored_history(crypto_id, 7, 'hourly')
+    if stored is None or len(stored) < MIN_TREND_HISTORY:
+        return None
+    indicators = _score_trends([stored.prices], [None])
+    return _tag_last_known_good(_build_trend_prediction(crypto, crypto_id, indicators), stored.last_timestamp / 1000)
+
+
+def _build_trend_result(
+    crypto: str,
+    crypto_id: str,
+    history: PriceSeries | requests.exceptions.RequestException,
+    current_price: float | None,
+) -> dict[str, Any]:
+    """Predict from the loaded 7-day hourly history, falling back to stored history and then to mock data."""
+    if isinstance(history, requests.exceptions.RequestException):
+        return _last_good_trend(crypto, crypto_id) or _generate_mock_trend_prediction(crypto, crypto_id, current_price)
+
+    if len(history) < MIN_TREND_HISTORY:
+        return _generate_mock_trend_prediction(crypto, crypto_id, current_price)
+
+    return _build_trend_prediction(crypto, crypto_id, _score_trends([history.prices], [current_price]))
+
+
+def predict_crypto_price_trend(crypto: str) -> dict[str, Any]:
+    """
+    Predict the price trend (up/down) for the next 24 hours based on historical data analysis.
+
+    Uses technical analysis indicators including:
+    - Recent price momentum (last 24 hours)
+    - Moving average crossover signals
+    - Price volatility assessment
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+
+    Returns:
+        A dictionary containing the prediction, confidence level, and supporting analysis.
+    """
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return _unsupported_crypto_error(crypto)
+
+    # First, get the current price through the same cache as get_crypto_price
+    current_price = None
+    try:
+        current_price = _get_cached_price(crypto_id)
+    except requests.exceptions.RequestException:
+        pass  # Will use historical data price as fallback
+
+    # Load historical data for the last 7 days with hourly intervals for analysis
+    try:
+        history = _load_price_history(crypto_id, 7, 'hourly')
+    except requests.exceptions.RequestException as exc:
+        history = exc
+
+    return _build_trend_result(crypto, crypto_id, history, current_price)
+
+
+async def predict_crypto_price_trend_async(crypto: str) -> dict[str, Any]:
+    """
+    Async variant of ``predict_crypto_price_trend``.
+
+    The current price and the 7-day hourly history are loaded concurrently.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+
+    Returns:
+        A dictionary containing the prediction, confidence level, and supporting analysis.
+    """
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return _unsupported_crypto_error(crypto)
+
+    current_price, history = await asyncio.gather(
+        _get_cached_price_async(crypto_id),
+        _load_price_history_async(crypto_id, 7, 'hourly'),
+        return_exceptions=True,
+    )
+
+    if isinstance(current_price, requests.exceptions.RequestException):
+        current_price = None
+    elif isinstance(current_price, BaseException):
+        raise current_price
+
+    if isinstance(history, BaseException) and not isinstance(history, requests.exceptions.RequestException):
+        raise history
+
+    return _build_trend_result(crypto, crypto_id, history, current_price)
+
+
+def _build_batch_trend_result(
+    resolved: dict[str, str | None],
+    histories: dict[str, np.ndarray],
+    current_prices: dict[str, float | None],
+    as_of: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """
+    Score every coin with enough history at once and assemble the batch prediction payload.
+
+    Coins listed in ``as_of`` were scored from stored history and are tagged as last-known-good data.
+    """
+    scorable = [crypto_id for crypto_id, prices in histories.items() if len(prices) >= MIN_TREND_HISTORY]
+    rows = {crypto_id: row for row, crypto_id in enumerate(scorable)}
+    indicators = {}
+    if scorable:
+        indicators = _score_trends(
+            [histories[crypto_id] for crypto_id in scorable],
+            [current_prices.get(crypto_id) for crypto_id in scorable],
+        )
+
+    results = []
+    for crypto, crypto_id in resolved.items():
+        if not crypto_id:
+            result = _unsupported_crypto_error(crypto)
+        elif crypto_id in rows:
+            result = _build_trend_prediction(crypto, crypto_id, indicators, rows[crypto_id])
+            if as_of and crypto_id in as_of:
+                _tag_last_known_good(result, as_of[crypto_id])
+        else:
+            result = _generate_mock_trend_prediction(crypto, crypto_id, current_prices.get(crypto_id))
+        results.append({"crypto": crypto, **result})
+
+    lines = [
+        f"{result['crypto'].upper()} ({result['crypto_id']}): {result['prediction']} "
+        f"({result['confidence_percentage']}% confidence){' [MOCK DATA]' if result.get('is_mock_data') else ''}"
+        f"{' [LAST KNOWN GOOD DATA]' if result.get('is_last_known_good') else ''}"
+        for result in results
+        if result["status"] == "success"
+    ]
+    if not lines:
+        return {
+            "status": "error",
+            "error_message": "No trend predictions available for the requested cryptocurrencies.",
+            "results": results,
+        }
+
+    return {
+        "status": "success",
+        "report": "Price Trend Predictions - Next 24 Hours:\n" + "\n".join(f"• {line}" for line in lines),
+        "results": results,
+    }
+
+
+async def predict_crypto_price_trends_async(cryptos: list[str]) -> dict[str, Any]:
+    """
+    Predict the 24-hour price trend for a whole watchlist of cryptocurrencies.
+
+    The hourly histories are loaded concurrently, at most ``TREND_BATCH_CONCURRENCY``
+    at a time, alongside the single current-price lookup; all coins are then
+    scored together in one vectorized pass.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+
+    Returns:
+        A dictionary with one ``predict_crypto_price_trend``-style result per coin and a combined report.
+    """
+    resolved, error = _resolve_batch(cryptos)
+    if error:
+        return error
+
+    crypto_ids = list(dict.fromkeys(filter(None, resolved.values())))
+    current_prices, histories = await asyncio.gather(
+        _get_cached_prices_async(crypto_ids),
+        _load_histories_async(crypto_ids, 7, 'hourly'),
+        return_exceptions=True,
+    )
+    if isinstance(histories, BaseException):
+        raise histories
+    if isinstance(current_prices, requests.exceptions.RequestException):
+        current_prices = {}  # Will use historical data prices as fallback
+    elif isinstance(current_prices, BaseException):
+        raise current_prices
+
+    return _score_batch_histories(resolved, histories, current_prices)
+
+
+def _score_batch_histories(
+    resolved: dict[str, str | None],
+    histories: dict[str, PriceSeries | requests.exceptions.RequestException],
+    current_prices: dict[str, float | None],
+) -> dict[str, Any]:
+    """Score loaded histories in one pass, using stored history for coins whose load failed."""
+    prices = {}
+    as_of = {}
+    for crypto_id, history in histories.items():
+        if isinstance(history, requests.exceptions.RequestException):
+            # Score the stored history instead, tagged with its age.
+            history = _stored_history(crypto_id, 7, 'hourly')
+            if history is None:
+                prices[crypto_id] = np.empty(0)
+                continue
+            as_of[crypto_id] = history.last_timestamp / 1000
+            current_prices.pop(crypto_id, None)
+        prices[crypto_id] = history.prices
+
+    return _build_batch_trend_result(resolved, prices, current_prices, as_of)
+
+
+def _prepare_correlations(cryptos: list[str], days: int) -> tuple[dict[str, str], str, dict[str, Any] | None]:
+    """Resolve and validate a correlation request into ``({crypto_id: crypto}, interval, error)``."""
+    if len(cryptos) > MAX_CORRELATION_COINS:
+        return {}, "", {
+            "status": "error",
+            "error_message": f"A maximum of {MAX_CORRELATION_COINS} cryptocurrencies can be correlated at once.",
+        }
+    error = _validate_days(days)
+    if error:
+        return {}, "", error
+
+    coins: dict[str, str] = {}
+    for crypto in cryptos:
+        crypto_id = _resolve_crypto_id(crypto)
+        if not crypto_id:
+            return {}, "", _unsupported_crypto_error(crypto)
+        coins.setdefault(crypto_id, crypto)
+    if len(coins) < 2:
+        return {}, "", {"status": "error", "error_message": "At least two different cryptocurrencies must be provided."}
+
+    return coins, 'hourly' if days <= 90 else 'daily', None
+
+
+def _build_correlation_result(
+    coins: dict[str, str],
+    histories: dict[str, PriceSeries | requests.exceptions.RequestException],
+    days: int,
+    interval: str,
+) -> dict[str, Any]:
+    """Align the loaded histories on one grid and correlate their returns, using stored history for failed loads."""
+    series = []
+    as_of = []
+    for crypto_id, history in histories.items():
+        if isinstance(history, requests.exceptions.RequestException):
+            stored = _stored_history(crypto_id, days, interval)
+            if stored is None:
+                return {
+                    "status": "error",
+                    "error_message": _request_error_message(
+                        f"Failed to retrieve price history for {coins[crypto_id]}", history
+                    ),
+                }
+            history = stored
+            as_of.append(stored.last_timestamp / 1000)
+        series.append(history)
+
+    end_ms = max((item.last_timestamp for item in series if len(item)), default=0)
+    _, matrix = align_series(series, end_ms - days * _DAY_MS, end_ms, INTERVAL_STEP_MS[interval])
+    returns = log_returns(matrix)
+    corr, observations = correlation_matrix(returns)
+    if observations < 3:
+        return {
+            "status": "error",
+            "error_message": "Not enough overlapping price history to correlate these cryptocurrencies.",
+        }
+
+    crypto_ids = list(histories)
+    with np.errstate(invalid="ignore"):
+        total_returns = np.expm1(np.nansum(returns, axis=1)) * 100
+        volatility = np.nanstd(returns, axis=1) * 100
+    pairs = sorted(
+        (float(corr[i, j]), crypto_ids[i], crypto_ids[j])
+        for i in range(len(crypto_ids))
+        for j in range(i + 1, len(crypto_ids))
+        if not np.isnan(corr[i, j])
+    )
+
+    step = 'hour' if interval == 'hourly' else 'day'
+    report = (
+        f"Correlation of {step}ly returns of {len(crypto_ids)} cryptocurrencies over the last {days} days "
+        f"({observations} observations)."
+    )
+    if pairs:
+        report += f" Most correlated: {pairs[-1][1]} and {pairs[-1][2]} ({pairs[-1][0]:.2f})."
+    if len(pairs) > 1:
+        report += f" Least correlated: {pairs[0][1]} and {pairs[0][2]} ({pairs[0][0]:.2f})."
+
+    result = {
+        "status": "success",
+        "report": report,
+        "coins": crypto_ids,
+        "days": days,
+        "source_interval": interval,
+        "observations": observations,
+        "matrix": [[None if math.isnan(value) else round(value, 4) for value in row] for row in corr.tolist()],
+        "returns": [
+            {
+                "crypto": coins[crypto_id],
+                "crypto_id": crypto_id,
+                "total_return_percentage": round(float(total), 2),
+                f"volatility_per_{step}_percentage": round(float(vol), 4),
+            }
+            for crypto_id, total, vol in zip(crypto_ids, total_returns, volatility)
+        ],
+    }
+    return _tag_last_known_good(result, min(as_of)) if as_of else result
+
+
+async def get_crypto_correlations_async(cryptos: list[str], days: int = 30) -> dict[str, Any]:
+    """
+    Correlate the price returns of several cryptocurrencies to show which coins move together.
+
+    The stored histories (hourly up to 90 days, daily beyond) are sampled on one
+    common time grid and the correlation matrix of their log returns is computed
+    in a single NumPy pass over the steps where every coin has a price.
+
+    Args:
+        cryptos: Two or more cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+        days: Number of days to correlate over (default: 30, max 365)
+
+    Returns:
+        A dictionary with the coin IDs, the correlation matrix in that order and each coin's return and volatility.
+    """
+    coins, interval, error = _prepare_correlations(cryptos, days)
+    if error:
+        return error
+
+    histories = await _load_histories_async(list(coins), days, interval)
+    return _build_correlation_result(coins, histories, days, interval)
+
+
+def _prepare_forecast(cryptos: list[str], paths: int) -> tuple[dict[str, str | None], dict[str, Any] | None]:
+    """Resolve a forecast watchlist and validate the number of simulated paths."""
+    if not 100 <= paths <= FORECAST_MAX_PATHS:
+        return {}, {
+            "status": "error",
+            "error_message": f"The number of simulated paths must be between 100 and {FORECAST_MAX_PATHS}.",
+        }
+    return _resolve_batch(cryptos)
+
+
+def _build_forecast(
+    crypto: str, crypto_id: str, price: float, drift: float, volatility: float, observations: int,
+    bands: np.ndarray, probability_up: np.ndarray, paths: int,
+) -> dict[str, Any]:
+    """Describe the simulated bands of one coin as a forecast result."""
+    horizons = {}
+    lines = []
+    for (label, hours), quantiles, up in zip(FORECAST_HORIZONS, bands.tolist(), probability_up.tolist()):
+        band = {f"p{percentile:g}": round(value, 2) for percentile, value in zip(FORECAST_PERCENTILES, quantiles)}
+        horizons[label] = {"hours": hours, **band, "probability_up_percentage": round(up * 100, 1)}
+        lines.append(
+            f"• {label}: median ${quantiles[len(quantiles) // 2]:,.2f}, "
+            f"90% band ${quantiles[0]:,.2f} - ${quantiles[-1]:,.2f}, {up * 100:.0f}% chance of ending higher"
+        )
+
+    report = (
+        f"Price Forecast for {crypto.upper()} ({crypto_id}) from ${price:,.2f}, "
+        f"simulated over {paths:,} paths (hourly drift {drift * 100:+.3f}%, volatility {volatility * 100:.2f}%):\n"
+        + "\n".join(lines) + "\n\n"
+        "⚠️ DISCLAIMER: These bands assume prices keep the drift and volatility of the last "
+        f"{FORECAST_LOOKBACK_DAYS} days and should not be considered financial advice."
+    )
+    return {
+        "status": "success",
+        "report": report,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "current_price_usd": price,
+        "drift_per_hour_percentage": round(drift * 100, 4),
+        "volatility_per_hour_percentage": round(volatility * 100, 4),
+        "history_points": observations + 1,
+        "paths": paths,
+        "horizons": horizons,
+    }
+
+
+def _build_forecast_result(
+    resolved: dict[str, str | None],
+    histories: dict[str, PriceSeries | requests.exceptions.RequestException],
+    paths: int,
+) -> dict[str, Any]:
+    """Fit and simulate every coin with enough history at once, using stored history for failed loads."""
+    prices = {}
+    as_of = {}
+    for crypto_id, history in histories.items():
+        if isinstance(history, requests.exceptions.RequestException):
+            history = _stored_history(crypto_id, FORECAST_LOOKBACK_DAYS, 'hourly')
+            if history is None:
+                continue
+            as_of[crypto_id] = history.last_timestamp / 1000
+        if len(history) >= MIN_FORECAST_HISTORY:
+            prices[crypto_id] = history.prices
+
+    crypto_ids = list(prices)
+    drift, volatility, observations = fit_drift_volatility([prices[crypto_id] for crypto_id in crypto_ids])
+    latest = np.array([prices[crypto_id][-1] for crypto_id in crypto_ids], dtype=np.float64)
+    bands, probability_up = simulate_price_bands(
+        latest, drift, volatility, [hours for _, hours in FORECAST_HORIZONS], paths, np.random.default_rng()
+    )
+    rows = {crypto_id: row for row, crypto_id in enumerate(crypto_ids)}
+
+    results = []
+    for crypto, crypto_id in resolved.items():
+        if not crypto_id:
+            result = _unsupported_crypto_error(crypto)
+        elif crypto_id not in rows:
+            result = {
+                "status": "error",
+                "error_message": f"Not enough hourly price history to forecast {crypto} ({crypto_id}).",
+            }
+        else:
+            row = rows[crypto_id]
+            result = _build_forecast(
+                crypto, crypto_id, float(latest[row]), float(drift[row]), float(volatility[row]),
+                int(observations[row]), bands[row], probability_up[row], paths,
+            )
+            if crypto_id in as_of:
+                _tag_last_known_good(result, as_of[crypto_id])
+        results.append({"crypto": crypto, **result})
+
+    reports = [result["report"] for result in results if result["status"] == "success"]
+    if not reports:
+        return {
+            "status": "error",
+            "error_message": "No price forecasts available for the requested cryptocurrencies.",
+            "results": results,
+        }
+
+    return {
+        "status": "success",
+        "report": "\n\n".join(reports),
+        "results": results,
+    }
+
+
+async def forecast_crypto_prices_async(cryptos: list[str], paths: int = FORECAST_DEFAULT_PATHS) -> dict[str, Any]:
+    """
+    Forecast 24-hour and 7-day price bands for one or more cryptocurrencies with a Monte Carlo simulation.
+
+    Drift and volatility are fitted from the last 30 days of stored hourly
+    prices, then ``paths`` geometric Brownian motion paths per coin are
+    simulated in one batched NumPy pass and summarised as the 5th, 25th,
+    50th, 75th and 95th percentile prices at each horizon.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+        paths: Number of simulated paths per coin (100 to 100000, default 10000)
+
+    Returns:
+        A dictionary with one forecast per coin and a combined report.
+    """
+    resolved, error = _prepare_forecast(cryptos, paths)
+    if error:
+        return error
+
+    crypto_ids = list(dict.fromkeys(filter(None, resolved.values())))
+    histories = await _load_histories_async(crypto_ids, FORECAST_LOOKBACK_DAYS, 'hourly')
+    # The simulation is CPU-bound for up to a second, so it runs off the event loop.
+    return await asyncio.to_thread(_build_forecast_result, resolved, histories, paths)
+
+
+def _prepare_backtest(
+    cryptos: list[str], days: int, horizon: int
+) -> tuple[dict[str, str | None], dict[str, Any] | None]:
+    """Resolve a backtest watchlist and validate its period and horizon."""
+    error = _validate_days(days)
+    if error:
+        return {}, error
+    if not 1 <= horizon <= BACKTEST_MAX_HORIZON:
+        return {}, {
+            "status": "error",
+            "error_message": f"The backtest horizon must be between 1 and {BACKTEST_MAX_HORIZON} hours.",
+        }
+    return _resolve_batch(cryptos)
+
+
+def _backtest_series(
+    crypto_id: str, days: int, loaded: PriceSeries | requests.exceptions.RequestException
+) -> tuple[PriceSeries, float | None]:
+    """
+    Return the stored hourly series of the last ``days`` once the recent part has been refreshed.
+
+    ``loaded`` is the outcome of refreshing the last 90 days; when that failed
+    the stored series is replayed as is and its last point time is returned.
+    """
+    series = get_price_store().read(crypto_id, 'hourly').since(int(time.time() * 1000) - days * _DAY_MS)
+    if isinstance(loaded, requests.exceptions.RequestException) and len(series):
+        return series, series.last_timestamp / 1000
+    return series, None
+
+
+def _percentage(fraction: float | None, digits: int = 1) -> float | None:
+    """Express a fraction as a rounded percentage, passing ``None`` through."""
+    return None if fraction is None else round(fraction * 100, digits)
+
+
+def _build_backtest_result(
+    resolved: dict[str, str | None],
+    histories: dict[str, tuple[PriceSeries, float | None]],
+    days: int,
+    horizon: int,
+) -> dict[str, Any]:
+    """Replay the trend signals over every coin's history and report hit rates and throughput."""
+    started = time.perf_counter()
+    stats = {crypto_id: backtest_trend_signals(series.prices, horizon) for crypto_id, (series, _) in histories.items()}
+    elapsed = time.perf_counter() - started
+    windows = sum(result["windows"] for result in stats.values())
+
+    results = []
+    for crypto, crypto_id in resolved.items():
+        if not crypto_id:
+            results.append({"crypto": crypto, **_unsupported_crypto_error(crypto)})
+            continue
+        series, as_of = histories[crypto_id]
+        result = stats[crypto_id]
+        if not result["windows"]:
+            results.append({
+                "crypto": crypto,
+                "status": "error",
+                "error_message": f"Not enough stored hourly price history to backtest {crypto} ({crypto_id}).",
+            })
+            continue
+
+        hit_rate = result["hit_rate"]
+        report = (
+            f"{crypto.upper()} ({crypto_id}): "
+            + (f"{hit_rate * 100:.1f}% of {result['calls']:,} UP/DOWN calls right" if hit_rate is not None else "no UP/DOWN calls")
+            + f" over {result['windows']:,} hourly windows (always-UP baseline {result['up_move_rate'] * 100:.1f}%)"
+        )
+        entry = {
+            "crypto": crypto,
+            "status": "success",
+            "report": report,
+            "crypto_id": crypto_id,
+            "start": _format_time(series.first_timestamp),
+            "end": _format_time(series.last_timestamp),
+            "history_points": len(series),
+            "windows": result["windows"],
+            "predictions": result["predictions"],
+            "hit_rate_percentage": _percentage(hit_rate),
+            "signals": {
+                name.removesuffix("_vote"): {"calls": signal["calls"], "hit_rate_percentage": _percentage(signal["hit_rate"])}
+                for name, signal in result["signals"].items()
+            },
+            "up_move_rate_percentage": _percentage(result["up_move_rate"]),
+            "mean_return_after_up_percentage": _percentage(result["mean_return_after_up"], 3),
+            "mean_return_after_down_percentage": _percentage(result["mean_return_after_down"], 3),
+        }
+        if as_of is not None:
+            _tag_last_known_good(entry, as_of)
+        results.append(entry)
+
+    reports = [result["report"] for result in results if result["status"] == "success"]
+    if not reports:
+        return {
+            "status": "error",
+            "error_message": "No stored price history to backtest for the requested cryptocurrencies.",
+            "results": results,
+        }
+
+    return {
+        "status": "success",
+        "report": (
+            f"Backtest of the {horizon}-hour trend prediction over the last {days} days: "
+            f"{windows:,} windows scored in {elapsed * 1000:.1f} ms.\n" + "\n".join(f"• {line}" for line in reports)
+        ),
+        "horizon_hours": horizon,
+        "windows_evaluated": windows,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "windows_per_second": round(windows / elapsed) if elapsed > 0 else None,
+        "results": results,
+    }
+
+
+async def backtest_crypto_price_trends_async(cryptos: list[str], days: int = 365, horizon: int = 24) -> dict[str, Any]:
+    """
+    Backtest the signals of ``predict_crypto_price_trend`` over stored hourly history.
+
+    The prediction is replayed at every stored hour with 72 hours of history
+    before it and scored against the price ``horizon`` hours later, for the
+    combined prediction and for each of its four signals. The last 90 days
+    (the hourly range CoinGecko serves) are refreshed first; older hours are
+    used as far back as the local store holds them.
+
+    Args:
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
+        days: Number of days to replay (default: 365, max 365)
+        horizon: Hours ahead each prediction is judged at (default: 24, max 168)
+
+    Returns:
+        A dictionary with per-coin hit rates, the always-UP baseline and the replay throughput.
+    """
+    resolved, error = _prepare_backtest(cryptos, days, horizon)
+    if error:
+        return error
+
+    crypto_ids = list(dict.fromkeys(filter(None, resolved.values())))
+    loaded = await _load_histories_async(crypto_ids, min(days, 90), 'hourly')
+
+    def replay() -> dict[str, Any]:
+        histories = {crypto_id: _backtest_series(crypto_id, days, loaded[crypto_id]) for crypto_id in crypto_ids}
+        return _build_backtest_result(resolved, histories, days, horizon)
+
+    # Reading up to a year of hourly points per coin and replaying them is blocking work for the event loop.
+    return await asyncio.to_thread(replay)
+
+
+def _prepare_anomalies(crypto: str, hours: int) -> tuple[str, dict[str, Any] | None]:
+    """Resolve an anomaly lookup and validate its look-back window."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", _unsupported_crypto_error(crypto)
+    if not 1 <= hours <= ANOMALY_HISTORY_DAYS * 24:
+        return "", {
+            "status": "error",
+            "error_message": f"The anomaly look-back must be between 1 and {ANOMALY_HISTORY_DAYS * 24} hours.",
+        }
+    return crypto_id, None
+
+
+def _build_anomaly_result(crypto: str, crypto_id: str, hours: int, as_of: float | None) -> dict[str, Any]:
+    """Describe the anomalies the detector of ``crypto_id`` flagged in the last ``hours``."""
+    state = _anomaly_book.snapshot(crypto_id, int(time.time() * 1000) - hours * 3_600_000)
+    if state is None or not state["warmed_up"]:
+        return {
+            "status": "error",
+            "error_message": f"Not enough price history yet to detect anomalies for {crypto} ({crypto_id}).",
+        }
+
+    typical_move = state["hourly_std"] * 100
+    typical = f"Typical hourly move: ±{typical_move:.2f}%."
+    anomalies = [
+        {
+            **anomaly,
+            "time": _format_time(anomaly["timestamp"]),
+            "direction": "up" if anomaly["change_percentage"] > 0 else "down",
+            "over_minutes": round((anomaly["timestamp"] - anomaly["previous_timestamp"]) / 60_000),
+        }
+        for anomaly in state["anomalies"]
+    ]
+    if anomalies:
+        report = (
+            f"{len(anomalies)} unusual price move{'s' if len(anomalies) != 1 else ''} "
+            f"for {crypto.upper()} ({crypto_id}) in the last {hours} hours:\n"
+            + "\n".join(
+                f"• {anomaly['time']}: {anomaly['change_percentage']:+.2f}% in {anomaly['over_minutes']} minutes "
+                f"to ${anomaly['price_usd']:,.2f} (z-score {anomaly['z_score']:+.1f})"
+                for anomaly in anomalies
+            )
+            + f"\n{typical}"
+        )
+    else:
+        report = f"No unusual price moves for {crypto.upper()} ({crypto_id}) in the last {hours} hours. {typical}"
+
+    result = {
+        "status": "success",
+        "report": report,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "hours": hours,
+        "anomalies": anomalies,
+        "latest_price_usd": state["last_price"],
+        "latest_timestamp": state["last_timestamp"],
+        "typical_hourly_move_percentage": round(typical_move, 3),
+        "z_threshold": ANOMALY_Z_THRESHOLD,
+        "prices_observed": state["observations"],
+    }
+    return _tag_last_known_good(result, as_of) if as_of is not None else result
+
+
+def _observe_stored_history(
+    crypto_id: str, loaded: PriceSeries | requests.exceptions.RequestException
+) -> tuple[float | None, dict[str, Any] | None]:
+    """
+    Feed the detector the hourly points it has not seen yet, returning ``(as_of, error)``.
+
+    ``loaded`` is the outcome of topping up the stored series. When that failed
+    the stored series is used and ``as_of`` is the time of its last point; with
+    nothing stored, a detector kept current by the live feed is still reported.
+    """
+    if not isinstance(loaded, requests.exceptions.RequestException):
+        _anomaly_book.observe_series(crypto_id, loaded)
+        return None, None
+    stored = _stored_history(crypto_id, ANOMALY_HISTORY_DAYS, 'hourly')
+    if stored is not None:
+        _anomaly_book.observe_series(crypto_id, stored)
+        return stored.last_timestamp / 1000, None
+    if _anomaly_book.snapshot(crypto_id, 0) is not None:
+        return None, None
+    return None, {"status": "error", "error_message": _request_error_message("Failed to retrieve price history", loaded)}
+
+
+async def get_crypto_price_anomalies_async(crypto: str, hours: int = 24) -> dict[str, Any]:
+    """
+    Report unusual price moves of a cryptocurrency in the last ``hours``.
+
+    A per-coin detector keeps exponentially weighted statistics of hourly-scaled
+    returns and flags moves whose z-score reaches ``ANOMALY_Z_THRESHOLD``. It is
+    fed every live price of the streaming feed and, on each call, only the
+    stored hourly points it has not seen yet, so repeated questions neither
+    download nor rescan the week of history.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        hours: How many hours back to report anomalies for (default: 24, max 168)
+
+    Returns:
+        A dictionary with the flagged moves, their z-scores and the coin's typical hourly move.
+    """
+    crypto_id, error = _prepare_anomalies(crypto, hours)
+    if error:
+        return error
+
+    try:
+        loaded = await _load_price_history_async(crypto_id, ANOMALY_HISTORY_DAYS, 'hourly')
+    except requests.exceptions.RequestException as exc:
+        loaded = exc
+    as_of, error = _observe_stored_history(crypto_id, loaded)
+    if error:
+        return error
+
+    return _build_anomaly_result(crypto, crypto_id, hours, as_of)
+
+
+def _generate_mock_trend_prediction(crypto: str, crypto_id: str, current_price: float | None = None) -> dict[str, Any]:
+    """
+    Generate mock trend prediction as fallback when API is unavailable.
+
+    Args:
+        crypto: The cryptocurrency name
+        crypto_id: The cryptocurrency ID
+        current_price: Optional real current price to use instead of mock price
+    """
+    import random
+
+    # Generate mock prediction
+    prediction = random.choice(["UP", "DOWN", "NEUTRAL"])
+    confidence = random.uniform(45, 70)
+    
+    # Use real price if available, otherwise generate mock
+    if current_price is None:
+        current_price = random.uniform(20000, 80000) if crypto_id == 'bitcoin' else random.uniform(100, 5000)
+        is_mock_price = True
+    else:
+        is_mock_price = False
+    
+    momentum = random.uniform(-5, 5)
+    volatility = random.uniform(1, 8)
+
+    if not is_mock_price:
+        # Using real price data
+        signals = [
+            "[PARTIAL MOCK DATA] Using real current price, but historical analysis is simulated",
+            f"Simulated momentum: {momentum:+.2f}%",
+            f"Simulated volatility: {volatility:.2f}%",
+        ]
+        note_text = "[Note: Current price is real-time, but trend analysis is simulated due to historical data unavailability]\n\n"
+    else:
+        # Full mock data
+        signals = [
+            "[MOCK DATA] This is simulated prediction data for demonstration purposes",
+            f"Simulated momentum: {momentum:+.2f}%",
+            f"Simulated volatility: {volatility:.2f}%",
+        ]
+        note_text = "[Note: Real-time data currently unavailable, showing simulated prediction for demonstration purposes]\n\n"
+
+    if prediction == "UP":
+        trend_description = "likely to increase"
+    elif prediction == "DOWN":
+        trend_description = "likely to decrease"
+    else:
+        trend_description = "expected to remain relatively stable"
+
+    report_prefix = "[MOCK DATA] " if is_mock_price else ""
+    report = (
+        f"{report_prefix}Price Trend Prediction for {crypto.upper()} ({crypto_id}) - Next 24 Hours:\n\n"
+        f"📊 PREDICTION: {prediction}\n"
+        f"📈 Current Price: ${current_price:,.2f}\n"
+        f"🎯 Confidence: {confidence:.1f}%\n\n"
+        f"The price is {trend_description} over the next 24 hours.\n\n"
+        f"{note_text}"
+        "⚠️ DISCLAIMER: This prediction is based on technical analysis of historical data and should not be considered financial advice. "
+        "Cryptocurrency markets are highly volatile and past performance does not guarantee future results."
+    )
+
+    return {
+        "status": "success",
+        "report": report,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "prediction": prediction,
+        "confidence_percentage": round(confidence, 1),
+        "current_price_usd": current_price,
+        "momentum_24h": round(momentum, 2),
+        "volatility_percentage": round(volatility, 2),
+        "bullish_signals": random.randint(0, 4),
+        "bearish_signals": random.randint(0, 4),
+        "signals": signals,
+        "is_mock_data": True,
+        "is_mock_price": is_mock_price,
+    }
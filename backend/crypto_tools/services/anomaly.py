@@ -0,0 +1,169 @@
+"""Incremental price anomaly detection with exponentially weighted return statistics."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any
+
+from .series import PriceSeries
+
+_HOUR_MS = 3_600_000
+
+
+class EwmaDetector:
+    """
+    Exponentially weighted mean and variance of one coin's returns, updated in O(1) per price.
+
+    Each log return is scaled to an hourly equivalent (divided by the square
+    root of the elapsed hours) so ticks from the live feed and hourly points
+    from the history store share one distribution. The weight of a return
+    decays with elapsed time at ``half_life_ms``. A return whose z-score
+    against the statistics before it reaches ``threshold`` is an anomaly.
+    """
+
+    __slots__ = (
+        "half_life_ms", "threshold", "warmup", "min_step_ms",
+        "last_timestamp", "last_price", "mean", "variance", "observations", "anomalies",
+    )
+
+    def __init__(self, half_life_ms: float, threshold: float, warmup: int, min_step_ms: int, max_anomalies: int = 100):
+        self.half_life_ms = half_life_ms
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_step_ms = min_step_ms
+        self.last_timestamp: int | None = None
+        self.last_price: float | None = None
+        self.mean = 0.0
+        self.variance = 0.0
+        self.observations = 0
+        self.anomalies: deque[dict[str, Any]] = deque(maxlen=max_anomalies)
+
+    def observe(self, timestamp: int, price: float) -> dict[str, Any] | None:
+        """
+        Update the statistics with a new price and return the anomaly it forms, if any.
+
+        Prices not newer than the last observed one by at least ``min_step_ms``
+        are ignored, which keeps out-of-order points and sub-minute feed noise
+        from being scaled up into false alarms.
+        """
+        if price <= 0 or not math.isfinite(price):
+            return None
+        if self.last_timestamp is None:
+            self.last_timestamp, self.last_price = timestamp, price
+            return None
+        elapsed = timestamp - self.last_timestamp
+        if elapsed < self.min_step_ms:
+            return None
+
+        change = math.log(price / self.last_price)
+        value = change / math.sqrt(elapsed / _HOUR_MS)
+        deviation = value - self.mean
+        anomaly = None
+        if self.observations >= self.warmup and self.variance > 0:
+            z_score = deviation / math.sqrt(self.variance)
+            if abs(z_score) >= self.threshold:
+                anomaly = {
+                    "timestamp": timestamp,
+                    "price_usd": price,
+                    "previous_price_usd": self.last_price,
+                    "previous_timestamp": self.last_timestamp,
+                    "change_percentage": round(math.expm1(change) * 100, 2),
+                    "z_score": round(z_score, 2),
+                }
+                self.anomalies.append(anomaly)
+
+        # Time-decayed weight of the new return, then the incremental EW mean / variance update.
+        alpha = 1.0 - 0.5 ** (elapsed / self.half_life_ms)
+        increment = alpha * deviation
+        self.mean += increment
+        self.variance = (1.0 - alpha) * (self.variance + deviation * increment)
+        self.observations += 1
+        self.last_timestamp, self.last_price = timestamp, price
+        return anomaly
+
+    def snapshot(self, since_ms: int) -> dict[str, Any]:
+        """Return the current statistics and the anomalies at or after ``since_ms``."""
+        return {
+            "observations": self.observations,
+            "last_timestamp": self.last_timestamp,
+            "last_price": self.last_price,
+            "hourly_mean": self.mean,
+            "hourly_std": math.sqrt(self.variance),
+            "warmed_up": self.observations >= self.warmup,
+            "anomalies": [anomaly for anomaly in self.anomalies if anomaly["timestamp"] >= since_ms],
+        }
+
+
+class AnomalyBook:
+    """Per-coin ``EwmaDetector`` instances fed by the live price feed and the history store."""
+
+    def __init__(
+        self,
+        half_life_ms: float,
+        threshold: float,
+        warmup: int = 24,
+        min_step_ms: int = 300_000,
+        max_coins: int = 1024,
+    ):
+        self.half_life_ms = half_life_ms
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_step_ms = min_step_ms
+        self.max_coins = max_coins
+        self._detectors: dict[str, EwmaDetector] = {}
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.flagged = 0
+
+    def _detector(self, coin_id: str) -> EwmaDetector:
+        detector = self._detectors.get(coin_id)
+        if detector is None:
+            if len(self._detectors) >= self.max_coins:
+                self._detectors.pop(next(iter(self._detectors)))
+            detector = EwmaDetector(self.half_life_ms, self.threshold, self.warmup, self.min_step_ms)
+            self._detectors[coin_id] = detector
+        return detector
+
+    def observe(self, coin_id: str, timestamp: int, price: float) -> dict[str, Any] | None:
+        """Feed one price of ``coin_id`` and return the anomaly it forms, if any."""
+        with self._lock:
+            self.ticks += 1
+            anomaly = self._detector(coin_id).observe(timestamp, price)
+            if anomaly is not None:
+                self.flagged += 1
+            return anomaly
+
+    def observe_series(self, coin_id: str, series: PriceSeries) -> int:
+        """Feed the points of ``series`` newer than the detector's last price; returns how many were new."""
+        with self._lock:
+            detector = self._detector(coin_id)
+            if detector.last_timestamp is not None:
+                series = series.since(detector.last_timestamp + 1)
+            for timestamp, price in zip(series.timestamps.tolist(), series.prices.tolist()):
+                self.ticks += 1
+                if detector.observe(timestamp, price) is not None:
+                    self.flagged += 1
+            return len(series)
+
+    def snapshot(self, coin_id: str, since_ms: int) -> dict[str, Any] | None:
+        """Return the detector state of ``coin_id``, or ``None`` if it has seen no prices."""
+        with self._lock:
+            detector = self._detectors.get(coin_id)
+            return detector.snapshot(since_ms) if detector is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._detectors.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many coins are tracked and how many prices and anomalies were seen."""
+        with self._lock:
+            return {
+                "coins": len(self._detectors),
+                "prices_observed": self.ticks,
+                "anomalies_flagged": self.flagged,
+                "z_threshold": self.threshold,
+                "half_life_hours": self.half_life_ms / _HOUR_MS,
+            }
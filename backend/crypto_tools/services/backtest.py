@@ -0,0 +1,100 @@
+"""Vectorized replay of the trend-prediction signals over stored price history."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .indicators import TREND_LOOKBACK, score_signals
+
+# Signal votes replayed by the backtest, in the order ``predict_crypto_price_trend`` reports them.
+SIGNAL_VOTES = ("momentum_vote", "ma_cross_vote", "ma_72h_vote", "recent_vote")
+
+
+def rolling_trend_indicators(prices: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Compute the trend indicators of every ``TREND_LOOKBACK``-point window of ``prices`` at once.
+
+    Entry ``i`` of each array holds what ``compute_trend_indicators`` returns
+    for the window ending at point ``i + TREND_LOOKBACK - 1``, with that
+    point's price as the current price. Moving averages come from one
+    cumulative sum and the 24-point volatility from a strided view, so the
+    cost is linear in the length of the series.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < TREND_LOOKBACK:
+        return {}
+
+    # Offsetting by the first price keeps the cumulative sums small and the window means precise.
+    base = prices[0]
+    sums = np.r_[0.0, np.cumsum(prices - base)]
+    ends = np.arange(TREND_LOOKBACK, len(prices) + 1)
+
+    def trailing_mean(window: int) -> np.ndarray:
+        return (sums[ends] - sums[ends - window]) / window + base
+
+    ma_12h, ma_24h = trailing_mean(12), trailing_mean(24)
+    prev_24h = 2 * trailing_mean(48) - ma_24h  # mean of the 24 points before the last 24
+    ma_72h = trailing_mean(72)
+
+    current = prices[TREND_LOOKBACK - 1:]
+    momentum = (ma_24h - prev_24h) / prev_24h * 100
+    volatility = sliding_window_view(prices, 24)[TREND_LOOKBACK - 24:].std(axis=1) / ma_24h * 100
+    recent_change = (current - prices[TREND_LOOKBACK - 6:len(prices) - 5]) / prices[TREND_LOOKBACK - 6:len(prices) - 5] * 100
+
+    indicators = {
+        "current_price": current,
+        "momentum": momentum,
+        "ma_12h": ma_12h,
+        "ma_24h": ma_24h,
+        "ma_72h": ma_72h,
+        "volatility": volatility,
+        "recent_change": recent_change,
+    }
+    indicators.update(score_signals(momentum, ma_12h, ma_24h, ma_72h, current, recent_change, volatility))
+    return indicators
+
+
+def _hit_rate(votes: np.ndarray, moves: np.ndarray) -> dict[str, Any]:
+    """Return how often the non-zero ``votes`` matched the direction of the following ``moves``."""
+    called = votes != 0
+    calls = int(np.count_nonzero(called))
+    hits = int(np.count_nonzero(np.sign(moves[called]) == votes[called]))
+    return {"calls": calls, "hit_rate": hits / calls if calls else None}
+
+
+def backtest_trend_signals(prices: np.ndarray, horizon: int = 24) -> dict[str, Any]:
+    """
+    Replay the trend prediction at every point of ``prices`` and score it against the move ``horizon`` points later.
+
+    Every point with ``TREND_LOOKBACK`` points of history and ``horizon``
+    points of future is one window. Returns the number of windows, the hit
+    rate of the UP / DOWN predictions and of each signal vote on its own,
+    the share of windows that moved up (the hit rate of always predicting UP)
+    and the mean forward return after UP and DOWN predictions.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < TREND_LOOKBACK + horizon:
+        return {"windows": 0}
+
+    indicators = rolling_trend_indicators(prices[:-horizon])
+    start = indicators["current_price"]
+    moves = (prices[TREND_LOOKBACK - 1 + horizon:] - start) / start
+    prediction = indicators["prediction"]
+    up, down = prediction > 0, prediction < 0
+
+    return {
+        "windows": len(moves),
+        "predictions": {
+            "up": int(np.count_nonzero(up)),
+            "down": int(np.count_nonzero(down)),
+            "neutral": int(np.count_nonzero(prediction == 0)),
+        },
+        **_hit_rate(prediction, moves),
+        "signals": {name: _hit_rate(indicators[name], moves) for name in SIGNAL_VOTES},
+        "up_move_rate": float(np.count_nonzero(moves > 0) / len(moves)),
+        "mean_return_after_up": float(moves[up].mean()) if up.any() else None,
+        "mean_return_after_down": float(moves[down].mean()) if down.any() else None,
+    }
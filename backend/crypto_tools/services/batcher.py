@@ -0,0 +1,100 @@
+"""Micro-batching of concurrent keyed lookups into single upstream calls."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable
+
+
+class MicroBatcher:
+    """
+    Merge concurrent ``load`` calls arriving within ``window`` seconds into one batched fetch.
+
+    ``fetch_many`` receives the distinct keys of a batch and returns a mapping of
+    key to value; keys missing from the mapping resolve to ``None``. A batch is
+    flushed when the window elapses or ``max_batch_size`` keys are pending,
+    whichever comes first. A ``window`` of ``0`` disables batching.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[list[str]], Awaitable[dict[str, Any]]],
+        window: float,
+        max_batch_size: int,
+    ):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # Futures and timers belong to one event loop, so pending batches are per loop.
+        self._pending: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingBatch] = weakref.WeakKeyDictionary()
+        self.batches = 0
+        self.batched_keys = 0
+
+    async def load(self, key: str) -> Any:
+        """Return the value for ``key`` from the next batched fetch."""
+        if self.window <= 0 or self.max_batch_size <= 1:
+            self.batches += 1
+            self.batched_keys += 1
+            return (await self.fetch_many([key])).get(key)
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = _PendingBatch()
+            batch.timer = loop.call_later(self.window, self._flush, loop, batch)
+
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            if len(batch.futures) >= self.max_batch_size:
+                self._flush(loop, batch)
+
+        return await asyncio.shield(future)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, batch: _PendingBatch) -> None:
+        """Detach ``batch`` from the pending slot and start fetching it."""
+        if self._pending.get(loop) is batch:
+            del self._pending[loop]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        batch.task = loop.create_task(self._run(batch))
+
+    async def _run(self, batch: _PendingBatch) -> None:
+        """Fetch all keys of ``batch`` at once and fan the results out to the waiters."""
+        keys = list(batch.futures)
+        self.batches += 1
+        self.batched_keys += len(keys)
+        try:
+            values = await self.fetch_many(keys)
+        except BaseException as exc:  # noqa: BLE001 - delivered to every waiter
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for key, future in batch.futures.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the number of upstream batches and the keys they carried."""
+        return {
+            "batches": self.batches,
+            "batched_keys": self.batched_keys,
+            "average_batch_size": round(self.batched_keys / self.batches, 2) if self.batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+class _PendingBatch:
+    """Keys collected during one batching window."""
+
+    def __init__(self) -> None:
+        self.futures: dict[str, asyncio.Future] = {}
+        self.timer: asyncio.TimerHandle | None = None
+        self.task: asyncio.Task | None = None
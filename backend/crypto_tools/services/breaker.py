@@ -0,0 +1,151 @@
+"""Per-endpoint circuit breakers guarding CoinGecko calls."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed calls that open a breaker, seconds it stays open before a
+# half-open trial, and how many trial calls may run at once while half-open.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("COINGECKO_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("COINGECKO_BREAKER_RESET_SECONDS", "30"))
+BREAKER_HALF_OPEN_CALLS = int(os.getenv("COINGECKO_BREAKER_HALF_OPEN_CALLS", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and then
+    rejects calls with ``CircuitOpenError`` for ``reset_timeout`` seconds. After
+    that it lets ``half_open_max_calls`` trial calls through: a successful trial
+    closes it again, a failed one reopens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_SECONDS,
+        half_open_max_calls: int = BREAKER_HALF_OPEN_CALLS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self.rejected = 0
+        self.transitions: deque[dict[str, Any]] = deque(maxlen=20)
+
+    def _transition(self, state: str) -> None:
+        """Move to ``state``; caller must hold the lock."""
+        if state == self._state:
+            return
+        self.transitions.append({"from": self._state, "to": state, "at": time.time()})
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit breaker '{self.name}' {self._state} -> {state}")
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        self._trials = 0
+
+    def _current_state(self) -> str:
+        """Return the state, moving an expired open breaker to half-open; caller must hold the lock."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``CircuitOpenError`` without touching the network."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._trials < self.half_open_max_calls:
+                self._trials += 1
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"Circuit breaker '{self.name}' is open; retry in {retry_in:.0f}s")
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy upstream."""
+        with self._lock:
+            self._failures = 0
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker when the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give back a half-open trial slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the state, counters and recent transitions for monitoring."""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected_calls": self.rejected,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "transitions": list(self.transitions),
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``endpoint``, creating it on first use."""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker(endpoint))
+    return breaker
+
+
+def get_circuit_breaker_states() -> dict[str, dict[str, Any]]:
+    """Return a snapshot of every endpoint breaker, keyed by endpoint."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {endpoint: breaker.snapshot() for endpoint, breaker in sorted(breakers.items())}
+
+
+def reset_circuit_breakers() -> None:
+    """Forget all breakers, closing every circuit."""
+    with _breakers_lock:
+        _breakers.clear()
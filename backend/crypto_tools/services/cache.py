@@ -0,0 +1,334 @@
+"""In-process caching primitives for CoinGecko lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    Loads go through ``get_or_load`` / ``get_or_load_async``, which coalesce
+    concurrent misses for the same key into a single loader call
+    ("single-flight"). Loader results of ``None`` are returned but not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_flights: dict[Hashable, _Flight] = {}
+        self._async_flights: dict[tuple[int, Hashable], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        """Return ``(True, value)`` for a fresh entry; caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for ``key`` or ``None`` when absent or expired."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry when full."""
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.coalesced = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` once per concurrent miss."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            flight = self._sync_flights.get(key)
+            if flight is None:
+                flight = self._sync_flights[key] = _Flight()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            value = loader()
+        except BaseException as exc:
+            flight.fail(exc)
+            raise
+        else:
+            self.set(key, value)
+            flight.finish(value)
+            return value
+        finally:
+            with self._lock:
+                self._sync_flights.pop(key, None)
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of ``get_or_load``; waiters share the leader's result."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            future = self._async_flights.get(flight_key)
+            if future is None:
+                future = self._async_flights[flight_key] = loop.create_future()
+                leader = True
+                self.misses += 1
+            else:
+                leader = False
+                self.coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            value = await loader()
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+                # Mark the exception as retrieved when nobody else is waiting.
+                future.exception()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._async_flights.pop(flight_key, None)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit, miss and coalesce counters together with the cache configuration."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+            }
+
+
+class StaleWhileRevalidateCache:
+    """
+    Bounded LRU cache that keeps serving aging entries while refreshing them in the background.
+
+    ``policy(key)`` returns ``(fresh_for, stale_for)`` in seconds. An entry younger
+    than ``fresh_for`` is served as is; one younger than ``stale_for`` is served
+    immediately and a single background reload is started for its key; older
+    entries are reloaded inline. Loader results of ``None`` are returned but not
+    cached, and a failed background reload leaves the stale entry in place.
+    """
+
+    def __init__(self, policy: Callable[[Hashable], tuple[float, float]], max_entries: int = 256):
+        self.policy = policy
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set[Hashable] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._executor: ThreadPoolExecutor | None = None
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.failed_refreshes = 0
+
+    def _lookup(self, key: Hashable) -> tuple[Any, bool]:
+        """
+        Return ``(value, needs_refresh)``; ``value`` is ``None`` on a miss.
+
+        Claims the background refresh for a stale key so only one runs at a time.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fresh_for, stale_for = self.policy(key)
+                age = time.monotonic() - entry[0]
+                if age < fresh_for:
+                    self.fresh_hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[1], False
+                if age < stale_for:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    if key in self._refreshing:
+                        return entry[1], False
+                    self._refreshing.add(key)
+                    return entry[1], True
+                del self._entries[key]
+            self.misses += 1
+            return None, False
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` as a fresh entry, evicting the least recently used entry when full."""
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.fresh_hits = self.stale_hits = self.misses = 0
+            self.refreshes = self.failed_refreshes = 0
+
+    def close(self) -> None:
+        """
+        Shut down the background refresh worker threads and cancel pending async refreshes.
+
+        Entries are kept; a later stale hit starts a new worker pool.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._refreshing.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _refresh_done(self, key: Hashable, value: Any = None, error: BaseException | None = None) -> None:
+        if error is not None:
+            self.failed_refreshes += 1
+            logger.warning(f"Background refresh of {key!r} failed: {error}")
+        else:
+            self.set(key, value)
+        with self._lock:
+            self.refreshes += 1
+            self._refreshing.discard(key)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            value = loader()
+        except Exception as exc:  # noqa: BLE001 - the stale entry keeps being served
+            self._refresh_done(key, error=exc)
+        else:
+            self._refresh_done(key, value)
+
+    async def _refresh_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            value = await loader()
+        except Exception as exc:  # noqa: BLE001 - the stale entry keeps being served
+            self._refresh_done(key, error=exc)
+        else:
+            self._refresh_done(key, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the entry for ``key``, loading it inline on a miss and in a worker thread when stale."""
+        value, needs_refresh = self._lookup(key)
+        if needs_refresh:
+            # Under the lock so concurrent stale hits share one pool and ``close`` cannot miss it.
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="swr-refresh")
+                self._executor.submit(self._refresh, key, loader)
+        if value is not None:
+            return value
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of ``get_or_load``; stale entries are refreshed in a background task."""
+        value, needs_refresh = self._lookup(key)
+        if needs_refresh:
+            task = asyncio.get_running_loop().create_task(self._refresh_async(key, loader))
+            # Keep a reference so the refresh is not garbage collected mid-flight.
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if value is not None:
+            return value
+
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """Return fresh/stale hit, miss and background refresh counters."""
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_hits + self.misses
+            return {
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "background_refreshes": self.refreshes,
+                "failed_refreshes": self.failed_refreshes,
+                "refreshing": len(self._refreshing),
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+class _Flight:
+    """Result slot shared between the thread loading a key and the threads waiting on it."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._value: Any = None
+        self._error: BaseException | None = None
+
+    def finish(self, value: Any) -> None:
+        self._value = value
+        self._event.set()
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._event.set()
+
+    def wait(self) -> Any:
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
@@ -0,0 +1,290 @@
+"""Shared HTTP client layer for CoinGecko API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .breaker import OPEN, get_circuit_breaker
+from .ratelimit import RateLimitExceeded, get_rate_limiter, parse_retry_after
+
+COINGECKO_BASE_URL = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3")
+
+# Connection pool sizing: ``POOL_CONNECTIONS`` is the number of distinct hosts
+# kept pooled, ``POOL_MAXSIZE`` caps the keep-alive connections per host.
+POOL_CONNECTIONS = int(os.getenv("COINGECKO_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("COINGECKO_POOL_MAXSIZE", "10"))
+
+# Random extra delay, as a fraction of the backoff, so workers do not retry in lockstep.
+BACKOFF_JITTER = 0.25
+
+_COIN_SEGMENT = re.compile(r"^coins/(?!list$|markets$)[^/]+/")
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+# httpx connection pools are bound to the event loop that created them, so the
+# async client is tracked together with its loop and rebuilt for a new loop.
+_async_client: httpx.AsyncClient | None = None
+_async_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _build_session() -> requests.Session:
+    """Create a keep-alive session with a bounded per-host connection pool."""
+    session = requests.Session()
+    # Retries are handled by ``make_request_with_retry``; ``pool_block`` makes
+    # callers wait for a free connection instead of opening extra ones.
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=0,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide CoinGecko session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Return the CoinGecko endpoint of ``url`` used to key its circuit breaker.
+
+    Coin IDs are folded into a placeholder, so every coin shares one breaker
+    per endpoint (e.g. ``coins/{id}/market_chart``).
+    """
+    path = urlsplit(url).path
+    base_path = urlsplit(COINGECKO_BASE_URL).path.rstrip("/")
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return _COIN_SEGMENT.sub("coins/{id}/", path.strip("/"))
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    """Rate limiting and server errors are worth retrying; other responses are final."""
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_delay(attempt: int, response: requests.Response | httpx.Response | None) -> tuple[float | None, float]:
+    """
+    Return ``(delay, pause)`` before retry ``attempt + 1``.
+
+    ``delay`` is the jittered wait, or ``None`` when ``Retry-After`` asks for
+    longer than the limiter's maximum wait, in which case the caller should give
+    up. A 429 honours ``Retry-After`` and returns it as ``pause``, the time the
+    caller must block the shared rate limiter for so other workers back off too.
+    """
+    delay = float(2 ** attempt)
+    pause = 0.0
+    if response is not None and response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            if retry_after > get_rate_limiter().max_wait:
+                return None, 0.0
+            delay = retry_after
+        pause = delay
+    return delay * (1 + random.uniform(0, BACKOFF_JITTER)), pause
+
+
+def make_request_with_retry(url: str, params: dict, timeout: int = 15, max_retries: int = 3) -> requests.Response:
+    """
+    Make an API request with retry logic and exponential backoff.
+
+    Calls go through the endpoint's circuit breaker: while it is open,
+    ``CircuitOpenError`` is raised immediately instead of waiting on retries.
+    Each attempt first takes a slot from the rate limiter shared by all workers.
+    Client errors other than 429 are raised without retrying.
+
+    Args:
+        url: The API endpoint URL
+        params: Query parameters for the request
+        timeout: Request timeout in seconds
+        max_retries: Maximum number of retry attempts
+    """
+    breaker = get_circuit_breaker(endpoint_name(url))
+    limiter = get_rate_limiter()
+    session = get_session()
+
+    for attempt in range(max_retries + 1):  # +1 to allow the first attempt without retry
+        breaker.before_call()
+        try:
+            limiter.acquire()
+            response = session.get(url, params=params, timeout=timeout)
+        except RateLimitExceeded:
+            breaker.release()
+            raise
+        except requests.exceptions.RequestException as exc:
+            breaker.record_failure()
+            error = exc
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if not _is_retryable_status(response.status_code):
+                breaker.record_success()
+                response.raise_for_status()
+                return response
+            breaker.record_failure()
+            error = None
+
+        # Give up on the last attempt, or as soon as the breaker has opened.
+        if attempt == max_retries or breaker.state == OPEN:
+            if error is not None:
+                raise error
+            response.raise_for_status()
+
+        # Exponential backoff with jitter, or the server's Retry-After
+        delay, pause = _retry_delay(attempt, None if error is not None else response)
+        if delay is None:
+            response.raise_for_status()
+        if pause:
+            limiter.block_for(pause)
+        time.sleep(delay)
+
+    # This should not be reached if the function logic is correct
+    raise requests.RequestException("Unknown error occurred")
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the CoinGecko ``httpx.AsyncClient`` for the running event loop.
+
+    The application runs on a single loop, so one client serves the whole
+    process. A client created on another loop is replaced; that only happens
+    when tests or ``TestClient`` start a fresh loop. The old client is closed on
+    its own loop when that loop is still running; the connections of a client
+    whose loop has stopped cannot be closed any more and are left to the
+    garbage collector.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        previous, previous_loop = _async_client, _async_client_loop
+        if previous is not None and not previous.is_closed and previous_loop is not None and previous_loop.is_running():
+            asyncio.run_coroutine_threadsafe(previous.aclose(), previous_loop)
+        _async_client = httpx.AsyncClient(
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the async client if it belongs to the running event loop."""
+    global _async_client, _async_client_loop
+    client = _async_client
+    if client is not None and _async_client_loop is asyncio.get_running_loop():
+        await client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+def _to_request_exception(exc: httpx.HTTPError) -> requests.exceptions.RequestException:
+    """Translate an httpx transport error into the equivalent ``requests`` exception."""
+    if isinstance(exc, httpx.TimeoutException):
+        return requests.exceptions.Timeout(str(exc))
+    if isinstance(exc, httpx.TransportError):
+        return requests.exceptions.ConnectionError(str(exc))
+    return requests.exceptions.RequestException(str(exc))
+
+
+def _raise_for_status_async(response: httpx.Response) -> None:
+    """Raise ``requests.HTTPError`` for 4xx/5xx responses, like ``Response.raise_for_status``."""
+    if response.status_code >= 400:
+        kind = "Client" if response.status_code < 500 else "Server"
+        raise requests.exceptions.HTTPError(
+            f"{response.status_code} {kind} Error: {response.reason_phrase} for url: {response.url}",
+            response=response,
+        )
+
+
+async def make_request_with_retry_async(
+    url: str, params: dict, timeout: int = 15, max_retries: int = 3
+) -> httpx.Response:
+    """
+    Async counterpart of ``make_request_with_retry`` that never blocks the event loop.
+
+    Failures are raised as ``requests`` exceptions so sync and async callers share
+    the same error handling.
+
+    Args:
+        url: The API endpoint URL
+        params: Query parameters for the request
+        timeout: Request timeout in seconds
+        max_retries: Maximum number of retry attempts
+    """
+    breaker = get_circuit_breaker(endpoint_name(url))
+    limiter = get_rate_limiter()
+    client = get_async_client()
+
+    for attempt in range(max_retries + 1):
+        breaker.before_call()
+        try:
+            # The limiter takes a cross-process file lock another worker may hold, so it runs off the loop.
+            wait = await asyncio.to_thread(limiter.reserve)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = await client.get(url, params=params, timeout=timeout)
+        except RateLimitExceeded:
+            breaker.release()
+            raise
+        except httpx.HTTPError as exc:
+            breaker.record_failure()
+            error = _to_request_exception(exc)
+            error.__cause__ = exc
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if not _is_retryable_status(response.status_code):
+                breaker.record_success()
+                _raise_for_status_async(response)
+                return response
+            breaker.record_failure()
+            error = None
+
+        if attempt == max_retries or breaker.state == OPEN:
+            if error is not None:
+                raise error
+            _raise_for_status_async(response)
+
+        delay, pause = _retry_delay(attempt, None if error is not None else response)
+        if delay is None:
+            _raise_for_status_async(response)
+        if pause:
+            await asyncio.to_thread(limiter.block_for, pause)
+        await asyncio.sleep(delay)
+
+    raise requests.RequestException("Unknown error occurred")
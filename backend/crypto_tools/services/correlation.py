@@ -0,0 +1,51 @@
+"""Cross-coin return correlations over aligned price series."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from .series import PriceSeries
+
+
+def align_series(series: Sequence[PriceSeries], start_ms: int, end_ms: int, step_ms: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample every series on a common ``step_ms`` grid between ``start_ms`` and ``end_ms``.
+
+    Each grid time takes the last price at or before it (CoinGecko's points
+    drift a few minutes around the hour), or NaN when the series has no point
+    within one step before it. Returns ``(grid_ms, matrix)`` where ``matrix``
+    has one row per series.
+    """
+    first = -(-start_ms // step_ms) * step_ms  # first grid time at or after start_ms
+    grid = np.arange(first, end_ms + 1, step_ms, dtype=np.int64)
+    matrix = np.full((len(series), len(grid)), np.nan, dtype=np.float64)
+    for row, item in enumerate(series):
+        if not len(item):
+            continue
+        index = np.searchsorted(item.timestamps, grid, side="right") - 1
+        valid = index >= 0
+        valid[valid] &= grid[valid] - item.timestamps[index[valid]] < step_ms
+        matrix[row, valid] = item.prices[index[valid]]
+    return grid, matrix
+
+
+def log_returns(matrix: np.ndarray) -> np.ndarray:
+    """Return the per-step log returns of every row; steps touching a missing price are NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.diff(np.log(matrix), axis=1)
+
+
+def correlation_matrix(returns: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    Return the Pearson correlation matrix of the rows of ``returns`` and the number of steps used.
+
+    Only steps where every coin has a return are used, so all pairs are
+    compared over the same observations. Rows with no variation correlate as NaN.
+    """
+    complete = returns[:, ~np.isnan(returns).any(axis=0)]
+    if complete.shape[1] < 2:
+        return np.full((len(returns), len(returns)), np.nan), complete.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.atleast_2d(np.corrcoef(complete)), complete.shape[1]
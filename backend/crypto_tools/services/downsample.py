@@ -0,0 +1,45 @@
+"""Chart-friendly downsampling of price series."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .series import PriceSeries
+
+
+def lttb(series: PriceSeries, threshold: int) -> PriceSeries:
+    """
+    Downsample ``series`` to ``threshold`` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every other bucket contributes the point
+    forming the largest triangle with the previously chosen point and the mean
+    of the next bucket, which preserves the peaks and troughs a chart needs.
+    Series that already fit (or thresholds below 3) are returned unchanged.
+    """
+    count = len(series)
+    if threshold < 3 or count <= threshold:
+        return series
+
+    x = series.timestamps.astype(np.float64)
+    y = np.asarray(series.prices, dtype=np.float64)
+
+    # The inner points 1..count-2 split into threshold-2 buckets starting at edges[:-1].
+    edges = (np.arange(threshold - 1) * ((count - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = count - 1
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    # Mean of each bucket, plus the last point standing in as the bucket after the final one.
+    mean_x = np.r_[np.add.reduceat(x[:-1], starts) / sizes, x[-1]]
+    mean_y = np.r_[np.add.reduceat(y[:-1], starts) / sizes, y[-1]]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    anchor = 0
+    for bucket, (start, stop) in enumerate(zip(starts.tolist(), edges[1:].tolist())):
+        ax, ay = x[anchor], y[anchor]
+        # Twice the triangle area; the constant factor does not change the argmax.
+        area = np.abs((ax - mean_x[bucket + 1]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (mean_y[bucket + 1] - ay))
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+
+    return PriceSeries(series.timestamps[selected], series.prices[selected])
@@ -0,0 +1,76 @@
+"""Monte Carlo price-band forecasts from drift and volatility fitted on price series."""
+
+from __future__ import annotations
+
+import warnings
+from typing import Sequence
+
+import numpy as np
+
+from .correlation import log_returns
+from .indicators import price_matrix
+
+# Percentiles reported for every forecast horizon.
+FORECAST_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on simulated values held in memory at once (coins x paths x horizons).
+_MAX_BATCH_VALUES = 4_000_000
+
+
+def fit_drift_volatility(histories: Sequence[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fit the per-step drift and volatility of the log returns of every series.
+
+    Returns ``(drift, volatility, observations)`` arrays with one entry per
+    series; series of different lengths are right-aligned and fitted together.
+    """
+    if not len(histories):
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    returns = log_returns(price_matrix(histories, max(len(prices) for prices in histories)))
+    observations = np.count_nonzero(~np.isnan(returns), axis=1)
+    with warnings.catch_warnings():
+        # Series with fewer than two returns get NaN rather than a warning.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        drift = np.nanmean(returns, axis=1)
+        volatility = np.nanstd(returns, axis=1, ddof=1)
+    return drift, volatility, observations
+
+
+def simulate_price_bands(
+    prices: np.ndarray,
+    drift: np.ndarray,
+    volatility: np.ndarray,
+    horizons: Sequence[int],
+    paths: int,
+    rng: np.random.Generator,
+    percentiles: Sequence[float] = FORECAST_PERCENTILES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate ``paths`` geometric Brownian motion paths per coin and return percentile bands at each horizon.
+
+    Log-price increments are independent normals, so each path is sampled
+    exactly at the horizon steps: the increment between two horizons ``h``
+    steps apart is one normal draw with mean ``h * drift`` and standard
+    deviation ``sqrt(h) * volatility``. Coins are simulated in batches of
+    ``(coins, paths, horizons)`` arrays to bound memory.
+
+    Returns ``(bands, probability_up)``: ``bands`` has shape
+    ``(coins, horizons, percentiles)`` in price units and ``probability_up``
+    has shape ``(coins, horizons)`` with the fraction of paths above the start price.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    steps = np.diff(np.asarray(horizons, dtype=np.float64), prepend=0.0)
+    bands = np.empty((len(prices), len(steps), len(percentiles)))
+    probability_up = np.empty((len(prices), len(steps)))
+
+    batch = max(1, _MAX_BATCH_VALUES // (paths * len(steps)))
+    for start in range(0, len(prices), batch):
+        rows = slice(start, start + batch)
+        shocks = rng.standard_normal((len(prices[rows]), paths, len(steps)))
+        shocks *= volatility[rows, None, None] * np.sqrt(steps)
+        shocks += drift[rows, None, None] * steps
+        log_paths = np.cumsum(shocks, axis=2)
+        probability_up[rows] = np.count_nonzero(log_paths > 0, axis=1) / paths
+        quantiles = np.percentile(log_paths, percentiles, axis=1)  # (percentiles, coins, horizons)
+        bands[rows] = prices[rows, None, None] * np.exp(np.moveaxis(quantiles, 0, -1))
+    return bands, probability_up
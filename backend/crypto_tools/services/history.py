@@ -0,0 +1,887 @@
+"""Price history: the local store, change summaries, candles, ranges and point-in-time lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+import requests
+
+from .cache import StaleWhileRevalidateCache
+from .client import COINGECKO_BASE_URL
+from .client import make_request_with_retry as _make_request_with_retry
+from .client import make_request_with_retry_async as _make_request_with_retry_async
+from .downsample import lttb
+from .marketchart import market_chart_points
+from .ohlc import parse_candle_interval, resample_ohlc
+from .price import (
+    LAST_GOOD_MAX_AGE_SECONDS,
+    _get_cached_price_async,
+    _last_good_prices,
+    _request_error_message,
+    _resolve_crypto_id,
+    _tag_last_known_good,
+    _unsupported_crypto_error,
+)
+from .rolling import RollingStatsBook, RollingWindow
+from .series import PriceSeries
+from .timeseries import INTERVAL_STEP_MS, get_price_store
+
+# Stored price history younger than this is served without contacting CoinGecko.
+HISTORY_REFRESH_SECONDS = int(os.getenv("CRYPTO_HISTORY_REFRESH_SECONDS", "300"))
+
+_DAY_MS = 86_400_000
+
+# Price change summaries are served stale-while-revalidate. Each row is
+# (longest window in days, seconds a window stays fresh, seconds it may be served stale).
+SUMMARY_CACHE_POLICY = (
+    (1, 60, 300),
+    (7, 300, 1_800),
+    (30, 900, 7_200),
+    (90, 1_800, 21_600),
+    (365, 3_600, 86_400),
+)
+
+# Stored granularities OHLC candles are resampled from, finest first, as
+# (interval, step in ms, longest window in days CoinGecko serves at that step).
+CANDLE_SOURCES = (
+    ('5m', 300_000, 1),
+    ('hourly', 3_600_000, 90),
+    ('daily', 86_400_000, 365),
+)
+
+# Default and largest number of points returned for a historical price range.
+HISTORY_DEFAULT_POINTS = 500
+HISTORY_MAX_POINTS = 5_000
+
+# Histories loaded at once for a watchlist (trends, correlations, forecasts and
+# backtests), so a large watchlist neither floods CoinGecko nor serialises
+# behind one slow coin.
+TREND_BATCH_CONCURRENCY = int(os.getenv("CRYPTO_TREND_BATCH_CONCURRENCY", "8"))
+
+
+def _market_chart_request(crypto_id: str, days: int, interval: str) -> tuple[str, dict[str, Any]]:
+    """Return the URL and query parameters for a ``/coins/{id}/market_chart`` lookup."""
+    url = f"{COINGECKO_BASE_URL}/coins/{crypto_id}/market_chart"
+    params = {
+        'vs_currency': 'usd',
+        'days': days,
+        'interval': interval,
+    }
+    if interval == '5m':
+        # CoinGecko returns 5-minute points for windows of up to a day when no interval is given.
+        del params['interval']
+    return url, params
+
+
+def _history_interval(days: int) -> str:
+    """Return the ``market_chart`` granularity used for a ``days`` long window."""
+    # Use hourly for shorter periods
+    return 'daily' if days > 14 else 'hourly'
+
+
+def _history_fetch_days(series: PriceSeries, days: int, interval: str, now_ms: int) -> int | None:
+    """
+    Return how many days of ``market_chart`` data are needed to bring a stored series up to date.
+
+    ``None`` means the stored series already covers the window and is fresh.
+    A series that does not reach back to the start of the window is refetched
+    in full; otherwise only the tail since the last stored point is requested.
+    """
+    window_start = now_ms - days * _DAY_MS
+    if not len(series) or series.first_timestamp > window_start + INTERVAL_STEP_MS[interval]:
+        return days
+
+    age_ms = now_ms - series.last_timestamp
+    if age_ms <= HISTORY_REFRESH_SECONDS * 1000:
+        return None
+    return min(days, max(1, math.ceil(age_ms / _DAY_MS)))
+
+
+def _store_market_chart(crypto_id: str, interval: str, response: Any) -> None:
+    """Merge the ``prices`` of a ``market_chart`` response into the local history store."""
+    series = market_chart_points(response)
+    if len(series):
+        get_price_store().merge(crypto_id, interval, series.timestamps, series.prices)
+
+
+def _load_price_history(crypto_id: str, days: int, interval: str) -> PriceSeries:
+    """Return the series of the last ``days`` as a view of the store, fetching only missing data from CoinGecko."""
+    store = get_price_store()
+    now_ms = int(time.time() * 1000)
+    series = store.read(crypto_id, interval)
+
+    fetch_days = _history_fetch_days(series, days, interval, now_ms)
+    if fetch_days is not None:
+        url, params = _market_chart_request(crypto_id, fetch_days, interval)
+        response = _make_request_with_retry(url, params, timeout=15)
+        # response is already successful if we reach here
+        _store_market_chart(crypto_id, interval, response)
+        series = store.read(crypto_id, interval)
+
+    return series.since(now_ms - days * _DAY_MS)
+
+
+async def _load_price_history_async(crypto_id: str, days: int, interval: str) -> PriceSeries:
+    """Async variant of ``_load_price_history``."""
+    store = get_price_store()
+    now_ms = int(time.time() * 1000)
+    series = store.read(crypto_id, interval)
+
+    fetch_days = _history_fetch_days(series, days, interval, now_ms)
+    if fetch_days is not None:
+        url, params = _market_chart_request(crypto_id, fetch_days, interval)
+        response = await _make_request_with_retry_async(url, params, timeout=15)
+        _store_market_chart(crypto_id, interval, response)
+        series = store.read(crypto_id, interval)
+
+    return series.since(now_ms - days * _DAY_MS)
+
+
+async def _load_histories_async(
+    crypto_ids: list[str], days: int, interval: str
+) -> dict[str, PriceSeries | requests.exceptions.RequestException]:
+    """
+    Load the histories of several coins concurrently, at most ``TREND_BATCH_CONCURRENCY`` at a time.
+
+    Request failures are returned in place of the series so one coin cannot fail the batch.
+    """
+    semaphore = asyncio.Semaphore(TREND_BATCH_CONCURRENCY)
+
+    async def load_history(crypto_id: str) -> PriceSeries:
+        async with semaphore:
+            return await _load_price_history_async(crypto_id, days, interval)
+
+    loaded = await asyncio.gather(*(load_history(crypto_id) for crypto_id in crypto_ids), return_exceptions=True)
+    for outcome in loaded:
+        if isinstance(outcome, BaseException) and not isinstance(outcome, requests.exceptions.RequestException):
+            raise outcome
+    return dict(zip(crypto_ids, loaded))
+
+
+def _summary_freshness(key: tuple[str, int]) -> tuple[float, float]:
+    """Return the ``(fresh_for, stale_for)`` seconds of a ``(crypto_id, days)`` summary window."""
+    days = key[1]
+    for max_days, fresh_for, stale_for in SUMMARY_CACHE_POLICY:
+        if days <= max_days:
+            return fresh_for, stale_for
+    return SUMMARY_CACHE_POLICY[-1][1:]
+
+
+# Window statistics behind each summary, keyed by (crypto_id, days).
+_summary_cache = StaleWhileRevalidateCache(_summary_freshness)
+
+# Rolling min/max/mean/std per summary window, kept in sync with the history store.
+_rolling_stats = RollingStatsBook()
+
+
+def _window_stats(crypto_id: str, days: int, window: PriceSeries) -> dict[str, Any] | None:
+    """Return the rolling statistics of a loaded window, or ``None`` when too few points to summarise."""
+    if len(window) < 2:
+        return None
+    return _rolling_stats.window_stats(crypto_id, _history_interval(days), days, window, window.first_timestamp)
+
+
+def _load_summary_stats(crypto_id: str, days: int) -> dict[str, Any] | None:
+    """Load the window of the last ``days`` and return its rolling statistics."""
+    return _window_stats(crypto_id, days, _load_price_history(crypto_id, days, _history_interval(days)))
+
+
+async def _load_summary_stats_async(crypto_id: str, days: int) -> dict[str, Any] | None:
+    """Async variant of ``_load_summary_stats``."""
+    return _window_stats(crypto_id, days, await _load_price_history_async(crypto_id, days, _history_interval(days)))
+
+
+def _validate_days(days: int) -> dict[str, Any] | None:
+    """Return an error payload if ``days`` is outside the supported range."""
+    if days <= 0:
+        return {
+            "status": "error",
+            "error_message": "Number of days must be a positive integer.",
+        }
+
+    if days > 365:
+        return {
+            "status": "error",
+            "error_message": "Maximum supported time period is 365 days.",
+        }
+
+    return None
+
+
+def _stored_history(crypto_id: str, days: int, interval: str) -> PriceSeries | None:
+    """
+    Return the last ``days`` of the locally stored series, without any request.
+
+    The window ends at the last stored point rather than now; ``None`` means the
+    store does not cover the window or its data is older than the fallback limit.
+    """
+    series = get_price_store().read(crypto_id, interval)
+    if len(series) < 2:
+        return None
+    last_ms = series.last_timestamp
+    if time.time() * 1000 - last_ms > LAST_GOOD_MAX_AGE_SECONDS * 1000:
+        return None
+    if series.first_timestamp > last_ms - days * _DAY_MS + INTERVAL_STEP_MS[interval]:
+        return None
+    return series.since(last_ms - days * _DAY_MS)
+
+
+def _last_good_summary(crypto: str, crypto_id: str, days: int) -> dict[str, Any] | None:
+    """Summarise the locally stored history when CoinGecko is unavailable."""
+    stored = _stored_history(crypto_id, days, _history_interval(days))
+    if stored is None or len(stored) < 2:
+        return None
+    stats = RollingWindow.from_series(stored, days * _DAY_MS).snapshot()
+    summary = _build_price_change_summary(crypto, crypto_id, days, stats)
+    return _tag_last_known_good(summary, stored.last_timestamp / 1000)
+
+
+def _build_price_change_summary(
+    crypto: str, crypto_id: str, days: int, stats: dict[str, Any], period: str | None = None
+) -> dict[str, Any]:
+    """Turn the rolling statistics of a window into the price change result; ``period`` overrides "Over the past N days"."""
+    initial_price = stats["first"]
+    final_price = stats["last"]
+    min_price = stats["min"]
+    max_price = stats["max"]
+
+    # Calculate changes
+    price_change = final_price - initial_price
+    price_change_percentage = (price_change / initial_price) * 100
+    price_change_direction = "increased" if price_change >= 0 else "decreased"
+
+    # Format the summary report
+    period = period or f"Over the past {days} day{'s' if days != 1 else ''}"
+    summary = (
+        f"{period}, "
+        f"{crypto} ({crypto_id}) has {price_change_direction} from ${initial_price:,.2f} to ${final_price:,.2f}. "
+        f"The price changed by ${abs(price_change):,.2f} ({price_change_percentage:+.2f}%). "
+        f"The highest price during this period was ${max_price:,.2f} and the lowest was ${min_price:,.2f}."
+    )
+
+    return {
+        "status": "success",
+        "report": summary,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "days": days,
+        "initial_price_usd": initial_price,
+        "final_price_usd": final_price,
+        "min_price_usd": min_price,
+        "max_price_usd": max_price,
+        "price_change_usd": price_change,
+        "price_change_percentage": price_change_percentage,
+        "average_price_usd": stats["mean"],
+        "price_stddev_usd": stats["std"],
+    }
+
+
+def _prepare_summary(crypto: str, days: int) -> tuple[str, dict[str, Any] | None]:
+    """Resolve and validate a price change summary request into ``(crypto_id, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", _unsupported_crypto_error(crypto)
+
+    days_error = _validate_days(days)
+    if days_error:
+        return "", days_error
+    return crypto_id, None
+
+
+def _build_summary_result(
+    crypto: str, crypto_id: str, days: int, stats: dict[str, Any] | requests.exceptions.RequestException | None
+) -> dict[str, Any]:
+    """
+    Turn the loaded window statistics into the price change summary.
+
+    A failed load is summarised from stored history; too few points, or no
+    stored history, fall back to mock data.
+    """
+    if isinstance(stats, requests.exceptions.RequestException):
+        stored = _last_good_summary(crypto, crypto_id, days)
+        if stored is not None:
+            return stored
+        stats = None
+
+    if stats is None:
+        return _generate_mock_price_change_summary(crypto, crypto_id, days)
+
+    return _build_price_change_summary(crypto, crypto_id, days, stats)
+
+
+def get_crypto_price_change_summary(crypto: str, days: int = 7) -> dict[str, Any]:
+    """
+    Fetch the price change summary for ``crypto`` over the specified number of ``days`` using CoinGecko API.
+
+    Args:
+        crypto: The cryptocurrency to get price change for
+        days: The number of days to look back (default 7, max 365 for daily intervals)
+    """
+    crypto_id, error = _prepare_summary(crypto, days)
+    if error:
+        return error
+
+    try:
+        stats = _summary_cache.get_or_load((crypto_id, days), lambda: _load_summary_stats(crypto_id, days))
+    except requests.exceptions.RequestException as exc:
+        # For request errors, serve stored real data, then mock data as fallback
+        stats = exc
+    return _build_summary_result(crypto, crypto_id, days, stats)
+
+
+async def get_crypto_price_change_summary_async(crypto: str, days: int = 7) -> dict[str, Any]:
+    """
+    Async variant of ``get_crypto_price_change_summary``.
+
+    Args:
+        crypto: The cryptocurrency to get price change for
+        days: The number of days to look back (default 7, max 365 for daily intervals)
+    """
+    crypto_id, error = _prepare_summary(crypto, days)
+    if error:
+        return error
+
+    try:
+        stats = await _summary_cache.get_or_load_async(
+            (crypto_id, days), lambda: _load_summary_stats_async(crypto_id, days)
+        )
+    except requests.exceptions.RequestException as exc:
+        stats = exc
+    return _build_summary_result(crypto, crypto_id, days, stats)
+
+
+def close_summary_cache() -> None:
+    """Stop the price change summary cache's background refreshes; used at application shutdown."""
+    _summary_cache.close()
+
+
+def get_summary_cache_stats() -> dict[str, Any]:
+    """Return fresh/stale hit and background refresh counters for price change summaries."""
+    return {**_summary_cache.stats(), "rolling_windows": _rolling_stats.stats()}
+
+
+def _prepare_ohlc(crypto: str, interval: str, days: int) -> tuple[str, int, str, dict[str, Any] | None]:
+    """Resolve and validate an OHLC request into ``(crypto_id, width_ms, source_interval, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", 0, "", _unsupported_crypto_error(crypto)
+
+    days_error = _validate_days(days)
+    if days_error:
+        return "", 0, "", days_error
+
+    try:
+        width_ms = parse_candle_interval(interval)
+    except ValueError as exc:
+        return "", 0, "", {"status": "error", "error_message": str(exc)}
+
+    for source, step_ms, max_days in CANDLE_SOURCES:
+        if width_ms % step_ms == 0 and days <= max_days:
+            return crypto_id, width_ms, source, None
+    return "", 0, "", {
+        "status": "error",
+        "error_message": (
+            f"{interval} candles are not available over {days} days. Candles under an hour need a window of "
+            f"1 day, candles under a day at most 90 days, and widths must be whole multiples of 5m, 1h or 1d."
+        ),
+    }
+
+
+def _build_ohlc_result(
+    crypto: str, crypto_id: str, interval: str, days: int, window: PriceSeries, width_ms: int, source: str
+) -> dict[str, Any]:
+    """Resample a loaded window into the OHLC result, newest candle last."""
+    open_times, ohlc = resample_ohlc(window, width_ms)
+    if not len(open_times):
+        return {"status": "error", "error_message": f"No price data available for {crypto} ({crypto_id})."}
+
+    candles = np.column_stack([open_times, ohlc]).tolist()
+    for candle in candles:
+        candle[0] = int(candle[0])
+    latest_close = float(ohlc[-1, 3])
+    return {
+        "status": "success",
+        "report": (
+            f"{len(candles)} {interval} candles for {crypto} ({crypto_id}) over the past {days} "
+            f"day{'s' if days != 1 else ''}; the latest close is ${latest_close:,.2f}."
+        ),
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "interval": interval,
+        "days": days,
+        "source_interval": source,
+        "columns": ["open_time", "open", "high", "low", "close"],
+        "candles": candles,
+    }
+
+
+def _last_good_ohlc(
+    crypto: str,
+    crypto_id: str,
+    interval: str,
+    days: int,
+    width_ms: int,
+    source: str,
+    exc: requests.exceptions.RequestException,
+) -> dict[str, Any]:
+    """Resample the locally stored history when CoinGecko is unavailable, or report the error."""
+    stored = _stored_history(crypto_id, days, source)
+    if stored is None:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve price history", exc)}
+    result = _build_ohlc_result(crypto, crypto_id, interval, days, stored, width_ms, source)
+    if result["status"] == "success":
+        _tag_last_known_good(result, stored.last_timestamp / 1000)
+    return result
+
+
+async def get_crypto_ohlc_async(crypto: str, interval: str = "1h", days: int = 7) -> dict[str, Any]:
+    """
+    Resample a cryptocurrency's recent prices into OHLC candles of any width.
+
+    Candles are built from locally stored ``market_chart`` data at the finest
+    granularity CoinGecko offers for the window (5-minute points for 1 day,
+    hourly up to 90 days, daily beyond) and aligned to UTC. The last candle
+    may still be forming.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        interval: Candle width such as '5m', '15m', '1h', '4h' or '1d'
+        days: The number of days to cover (max 365)
+
+    Returns:
+        A dictionary with ``[open_time_ms, open, high, low, close]`` candles, oldest first.
+    """
+    crypto_id, width_ms, source, error = _prepare_ohlc(crypto, interval, days)
+    if error:
+        return error
+
+    try:
+        window = await _load_price_history_async(crypto_id, days, source)
+    except requests.exceptions.RequestException as exc:
+        return _last_good_ohlc(crypto, crypto_id, interval, days, width_ms, source, exc)
+
+    return _build_ohlc_result(crypto, crypto_id, interval, days, window, width_ms, source)
+
+
+def _parse_time(value: int | float | str) -> int:
+    """
+    Return epoch milliseconds for a Unix timestamp in seconds or an ISO 8601 date / date-time.
+
+    Values without a UTC offset are taken as UTC. Raises ``ValueError`` for anything else.
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if not text.lstrip('-').isdigit():
+            try:
+                moment = datetime.fromisoformat(text)
+            except ValueError:
+                raise ValueError(
+                    f"Invalid date '{value}'. Use an ISO 8601 date such as '2024-03-03', "
+                    f"a date-time such as '2024-03-03T12:00:00Z', or a Unix timestamp."
+                ) from None
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            return int(moment.timestamp() * 1000)
+        value = int(text)
+    return int(float(value) * 1000)
+
+
+def _format_time(timestamp_ms: int) -> str:
+    """Format epoch milliseconds as an ISO 8601 UTC date-time."""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat()
+
+
+def _range_source(start_ms: int) -> tuple[int, str, dict[str, Any] | None]:
+    """Return ``(days, interval, error)`` of the stored series covering ``start_ms`` until now."""
+    days = max(1, math.ceil((time.time() * 1000 - start_ms) / _DAY_MS))
+    if _validate_days(days):
+        return 0, "", {"status": "error", "error_message": "The requested time must be within the last 365 days."}
+    # Hourly points are available for the last 90 days; older ranges use daily points.
+    return days, 'hourly' if days <= 90 else 'daily', None
+
+
+def _stored_range(crypto_id: str, interval: str, start_ms: int, end_ms: int) -> PriceSeries | None:
+    """Return the stored series if it already covers ``start_ms``..``end_ms``, so past ranges need no request."""
+    series = get_price_store().read(crypto_id, interval)
+    if len(series) and series.first_timestamp <= start_ms and series.last_timestamp >= end_ms:
+        return series
+    return None
+
+
+async def _load_range_async(
+    crypto_id: str, start_ms: int, end_ms: int, days: int, interval: str
+) -> tuple[PriceSeries, float | None]:
+    """
+    Return the series covering a range and, when CoinGecko was unreachable, the epoch time of the stored data used.
+
+    Raises the request error when nothing is stored for the coin.
+    """
+    stored = _stored_range(crypto_id, interval, start_ms, end_ms)
+    if stored is not None:
+        return stored, None
+    try:
+        return await _load_price_history_async(crypto_id, days, interval), None
+    except requests.exceptions.RequestException:
+        series = get_price_store().read(crypto_id, interval)
+        if not len(series):
+            raise
+        return series, series.last_timestamp / 1000
+
+
+def _prepare_history_range(
+    crypto: str, start: int | None, end: int | None, points: int
+) -> tuple[str, int, int, int, str, dict[str, Any] | None]:
+    """Resolve and validate a range request into ``(crypto_id, start_ms, end_ms, days, interval, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", 0, 0, 0, "", _unsupported_crypto_error(crypto)
+
+    if not 3 <= points <= HISTORY_MAX_POINTS:
+        return "", 0, 0, 0, "", {
+            "status": "error",
+            "error_message": f"The number of points must be between 3 and {HISTORY_MAX_POINTS}.",
+        }
+
+    now_ms = int(time.time() * 1000)
+    end_ms = now_ms if end is None else min(int(end) * 1000, now_ms)
+    start_ms = end_ms - 30 * _DAY_MS if start is None else int(start) * 1000
+    if start_ms >= end_ms:
+        return "", 0, 0, 0, "", {"status": "error", "error_message": "The range start must be before its end."}
+
+    days, interval, error = _range_source(start_ms)
+    if error:
+        return "", 0, 0, 0, "", error
+    return crypto_id, start_ms, end_ms, days, interval, None
+
+
+def _build_history_result(
+    crypto: str,
+    crypto_id: str,
+    series: PriceSeries,
+    start_ms: int,
+    end_ms: int,
+    interval: str,
+    points: int,
+    as_of: float | None = None,
+) -> dict[str, Any]:
+    """Downsample the points of a range for charting, tagging stored data served during an outage."""
+    in_range = series.between(start_ms, end_ms + 1)
+    if not len(in_range):
+        return {"status": "error", "error_message": f"No price data available for {crypto} ({crypto_id}) in this range."}
+
+    sampled = lttb(in_range, points)
+    result = {
+        "status": "success",
+        "report": (
+            f"{len(sampled)} of {len(in_range)} {interval} prices for {crypto} ({crypto_id}) "
+            f"between {_format_time(start_ms)} and {_format_time(end_ms)}."
+        ),
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "start": start_ms // 1000,
+        "end": end_ms // 1000,
+        "source_interval": interval,
+        "original_points": len(in_range),
+        "columns": ["timestamp", "price"],
+        "prices": [[timestamp, price] for timestamp, price in zip(sampled.timestamps.tolist(), sampled.prices.tolist())],
+    }
+    return _tag_last_known_good(result, as_of) if as_of is not None else result
+
+
+async def get_crypto_price_history_async(
+    crypto: str, start: int | None = None, end: int | None = None, points: int = HISTORY_DEFAULT_POINTS
+) -> dict[str, Any]:
+    """
+    Return a cryptocurrency's prices between two times, downsampled for charting.
+
+    The range is read from the local history store, using the hourly series for
+    ranges starting within the last 90 days and the daily series before that,
+    and reduced to at most ``points`` points with Largest-Triangle-Three-Buckets,
+    which keeps the visual shape of the series. The hourly series is the one
+    price change summaries of up to 14 days use; longer summaries read the daily
+    series, so a 15 to 90 day range does not share their stored points.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        start: Range start as a Unix timestamp in seconds (default: 30 days before ``end``)
+        end: Range end as a Unix timestamp in seconds (default: now)
+        points: Maximum number of points to return (3 to 5000, default 500)
+
+    Returns:
+        A dictionary with ``[timestamp_ms, price]`` pairs, oldest first.
+    """
+    crypto_id, start_ms, end_ms, days, interval, error = _prepare_history_range(crypto, start, end, points)
+    if error:
+        return error
+
+    try:
+        series, as_of = await _load_range_async(crypto_id, start_ms, end_ms, days, interval)
+    except requests.exceptions.RequestException as exc:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve price history", exc)}
+
+    return _build_history_result(crypto, crypto_id, series, start_ms, end_ms, interval, points, as_of)
+
+
+def _prepare_price_at(crypto: str, at: int | str) -> tuple[str, int, int, str, dict[str, Any] | None]:
+    """Resolve and validate a point-in-time lookup into ``(crypto_id, at_ms, days, interval, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", 0, 0, "", _unsupported_crypto_error(crypto)
+
+    try:
+        at_ms = _parse_time(at)
+    except ValueError as exc:
+        return "", 0, 0, "", {"status": "error", "error_message": str(exc)}
+    if at_ms > time.time() * 1000:
+        return "", 0, 0, "", {"status": "error", "error_message": "The requested time is in the future."}
+
+    days, interval, error = _range_source(at_ms)
+    if error:
+        return "", 0, 0, "", error
+    return crypto_id, at_ms, days, interval, None
+
+
+def _build_price_at_result(
+    crypto: str,
+    crypto_id: str,
+    series: PriceSeries,
+    at_ms: int,
+    interval: str,
+    as_of: float | None,
+    latest: tuple[float, int, float | None] | None,
+) -> dict[str, Any]:
+    """
+    Answer a point-in-time lookup by binary search over the sorted series.
+
+    ``latest`` is the ``(price, timestamp_ms, as_of)`` of the current price, or
+    ``None`` when no current price is available; the result is tagged as
+    last-known-good with the older of the two ``as_of`` times.
+    """
+    index = int(np.searchsorted(series.timestamps, at_ms, side='right')) - 1
+    if index < 0 and len(series) and series.first_timestamp - at_ms <= INTERVAL_STEP_MS[interval]:
+        index = 0  # the window starts just after the requested time
+    if index < 0:
+        return {"status": "error", "error_message": f"No stored price for {crypto} ({crypto_id}) at {_format_time(at_ms)}."}
+    if latest is None:
+        return {"status": "error", "error_message": f"Could not retrieve the current price of {crypto} ({crypto_id})."}
+
+    timestamp = int(series.timestamps[index])
+    price = float(series.prices[index])
+    latest_price, latest_timestamp, latest_as_of = latest
+    change_percentage = (latest_price - price) / price * 100
+    result = {
+        "status": "success",
+        "report": (
+            f"The price of {crypto} ({crypto_id}) at {_format_time(timestamp)} was ${price:,.2f} USD. "
+            f"The latest price (${latest_price:,.2f}) is {change_percentage:+.2f}% from there."
+        ),
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "requested_at": _format_time(at_ms),
+        "timestamp": timestamp,
+        "price_usd": price,
+        "latest_timestamp": latest_timestamp,
+        "latest_price_usd": latest_price,
+        "change_since_percentage": change_percentage,
+        "source_interval": interval,
+    }
+    stale = [value for value in (as_of, latest_as_of) if value is not None]
+    return _tag_last_known_good(result, min(stale)) if stale else result
+
+
+async def get_crypto_price_at_async(crypto: str, at: int | str) -> dict[str, Any]:
+    """
+    Look up what a cryptocurrency cost at a past date or time.
+
+    The answer is the last stored point at or before ``at``, found by binary
+    search over the locally held series (hourly for the last 90 days, daily
+    before that), so repeated questions about past dates need no extra
+    CoinGecko requests. The current price comes from the cached price feed and
+    is included for "then vs now" answers; when CoinGecko is unreachable the
+    last-known-good price is used and the result is tagged with its age.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        at: An ISO 8601 date or date-time in UTC (e.g., '2024-03-03', '2024-03-03T15:00:00Z')
+            or a Unix timestamp in seconds, within the last 365 days
+
+    Returns:
+        A dictionary with the price at that time and the change since then.
+    """
+    crypto_id, at_ms, days, interval, error = _prepare_price_at(crypto, at)
+    if error:
+        return error
+
+    try:
+        series, as_of = await _load_range_async(crypto_id, at_ms, at_ms, days, interval)
+    except requests.exceptions.RequestException as exc:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve price history", exc)}
+
+    latest = await _latest_price_async(crypto_id, series)
+    return _build_price_at_result(crypto, crypto_id, series, at_ms, interval, as_of, latest)
+
+
+def _fallback_latest_price(crypto_id: str, series: PriceSeries) -> tuple[float, int, float] | None:
+    """
+    Return the newer of the last-known-good price and the series' last point as ``(price, timestamp_ms, as_of)``.
+
+    Returns ``None`` when the series is empty and no last-known-good price is stored.
+    """
+    candidates = []
+    if len(series):
+        candidates.append((series.last_timestamp, float(series.prices[-1])))
+    entry = _last_good_prices([crypto_id]).get(crypto_id)
+    if entry is not None:
+        candidates.append((int(entry[1] * 1000), entry[0]))
+    if not candidates:
+        return None
+    timestamp, price = max(candidates)
+    return price, timestamp, timestamp / 1000
+
+
+async def _latest_price_async(crypto_id: str, series: PriceSeries) -> tuple[float, int, float | None] | None:
+    """
+    Return the current price of ``crypto_id`` as ``(price, timestamp_ms, as_of)``.
+
+    ``as_of`` is ``None`` for a fresh price; when CoinGecko is unreachable the
+    last-known-good price or the series' last point is used instead, and
+    ``None`` is returned when neither exists.
+    """
+    try:
+        price = await _get_cached_price_async(crypto_id)
+    except requests.exceptions.RequestException:
+        price = None
+    if price is None:
+        return await asyncio.to_thread(_fallback_latest_price, crypto_id, series)
+    return price, int(time.time() * 1000), None
+
+
+def _prepare_change_between(
+    crypto: str, start: int | str, end: int | str | None
+) -> tuple[str, int, int, int, str, dict[str, Any] | None]:
+    """Resolve and validate a date-range summary into ``(crypto_id, start_ms, end_ms, days, interval, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", 0, 0, 0, "", _unsupported_crypto_error(crypto)
+
+    now_ms = int(time.time() * 1000)
+    try:
+        start_ms = _parse_time(start)
+        end_ms = now_ms if end is None else min(_parse_time(end), now_ms)
+    except ValueError as exc:
+        return "", 0, 0, 0, "", {"status": "error", "error_message": str(exc)}
+    if start_ms >= end_ms:
+        return "", 0, 0, 0, "", {"status": "error", "error_message": "The range start must be before its end."}
+
+    days, interval, error = _range_source(start_ms)
+    if error:
+        return "", 0, 0, 0, "", error
+    return crypto_id, start_ms, end_ms, days, interval, None
+
+
+def _build_change_between_result(
+    crypto: str, crypto_id: str, series: PriceSeries, start_ms: int, end_ms: int, interval: str, as_of: float | None
+) -> dict[str, Any]:
+    """Summarise the stored points between ``start_ms`` and ``end_ms``."""
+    window = series.between(start_ms, end_ms + 1)
+    if len(window) < 2:
+        return {
+            "status": "error",
+            "error_message": f"Not enough stored prices for {crypto} ({crypto_id}) between these times.",
+        }
+
+    stats = RollingWindow.from_series(window, end_ms - start_ms).snapshot()
+    days = math.ceil((end_ms - start_ms) / _DAY_MS)
+    period = f"Between {_format_time(window.first_timestamp)} and {_format_time(window.last_timestamp)}"
+    result = _build_price_change_summary(crypto, crypto_id, days, stats, period)
+    result.update(start=_format_time(start_ms), end=_format_time(end_ms), source_interval=interval)
+    return _tag_last_known_good(result, as_of) if as_of is not None else result
+
+
+async def get_crypto_price_change_between_async(
+    crypto: str, start: int | str, end: int | str | None = None
+) -> dict[str, Any]:
+    """
+    Summarise how a cryptocurrency's price changed between two dates or times.
+
+    Like ``get_crypto_price_change_summary`` but for any range within the last
+    365 days. Past ranges already held locally are answered without contacting
+    CoinGecko.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        start: Range start as an ISO 8601 date or date-time in UTC, or a Unix timestamp in seconds
+        end: Range end in the same formats (default: now)
+
+    Returns:
+        A dictionary with the first, last, minimum and maximum prices of the range and the change between them.
+    """
+    crypto_id, start_ms, end_ms, days, interval, error = _prepare_change_between(crypto, start, end)
+    if error:
+        return error
+
+    try:
+        series, as_of = await _load_range_async(crypto_id, start_ms, end_ms, days, interval)
+    except requests.exceptions.RequestException as exc:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve price history", exc)}
+
+    return _build_change_between_result(crypto, crypto_id, series, start_ms, end_ms, interval, as_of)
+
+
+def _generate_mock_price_change_summary(crypto: str, crypto_id: str, days: int) -> dict[str, Any]:
+    """
+    Generate mock price change summary as fallback when API is unavailable.
+
+    Args:
+        crypto: The cryptocurrency name
+        crypto_id: The cryptocurrency ID
+        days: The number of days for the summary
+    """
+    import random
+
+    # Generate realistic mock data (using random values within reasonable ranges)
+    base_price = random.uniform(20000, 80000) if crypto_id == 'bitcoin' else random.uniform(1000, 5000)
+
+    # Simulate price changes based on typical crypto volatility
+    volatility_factor = 0.05 * (days ** 0.5)  # Higher volatility for longer periods
+    price_change_percentage = random.uniform(-volatility_factor * 100, volatility_factor * 100)
+
+    initial_price = base_price
+    final_price = initial_price * (1 + price_change_percentage / 100)
+
+    # Generate min/max based on some variation around the range
+    min_price = min(initial_price, final_price) * random.uniform(0.95, 0.99)
+    max_price = max(initial_price, final_price) * random.uniform(1.01, 1.05)
+
+    price_change = final_price - initial_price
+    price_change_direction = "increased" if price_change >= 0 else "decreased"
+
+    # Format the summary report
+    summary = (
+        f"[MOCK DATA] Over the past {days} day{'s' if days != 1 else ''}, "
+        f"{crypto} ({crypto_id}) has {price_change_direction} from ${initial_price:,.2f} to ${final_price:,.2f}. "
+        f"The price changed by ${abs(price_change):,.2f} ({price_change_percentage:+.2f}%). "
+        f"The highest price during this period was ${max_price:,.2f} and the lowest was ${min_price:,.2f}. "
+        f"[Note: Real-time data currently unavailable, showing simulated data for demonstration purposes]"
+    )
+
+    return {
+        "status": "success",
+        "report": summary,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "days": days,
+        "initial_price_usd": initial_price,
+        "final_price_usd": final_price,
+        "min_price_usd": min_price,
+        "max_price_usd": max_price,
+        "price_change_usd": price_change,
+        "price_change_percentage": price_change_percentage,
+        "is_mock_data": True,  # Indicate that this is mock data
+    }
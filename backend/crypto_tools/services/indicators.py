@@ -0,0 +1,121 @@
+"""Vectorized technical indicators for the crypto trend prediction."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+# Hourly points needed for every indicator, and the minimum accepted history.
+TREND_LOOKBACK = 72
+MIN_TREND_HISTORY = 48
+
+# Percentage thresholds for the momentum and 6-hour price action votes.
+MOMENTUM_THRESHOLD = 1.0
+RECENT_CHANGE_THRESHOLD = 0.5
+
+
+def price_matrix(series: Sequence[np.ndarray], lookback: int = TREND_LOOKBACK) -> np.ndarray:
+    """
+    Right-align the last ``lookback`` prices of each series into one ``(coins, lookback)`` matrix.
+
+    Series shorter than ``lookback`` are left-padded with NaN, so column ``-1``
+    always holds the latest price of every coin.
+    """
+    matrix = np.full((len(series), lookback), np.nan, dtype=np.float64)
+    for row, prices in enumerate(series):
+        tail = np.asarray(prices, dtype=np.float64)[-lookback:]
+        if len(tail):
+            matrix[row, lookback - len(tail):] = tail
+    return matrix
+
+
+def tail_means(matrix: np.ndarray, windows: Sequence[int]) -> dict[int, np.ndarray]:
+    """Return the mean of the last ``w`` columns of every row for each window ``w``, in one cumulative pass."""
+    # Cumulative sums over the reversed rows give the sum of the last k points at column k - 1.
+    sums = np.nancumsum(matrix[:, ::-1], axis=1)
+    return {window: sums[:, window - 1] / window for window in windows}
+
+
+def compute_trend_indicators(matrix: np.ndarray, current_prices: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """
+    Compute momentum, moving averages, volatility and signal votes for every row of ``matrix``.
+
+    Args:
+        matrix: ``(coins, TREND_LOOKBACK)`` hourly prices from ``price_matrix``;
+            each row needs at least ``MIN_TREND_HISTORY`` points
+        current_prices: Live price per coin; NaN entries fall back to the latest hourly price
+
+    Returns:
+        A mapping of indicator name to a ``(coins,)`` array.
+    """
+    latest = matrix[:, -1]
+    if current_prices is None:
+        current = latest.copy()
+    else:
+        current = np.where(np.isnan(current_prices), latest, current_prices)
+
+    means = tail_means(matrix, (12, 24, 48, 72))
+    ma_12h, ma_24h = means[12], means[24]
+    prev_24h = 2 * means[48] - means[24]  # mean of the 24 points before the last 24
+
+    # Rows are right-aligned, so a coin has 72 hourly points iff column -72 is set;
+    # shorter histories use the 24h MA as their long-term MA.
+    ma_72h = np.where(np.isnan(matrix[:, -72]), ma_24h, means[72])
+
+    momentum = (ma_24h - prev_24h) / prev_24h * 100
+    volatility = matrix[:, -24:].std(axis=1) / ma_24h * 100
+    recent_change = (matrix[:, -1] - matrix[:, -6]) / matrix[:, -6] * 100
+
+    indicators = {
+        "current_price": current,
+        "momentum": momentum,
+        "ma_12h": ma_12h,
+        "ma_24h": ma_24h,
+        "ma_72h": ma_72h,
+        "volatility": volatility,
+        "recent_change": recent_change,
+    }
+    indicators.update(score_signals(momentum, ma_12h, ma_24h, ma_72h, current, recent_change, volatility))
+    return indicators
+
+
+def score_signals(
+    momentum: np.ndarray,
+    ma_12h: np.ndarray,
+    ma_24h: np.ndarray,
+    ma_72h: np.ndarray,
+    current_price: np.ndarray,
+    recent_change: np.ndarray,
+    volatility: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Turn indicator arrays of any (matching) shape into signal votes and a prediction.
+
+    Returns per-signal votes, bullish/bearish counts, the prediction as
+    ``+1`` (UP), ``-1`` (DOWN) or ``0`` (NEUTRAL) and the confidence as a fraction.
+    """
+    momentum_vote = np.where(momentum > MOMENTUM_THRESHOLD, 1, np.where(momentum < -MOMENTUM_THRESHOLD, -1, 0))
+    ma_cross_vote = np.where(ma_12h > ma_24h, 1, -1)
+    ma_72h_vote = np.where(current_price > ma_72h, 1, -1)
+    recent_vote = np.where(recent_change > RECENT_CHANGE_THRESHOLD, 1, np.where(recent_change < -RECENT_CHANGE_THRESHOLD, -1, 0))
+
+    votes = np.stack([momentum_vote, ma_cross_vote, ma_72h_vote, recent_vote])
+    bullish = np.count_nonzero(votes > 0, axis=0)
+    bearish = np.count_nonzero(votes < 0, axis=0)
+    prediction = np.sign(bullish - bearish)
+
+    confidence = np.where(prediction == 0, 0.4, np.minimum(0.5 + np.abs(bullish - bearish) * 0.1, 0.8))
+    # Higher volatility means lower confidence.
+    confidence = confidence * np.where(volatility > 5, 0.8, np.where(volatility > 3, 0.9, 1.0))
+
+    return {
+        "momentum_vote": momentum_vote,
+        "ma_cross_vote": ma_cross_vote,
+        "ma_72h_vote": ma_72h_vote,
+        "recent_vote": recent_vote,
+        "bullish_signals": bullish,
+        "bearish_signals": bearish,
+        "prediction": prediction,
+        "confidence": confidence,
+    }
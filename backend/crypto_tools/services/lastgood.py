@@ -0,0 +1,86 @@
+"""Persistent last-known-good CoinGecko prices used when the API is unavailable."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+
+from .timeseries import DATA_DIR
+
+LAST_GOOD_DB_PATH = os.path.join(DATA_DIR, "last_known_good.sqlite3")
+
+
+class LastKnownGoodStore:
+    """
+    SQLite table holding the most recent successfully fetched USD price of each coin.
+
+    The database runs in WAL mode so every worker process can write fresh prices
+    while others read them during an outage.
+    """
+
+    def __init__(self, path: str = LAST_GOOD_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the shared connection, creating the database on first use; caller must hold the lock."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                "coin_id TEXT PRIMARY KEY, price_usd REAL NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def record_prices(self, prices: dict[str, float | None], fetched_at: float | None = None) -> None:
+        """Remember the non-missing ``prices`` as fetched at ``fetched_at`` (default: now)."""
+        rows = [(coin_id, price, fetched_at or time.time()) for coin_id, price in prices.items() if price is not None]
+        if not rows:
+            return
+        with self._lock:
+            self._connect().executemany(
+                "INSERT INTO prices (coin_id, price_usd, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(coin_id) DO UPDATE SET price_usd = excluded.price_usd, fetched_at = excluded.fetched_at "
+                "WHERE excluded.fetched_at >= prices.fetched_at",
+                rows,
+            )
+
+    def get_prices(self, coin_ids: list[str], max_age: float) -> dict[str, tuple[float, float]]:
+        """Return ``{coin_id: (price_usd, fetched_at)}`` for coins with a price newer than ``max_age`` seconds."""
+        if not coin_ids:
+            return {}
+        placeholders = ",".join("?" * len(coin_ids))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT coin_id, price_usd, fetched_at FROM prices WHERE coin_id IN ({placeholders}) AND fetched_at >= ?",
+                [*coin_ids, time.time() - max_age],
+            ).fetchall()
+        return {coin_id: (price, fetched_at) for coin_id, price, fetched_at in rows}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+_store: LastKnownGoodStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_last_good_store() -> LastKnownGoodStore:
+    """Return the process-wide last-known-good store in ``CRYPTO_DATA_DIR``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LastKnownGoodStore(LAST_GOOD_DB_PATH)
+    return _store
@@ -0,0 +1,215 @@
+"""Live price feed glue: streaming subscriptions, the anomaly detectors it feeds and price alerts."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any
+
+import requests
+
+from .alerts import AlertBook, validate_alert
+from .anomaly import AnomalyBook
+from .price import (
+    _get_cached_price_async,
+    _get_cached_prices_async,
+    _last_good_price,
+    _resolve_batch,
+    _resolve_crypto_id,
+    _unsupported_crypto_error,
+)
+from .stream import PriceFeed, PriceSubscription
+
+# Seconds between upstream polls of the shared streaming price feed.
+STREAM_POLL_SECONDS = float(os.getenv("CRYPTO_STREAM_POLL_SECONDS", "5"))
+
+# Price anomalies: z-score that flags a move and half-life of the return statistics.
+ANOMALY_Z_THRESHOLD = float(os.getenv("CRYPTO_ANOMALY_Z_THRESHOLD", "4"))
+ANOMALY_HALF_LIFE_HOURS = float(os.getenv("CRYPTO_ANOMALY_HALF_LIFE_HOURS", "24"))
+
+# Largest number of active price alerts held in memory.
+ALERT_MAX_ACTIVE = int(os.getenv("CRYPTO_ALERT_MAX_ACTIVE", "100000"))
+
+
+_anomaly_book = AnomalyBook(half_life_ms=ANOMALY_HALF_LIFE_HOURS * 3_600_000, threshold=ANOMALY_Z_THRESHOLD)
+
+_alert_book = AlertBook(max_alerts=ALERT_MAX_ACTIVE)
+
+
+def _on_feed_price(crypto_id: str, timestamp: int, price: float) -> None:
+    """Feed a polled price to the anomaly detectors and trigger the price alerts it crosses."""
+    _anomaly_book.observe(crypto_id, timestamp, price)
+    _alert_book.evaluate(crypto_id, price, timestamp)
+
+
+_price_feed = PriceFeed(
+    lambda crypto_ids: _get_cached_prices_async(crypto_ids),
+    poll_interval=STREAM_POLL_SECONDS,
+    on_price=_on_feed_price,
+)
+
+
+def resolve_stream_coins(cryptos: list[str]) -> tuple[list[str], dict[str, Any] | None]:
+    """Resolve the coins of a price stream to CoinGecko IDs without subscribing; returns ``(crypto_ids, error)``."""
+    resolved, error = _resolve_batch(cryptos)
+    if error:
+        return [], error
+    unsupported = [crypto for crypto, crypto_id in resolved.items() if not crypto_id]
+    if unsupported:
+        return [], _unsupported_crypto_error(", ".join(unsupported))
+    return list(dict.fromkeys(resolved.values())), None
+
+
+def open_price_stream(cryptos: list[str]) -> tuple[PriceSubscription | None, dict[str, Any] | None]:
+    """
+    Subscribe to live price updates for ``cryptos`` on the shared feed.
+
+    Must be called from the event loop serving the stream. Returns the
+    subscription, or ``None`` and an error payload when the coins are invalid.
+    """
+    crypto_ids, error = resolve_stream_coins(cryptos)
+    if error:
+        return None, error
+    return _price_feed.subscribe(crypto_ids), None
+
+
+def close_price_stream(subscription: PriceSubscription) -> None:
+    """Release a subscription returned by ``open_price_stream``."""
+    _price_feed.unsubscribe(subscription)
+
+
+async def close_price_feed() -> None:
+    """Stop the shared price feed poller; used at application shutdown."""
+    await _price_feed.close()
+
+
+def _describe_alert(alert: dict[str, Any]) -> str:
+    """Describe an alert in one line, e.g. 'bitcoin above $70,000.00'."""
+    text = f"{alert['crypto_id']} {alert['direction']} ${alert['threshold']:,.2f}"
+    return f"{text} ({alert['note']})" if alert.get("note") else text
+
+
+def _prepare_price_alert(crypto: str, direction: str, threshold: float) -> tuple[str, dict[str, Any] | None]:
+    """Resolve and validate an alert before the current price is fetched; returns ``(crypto_id, error)``."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return "", _unsupported_crypto_error(crypto)
+    try:
+        validate_alert(direction, threshold)
+    except ValueError as exc:
+        return "", {"status": "error", "error_message": str(exc)}
+    return crypto_id, None
+
+
+def _register_price_alert(
+    crypto: str, crypto_id: str, direction: str, threshold: float, note: str | None, current_price: float | None
+) -> dict[str, Any]:
+    """Add the alert to the book against ``current_price``, the fetched or last-known-good price."""
+    if current_price is None:
+        return {
+            "status": "error",
+            "error_message": f"Could not retrieve the current price of {crypto} ({crypto_id}) to register the alert.",
+        }
+
+    try:
+        alert = _alert_book.add(crypto_id, direction, threshold, current_price, note)
+    except ValueError as exc:
+        return {"status": "error", "error_message": str(exc)}
+
+    return {
+        "status": "success",
+        "report": f"Alert registered: {_describe_alert(alert)} (currently ${current_price:,.2f}).",
+        "alert": alert,
+    }
+
+
+async def create_price_alert_async(
+    crypto: str, direction: str, threshold: float, note: str | None = None
+) -> dict[str, Any]:
+    """
+    Register a one-shot alert for when a cryptocurrency's price crosses above or below a threshold.
+
+    The alert is registered against the current price and rejected if that
+    price already satisfies it, so it only fires on a crossing. Alerts are
+    checked against every price the shared streaming feed polls.
+    Triggered alerts are listed by ``get_price_alerts`` rather than pushed to
+    the stream, which is shared by clients that did not create them. Alerts
+    live in this process and are only evaluated while the coin is being streamed.
+
+    Args:
+        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc')
+        direction: 'above' or 'below'
+        threshold: The USD price that triggers the alert
+        note: Optional text kept with the alert
+
+    Returns:
+        A dictionary with the registered alert and its ``alert_id``.
+    """
+    crypto_id, error = _prepare_price_alert(crypto, direction, threshold)
+    if error:
+        return error
+
+    try:
+        current_price = await _get_cached_price_async(crypto_id)
+    except requests.exceptions.RequestException:
+        current_price = None
+    if current_price is None:
+        current_price = await asyncio.to_thread(_last_good_price, crypto_id)
+    return _register_price_alert(crypto, crypto_id, direction, threshold, note, current_price)
+
+
+def get_price_alerts(crypto: str | None = None) -> dict[str, Any]:
+    """
+    List the active and recently triggered price alerts, optionally of one cryptocurrency.
+
+    Args:
+        crypto: The cryptocurrency name or symbol to filter by (default: all coins)
+
+    Returns:
+        A dictionary with the active alerts and the most recently triggered ones.
+    """
+    crypto_id = None
+    if crypto is not None:
+        crypto_id = _resolve_crypto_id(crypto)
+        if not crypto_id:
+            return _unsupported_crypto_error(crypto)
+
+    active = _alert_book.active(crypto_id)
+    triggered = _alert_book.recently_triggered(crypto_id)
+    return {
+        "status": "success",
+        "report": f"{len(active)} active and {len(triggered)} recently triggered price alerts.",
+        "active": active,
+        "triggered": triggered,
+    }
+
+
+def delete_price_alert(alert_id: str) -> dict[str, Any]:
+    """
+    Delete an active price alert.
+
+    Args:
+        alert_id: The ``alert_id`` returned by ``create_price_alert_async``
+
+    Returns:
+        A dictionary with the deleted alert, or an error if no active alert has that ID.
+    """
+    alert = _alert_book.remove(alert_id)
+    if alert is None:
+        return {"status": "error", "error_message": f"No active price alert with ID '{alert_id}'."}
+    return {"status": "success", "report": f"Alert deleted: {_describe_alert(alert)}.", "alert": alert}
+
+
+def get_price_alert_stats() -> dict[str, Any]:
+    """Return active alert, evaluation and trigger counters of the price alert book."""
+    return _alert_book.stats()
+
+
+def get_price_feed_stats() -> dict[str, Any]:
+    """Return subscriber and poll counters for the shared streaming price feed."""
+    return _price_feed.stats()
+
+
+def get_anomaly_detector_stats() -> dict[str, Any]:
+    """Return the coins tracked by the price anomaly detectors and the prices and anomalies they have seen."""
+    return _anomaly_book.stats()
@@ -0,0 +1,68 @@
+"""Selective parsing of CoinGecko ``market_chart`` payloads into NumPy arrays."""
+
+from __future__ import annotations
+
+import re
+import warnings
+from typing import Any
+
+import numpy as np
+
+from .series import PriceSeries
+
+_PRICES_KEY = re.compile(rb'"prices"\s*:\s*\[')
+# Each point is a flat ``[timestamp, price]`` pair, so the first ``]`` followed
+# by another ``]`` closes the whole ``prices`` array.
+_ARRAY_END = re.compile(rb"\]\s*\]|\[\s*\]")
+# Brackets become spaces, leaving ``ts, price , ts, price`` for ``np.fromstring``.
+_STRIP_BRACKETS = bytes.maketrans(b"[]", b"  ")
+
+
+def _parse_prices(raw: bytes) -> np.ndarray:
+    """
+    Return the ``prices`` pairs of a raw ``market_chart`` body as an ``(n, 2)`` float array.
+
+    Only the ``prices`` array is read; ``market_caps`` and ``total_volumes``
+    are never decoded. Raises ``ValueError`` for anything but plain numeric
+    pairs (e.g. ``null`` points), so the caller can fall back to ``json``.
+    """
+    key = _PRICES_KEY.search(raw)
+    if key is None:
+        raise ValueError("market_chart payload has no prices array")
+    end = _ARRAY_END.search(raw, key.end() - 1)
+    if end is None:
+        raise ValueError("unterminated prices array")
+    body = raw[key.end():end.end() - 1].translate(_STRIP_BRACKETS)
+    if not body.strip():
+        return np.empty((0, 2), dtype=np.float64)
+
+    with warnings.catch_warnings():
+        # Older NumPy only warns about unparsable input instead of raising.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(body, dtype=np.float64, sep=",")
+        except DeprecationWarning as exc:
+            raise ValueError(str(exc)) from exc
+    if len(values) != body.count(b",") + 1 or len(values) % 2:
+        raise ValueError("prices array is not a list of [timestamp, price] pairs")
+    return values.reshape(-1, 2)
+
+
+def market_chart_points(response: Any) -> PriceSeries:
+    """
+    Return the ``prices`` of a ``market_chart`` response as a ``PriceSeries``.
+
+    Works with ``requests`` and ``httpx`` responses alike. The raw body is
+    parsed selectively; irregular payloads fall back to ``response.json()``.
+    """
+    raw = response.content
+    points = None
+    if isinstance(raw, (bytes, bytearray)):
+        try:
+            points = _parse_prices(bytes(raw))
+        except ValueError:
+            points = None
+    if points is None:
+        prices = [point for point in response.json().get("prices") or [] if point and point[1] is not None]
+        points = np.asarray(prices, dtype=np.float64).reshape(-1, 2)
+    return PriceSeries(points[:, 0].astype(np.int64), np.ascontiguousarray(points[:, 1]))
@@ -0,0 +1,45 @@
+"""Resampling of price series into OHLC candles."""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+
+from .series import PriceSeries
+
+_INTERVAL = re.compile(r"^\s*(\d+)\s*([mhd])\s*$", re.IGNORECASE)
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+
+
+def parse_candle_interval(text: str) -> int:
+    """Return the width in milliseconds of a candle interval like ``5m``, ``4h`` or ``1d``."""
+    match = _INTERVAL.match(text or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid candle interval '{text}'. Use a number followed by m, h or d, e.g. '5m', '4h', '1d'.")
+    return int(match.group(1)) * _UNIT_MS[match.group(2).lower()]
+
+
+def resample_ohlc(series: PriceSeries, width_ms: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Bucket ``series`` into candles of ``width_ms`` aligned to the Unix epoch (so ``4h`` candles start at 00:00 UTC).
+
+    Returns ``(open_times_ms, ohlc)`` where ``ohlc`` is an ``(n, 4)`` array of
+    open, high, low and close prices. Buckets without points produce no candle.
+    The whole series is reduced in a few vectorized passes with ``np.ufunc.reduceat``.
+    """
+    if not len(series):
+        return np.empty(0, dtype=np.int64), np.empty((0, 4), dtype=np.float64)
+
+    buckets = series.timestamps // width_ms
+    # Index of the first point of every bucket; the series is sorted by time.
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(series)] - 1
+
+    prices = series.prices
+    ohlc = np.empty((len(starts), 4), dtype=np.float64)
+    ohlc[:, 0] = prices[starts]
+    ohlc[:, 1] = np.maximum.reduceat(prices, starts)
+    ohlc[:, 2] = np.minimum.reduceat(prices, starts)
+    ohlc[:, 3] = prices[ends]
+    return buckets[starts] * width_ms, ohlc
@@ -1,585 +1,354 @@
-"""Cryptocurrency price lookup utilities using CoinGecko API."""
+"""Current cryptocurrency price lookups using CoinGecko API."""
 
 from __future__ import annotations
 
+import asyncio
+import os
 import time
+from datetime import datetime, timezone
 from typing import Any
 
 import requests
 
+from .batcher import MicroBatcher
+from .cache import TTLCache
+from .client import COINGECKO_BASE_URL
+from .client import make_request_with_retry as _make_request_with_retry
+from .client import make_request_with_retry_async as _make_request_with_retry_async
+from .lastgood import get_last_good_store
+from .registry import CoinRegistry
+
+# Aliases that override the coin registry's ID, symbol and name lookups
+CRYPTO_ALIASES = {
+    'bitcoin': 'bitcoin',
+    'btc': 'bitcoin',
+    'ethereum': 'ethereum',
+    'eth': 'ethereum',
+    'litecoin': 'litecoin',
+    'ltc': 'litecoin',
+    'ripple': 'ripple',
+    'xrp': 'ripple',
+    'cardano': 'cardano',
+    'ada': 'cardano',
+    'solana': 'solana',
+    'sol': 'solana',
+    'dogecoin': 'dogecoin',
+    'doge': 'dogecoin',
+    'polkadot': 'polkadot',
+    'dot': 'polkadot',
+    'chainlink': 'chainlink',
+    'link': 'chainlink',
+    'uniswap': 'uniswap',
+    'uni': 'uniswap',
+}
+
+# Current prices are cached per CoinGecko ID for a few seconds; concurrent
+# misses for the same coin share one upstream request.
+PRICE_CACHE_TTL = float(os.getenv("COINGECKO_PRICE_CACHE_TTL", "5"))
+PRICE_CACHE_MAX_ENTRIES = int(os.getenv("COINGECKO_PRICE_CACHE_MAX_ENTRIES", "512"))
+
+_price_cache = TTLCache(ttl=PRICE_CACHE_TTL, max_entries=PRICE_CACHE_MAX_ENTRIES)
+
+# Upper bound on coins per batch lookup, keeping the ``ids=`` query string short.
+MAX_PRICE_BATCH_SIZE = 50
+
+# Concurrent async cache misses for different coins arriving within the window
+# are merged into one ``/simple/price?ids=a,b,c`` request.
+PRICE_BATCH_WINDOW_MS = float(os.getenv("COINGECKO_PRICE_BATCH_WINDOW_MS", "5"))
+PRICE_BATCH_MAX_SIZE = int(os.getenv("COINGECKO_PRICE_BATCH_MAX_SIZE", str(MAX_PRICE_BATCH_SIZE)))
+
+# Oldest real data served by the last-known-good fallback before mock data is used.
+LAST_GOOD_MAX_AGE_SECONDS = int(os.getenv("CRYPTO_LAST_GOOD_MAX_AGE_SECONDS", str(7 * 86400)))
+
+
+_coin_registry = CoinRegistry(CRYPTO_ALIASES)
+
+
+def get_coin_registry() -> CoinRegistry:
+    """Return the registry used to resolve coin names, symbols and aliases."""
+    return _coin_registry
+
+
+def _resolve_crypto_id(crypto: str) -> str | None:
+    """Return the CoinGecko ID for ``crypto`` or ``None`` if it is not supported."""
+    return _coin_registry.resolve(crypto)
+
+
+def _unsupported_crypto_error(crypto: str) -> dict[str, Any]:
+    """Build the error payload returned for an unknown cryptocurrency."""
+    return {
+        "status": "error",
+        "error_message": f"Cryptocurrency '{crypto}' not supported. Use a CoinGecko coin ID, symbol or name, e.g. bitcoin, btc, ethereum, eth, solana or sol.",
+    }
 
-def _make_request_with_retry(url: str, params: dict, timeout: int = 15, max_retries: int = 3) -> requests.Response:
-    """
-    Make an API request with retry logic and exponential backoff.
 
-    Args:
-        url: The API endpoint URL
-        params: Query parameters for the request
-        timeout: Request timeout in seconds
-        max_retries: Maximum number of retry attempts
-    """
-    last_exception = None
-
-    for attempt in range(max_retries + 1):  # +1 to allow the first attempt without retry
-        try:
-            response = requests.get(url, params=params, timeout=timeout)
-
-            # If successful (2xx), return immediately
-            if response.status_code == 200:
-                return response
-
-            # If it's a client error (4xx) that's not rate limiting, don't retry
-            if 400 <= response.status_code < 500 and response.status_code != 429:
-                response.raise_for_status()
-
-            # For rate limiting (429) or server errors (5xx), prepare to retry
-            if response.status_code == 429 or 500 <= response.status_code < 600:
-                if attempt < max_retries:  # Don't sleep after the final attempt
-                    # Exponential backoff: wait 2^attempt seconds
-                    wait_time = 2 ** attempt
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    # Last attempt failed, raise the exception
-                    response.raise_for_status()
-            else:
-                # For other status codes, raise immediately
-                response.raise_for_status()
-
-        except requests.exceptions.RequestException as exc:
-            last_exception = exc
-            if attempt < max_retries:
-                # Exponential backoff: wait 2^attempt seconds before retrying
-                wait_time = 2 ** attempt
-                time.sleep(wait_time)
-            else:
-                # All retries exhausted, re-raise the last exception
-                raise exc
-
-    # This should not be reached if the function logic is correct
-    raise last_exception if last_exception else requests.RequestException("Unknown error occurred")
+def search_coins(query: str, limit: int = 10) -> dict[str, Any]:
+    """Find coins whose ID, symbol, name or alias starts with ``query``."""
+    if not query or not query.strip():
+        return {"status": "error", "error_message": "Search query cannot be empty."}
+    matches = _coin_registry.search(query, limit)
+    return {
+        "status": "success",
+        "query": query.strip(),
+        "results": matches,
+    }
 
 
-def get_crypto_price(crypto: str) -> dict[str, Any]:
-    """Fetch the current price of ``crypto`` in USD using CoinGecko API."""
-    # Map common aliases to CoinGecko IDs
-    crypto_aliases = {
-        'bitcoin': 'bitcoin',
-        'btc': 'bitcoin',
-        'ethereum': 'ethereum',
-        'eth': 'ethereum',
-        'litecoin': 'litecoin',
-        'ltc': 'litecoin',
-        'ripple': 'ripple',
-        'xrp': 'ripple',
-        'cardano': 'cardano',
-        'ada': 'cardano',
-        'solana': 'solana',
-        'sol': 'solana',
-        'dogecoin': 'dogecoin',
-        'doge': 'dogecoin',
-        'polkadot': 'polkadot',
-        'dot': 'polkadot',
-        'polygon': 'polygon',
-        'matic': 'polygon',
-        'chainlink': 'chainlink',
-        'link': 'chainlink',
-        'uniswap': 'uniswap',
-        'uni': 'uniswap',
+def get_coin_registry_stats() -> dict[str, Any]:
+    """Return the number of indexed coins and the age of the local coin list snapshot."""
+    return _coin_registry.stats()
+
+
+def _simple_price_request(*crypto_ids: str) -> tuple[str, dict[str, Any]]:
+    """Return the URL and query parameters for a ``/simple/price`` lookup of one or more IDs."""
+    url = f"{COINGECKO_BASE_URL}/simple/price"
+    params = {
+        'ids': ','.join(crypto_ids),
+        'vs_currencies': 'usd'
     }
+    return url, params
 
-    crypto_id = crypto_aliases.get(crypto.lower())
 
-    if not crypto_id:
+def _request_error_message(prefix: str, exc: requests.exceptions.RequestException) -> str:
+    """Format a request failure, including the upstream status code when known."""
+    error_msg = f"{prefix}: {exc}"
+    if hasattr(exc, 'response') and exc.response is not None:
+        error_msg += f" (Status: {exc.response.status_code})"
+    return error_msg
+
+
+def _build_price_result(crypto: str, crypto_id: str, price: float | None) -> dict[str, Any]:
+    """Turn a USD price into the ``get_crypto_price`` result."""
+    if price is None:
         return {
             "status": "error",
-            "error_message": f"Cryptocurrency '{crypto}' not supported. Available options include: bitcoin, ethereum, litecoin, ripple, cardano, solana, dogecoin, polkadot, polygon, chainlink, uniswap (and their common aliases like btc, eth, etc.)",
+            "error_message": f"Price data not available for cryptocurrency '{crypto}'.",
         }
 
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {
-        'ids': crypto_id,
-        'vs_currencies': 'usd'
+    report = f"The current price of {crypto} ({crypto_id}) is ${price:,.2f} USD."
+    return {
+        "status": "success",
+        "report": report,
+        "crypto": crypto,
+        "crypto_id": crypto_id,
+        "price_usd": price,
     }
 
-    try:
-        response = _make_request_with_retry(url, params, timeout=10)
-        # response is already successful if we reach here
-        data = response.json()
 
-        if crypto_id not in data or 'usd' not in data[crypto_id]:
-            return {
-                "status": "error",
-                "error_message": f"Price data not available for cryptocurrency '{crypto}'.",
-            }
+def _extract_price(crypto_id: str, data: dict[str, Any]) -> float | None:
+    """Return the USD price for ``crypto_id`` from a ``/simple/price`` payload."""
+    if crypto_id in data and 'usd' in data[crypto_id]:
+        return data[crypto_id]['usd']
+    return None
 
-        price = data[crypto_id]['usd']
 
-        report = f"The current price of {crypto} ({crypto_id}) is ${price:,.2f} USD."
-        return {
-            "status": "success",
-            "report": report,
-            "crypto": crypto,
-            "crypto_id": crypto_id,
-            "price_usd": price,
-        }
-    except requests.exceptions.RequestException as exc:
-        error_msg = f"Failed to retrieve cryptocurrency price data: {exc}"
-        if hasattr(exc, 'response') and exc.response is not None:
-            error_msg += f" (Status: {exc.response.status_code})"
-        return {"status": "error", "error_message": error_msg}
+def _fetch_prices(crypto_ids: list[str]) -> dict[str, float | None]:
+    """Fetch USD prices for several IDs with a single ``/simple/price`` request."""
+    url, params = _simple_price_request(*crypto_ids)
+    response = _make_request_with_retry(url, params, timeout=10)
+    data = response.json()
+    prices = {crypto_id: _extract_price(crypto_id, data) for crypto_id in crypto_ids}
+    get_last_good_store().record_prices(prices)
+    return prices
+
+
+async def _fetch_prices_async(crypto_ids: list[str]) -> dict[str, float | None]:
+    """Async variant of ``_fetch_prices``."""
+    url, params = _simple_price_request(*crypto_ids)
+    response = await _make_request_with_retry_async(url, params, timeout=10)
+    data = response.json()
+    prices = {crypto_id: _extract_price(crypto_id, data) for crypto_id in crypto_ids}
+    # The SQLite write can wait on other workers' locks, so it runs off the event loop.
+    await asyncio.to_thread(get_last_good_store().record_prices, prices)
+    return prices
+
+
+def _format_age(seconds: float) -> str:
+    """Describe an age in seconds as e.g. '5 minutes' or '2 hours'."""
+    for unit, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+    return "less than a minute"
+
+
+def _tag_last_known_good(result: dict[str, Any], as_of: float) -> dict[str, Any]:
+    """Mark ``result`` as served from last-known-good data last updated at epoch ``as_of``."""
+    age = max(0.0, time.time() - as_of)
+    result["report"] = f"[LAST KNOWN GOOD DATA, {_format_age(age)} old] {result['report']}"
+    result["is_last_known_good"] = True
+    result["data_age_seconds"] = round(age)
+    result["data_as_of"] = datetime.fromtimestamp(as_of, tz=timezone.utc).isoformat()
+    return result
 
 
-def get_crypto_price_change_summary(crypto: str, days: int = 7) -> dict[str, Any]:
+def _last_good_prices(crypto_ids: list[str]) -> dict[str, tuple[float, float]]:
     """
-    Fetch the price change summary for ``crypto`` over the specified number of ``days`` using CoinGecko API.
+    Return ``{crypto_id: (price, fetched_at)}`` for coins with a recent enough last-known-good price.
 
-    Args:
-        crypto: The cryptocurrency to get price change for
-        days: The number of days to look back (default 7, max 365 for daily intervals)
+    The read waits while a writer holds the store, so async callers run it in a worker thread.
     """
-    # Map common aliases to CoinGecko IDs
-    crypto_aliases = {
-        'bitcoin': 'bitcoin',
-        'btc': 'bitcoin',
-        'ethereum': 'ethereum',
-        'eth': 'ethereum',
-        'litecoin': 'litecoin',
-        'ltc': 'litecoin',
-        'ripple': 'ripple',
-        'xrp': 'ripple',
-        'cardano': 'cardano',
-        'ada': 'cardano',
-        'solana': 'solana',
-        'sol': 'solana',
-        'dogecoin': 'dogecoin',
-        'doge': 'dogecoin',
-        'polkadot': 'polkadot',
-        'dot': 'polkadot',
-        'polygon': 'polygon',
-        'matic': 'polygon',
-        'chainlink': 'chainlink',
-        'link': 'chainlink',
-        'uniswap': 'uniswap',
-        'uni': 'uniswap',
-    }
+    return get_last_good_store().get_prices(crypto_ids, LAST_GOOD_MAX_AGE_SECONDS)
 
-    crypto_id = crypto_aliases.get(crypto.lower())
 
-    if not crypto_id:
-        return {
-            "status": "error",
-            "error_message": f"Cryptocurrency '{crypto}' not supported. Available options include: bitcoin, ethereum, litecoin, ripple, cardano, solana, dogecoin, polkadot, polygon, chainlink, uniswap (and their common aliases like btc, eth, etc.)",
-        }
+def _last_good_price(crypto_id: str) -> float | None:
+    """Return the last-known-good USD price of ``crypto_id``, if recent enough."""
+    entry = _last_good_prices([crypto_id]).get(crypto_id)
+    return entry[0] if entry is not None else None
 
-    # Validate days parameter
-    if days <= 0:
-        return {
-            "status": "error",
-            "error_message": "Number of days must be a positive integer.",
-        }
 
-    if days > 365:
-        return {
-            "status": "error",
-            "error_message": "Maximum supported time period is 365 days.",
-        }
+def _last_good_price_result(
+    crypto: str, crypto_id: str, exc: requests.exceptions.RequestException
+) -> dict[str, Any]:
+    """Build a tagged ``get_crypto_price`` result from the last-known-good price, or the request error if there is none."""
+    entry = _last_good_prices([crypto_id]).get(crypto_id)
+    if entry is None:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve cryptocurrency price data", exc)}
+    return _tag_last_known_good(_build_price_result(crypto, crypto_id, entry[0]), entry[1])
 
-    # CoinGecko API endpoint for historical data
-    url = f"https://api.coingecko.com/api/v3/coins/{crypto_id}/market_chart"
-    params = {
-        'vs_currency': 'usd',
-        'days': days,
-        'interval': 'daily' if days > 14 else 'hourly'  # Use hourly for shorter periods
-    }
 
-    try:
-        response = _make_request_with_retry(url, params, timeout=15)
-        # response is already successful if we reach here
-        data = response.json()
+def _get_cached_price(crypto_id: str) -> float | None:
+    """Return the USD price for ``crypto_id`` through the single-flight TTL cache."""
+    return _price_cache.get_or_load(crypto_id, lambda: _fetch_prices([crypto_id])[crypto_id])
 
-        if 'prices' not in data or not data['prices']:
-            return _generate_mock_price_change_summary(crypto, crypto_id, days)
 
-        # Process the price data
-        prices = data['prices']
+_price_batcher = MicroBatcher(
+    _fetch_prices_async,
+    window=PRICE_BATCH_WINDOW_MS / 1000,
+    max_batch_size=PRICE_BATCH_MAX_SIZE,
+)
 
-        if len(prices) < 2:
-            return _generate_mock_price_change_summary(crypto, crypto_id, days)
-    except requests.exceptions.RequestException as exc:
-        error_msg = f"Failed to retrieve cryptocurrency price change data: {exc}"
-        if hasattr(exc, 'response') and exc.response is not None:
-            error_msg += f" (Status: {exc.response.status_code})"
-
-        # For request errors, provide mock data as fallback
-        return _generate_mock_price_change_summary(crypto, crypto_id, days)
-
-    # Get initial and final prices
-    initial_price = prices[0][1]  # First price [timestamp, price]
-    final_price = prices[-1][1]   # Last price [timestamp, price]
-
-    # Calculate min and max during the period
-    price_values = [price[1] for price in prices]
-    min_price = min(price_values)
-    max_price = max(price_values)
-
-    # Calculate changes
-    price_change = final_price - initial_price
-    price_change_percentage = (price_change / initial_price) * 100
-    price_change_direction = "increased" if price_change >= 0 else "decreased"
-
-    # Format the summary report
-    summary = (
-        f"Over the past {days} day{'s' if days != 1 else ''}, "
-        f"{crypto} ({crypto_id}) has {price_change_direction} from ${initial_price:,.2f} to ${final_price:,.2f}. "
-        f"The price changed by ${abs(price_change):,.2f} ({price_change_percentage:+.2f}%). "
-        f"The highest price during this period was ${max_price:,.2f} and the lowest was ${min_price:,.2f}."
-    )
 
-    return {
-        "status": "success",
-        "report": summary,
-        "crypto": crypto,
-        "crypto_id": crypto_id,
-        "days": days,
-        "initial_price_usd": initial_price,
-        "final_price_usd": final_price,
-        "min_price_usd": min_price,
-        "max_price_usd": max_price,
-        "price_change_usd": price_change,
-        "price_change_percentage": price_change_percentage,
-    }
+async def _get_cached_price_async(crypto_id: str) -> float | None:
+    """Async variant of ``_get_cached_price``; misses are micro-batched across coins."""
+    return await _price_cache.get_or_load_async(crypto_id, lambda: _price_batcher.load(crypto_id))
 
 
-def predict_crypto_price_trend(crypto: str) -> dict[str, Any]:
-    """
-    Predict the price trend (up/down) for the next 24 hours based on historical data analysis.
+async def _get_cached_prices_async(crypto_ids: list[str]) -> dict[str, float | None]:
+    """Return USD prices for ``crypto_ids``, fetching all cache misses with one request."""
+    prices = {crypto_id: _price_cache.get(crypto_id) for crypto_id in crypto_ids}
+    missing = [crypto_id for crypto_id, price in prices.items() if price is None]
+    if missing:
+        fetched = await _fetch_prices_async(missing)
+        for crypto_id, price in fetched.items():
+            _price_cache.set(crypto_id, price)
+        prices.update(fetched)
+    return prices
 
-    Uses technical analysis indicators including:
-    - Recent price momentum (last 24 hours)
-    - Moving average crossover signals
-    - Price volatility assessment
 
-    Args:
-        crypto: The cryptocurrency name or symbol (e.g., 'bitcoin', 'btc', 'ethereum', 'eth')
+def _resolve_batch(cryptos: list[str]) -> tuple[dict[str, str], dict[str, Any] | None]:
+    """Resolve ``cryptos`` to CoinGecko IDs, returning an error payload for invalid batches."""
+    if not cryptos:
+        return {}, {"status": "error", "error_message": "At least one cryptocurrency must be provided."}
+    if len(cryptos) > MAX_PRICE_BATCH_SIZE:
+        return {}, {
+            "status": "error",
+            "error_message": f"A maximum of {MAX_PRICE_BATCH_SIZE} cryptocurrencies can be requested at once.",
+        }
+    return {crypto: _resolve_crypto_id(crypto) for crypto in cryptos}, None
 
-    Returns:
-        A dictionary containing the prediction, confidence level, and supporting analysis.
-    """
-    # Map common aliases to CoinGecko IDs
-    crypto_aliases = {
-        'bitcoin': 'bitcoin',
-        'btc': 'bitcoin',
-        'ethereum': 'ethereum',
-        'eth': 'ethereum',
-        'litecoin': 'litecoin',
-        'ltc': 'litecoin',
-        'ripple': 'ripple',
-        'xrp': 'ripple',
-        'cardano': 'cardano',
-        'ada': 'cardano',
-        'solana': 'solana',
-        'sol': 'solana',
-        'dogecoin': 'dogecoin',
-        'doge': 'dogecoin',
-        'polkadot': 'polkadot',
-        'dot': 'polkadot',
-        'polygon': 'polygon',
-        'matic': 'polygon',
-        'chainlink': 'chainlink',
-        'link': 'chainlink',
-        'uniswap': 'uniswap',
-        'uni': 'uniswap',
-    }
 
-    crypto_id = crypto_aliases.get(crypto.lower())
+def _build_batch_price_result(
+    resolved: dict[str, str | None],
+    prices: dict[str, float | None],
+    as_of: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """
+    Combine per-coin price results into the ``get_crypto_prices_async`` payload.
 
-    if not crypto_id:
+    Coins listed in ``as_of`` are tagged as last-known-good prices fetched at that epoch time.
+    """
+    results = []
+    for crypto, crypto_id in resolved.items():
+        if not crypto_id:
+            results.append({"crypto": crypto, **_unsupported_crypto_error(crypto)})
+            continue
+        result = _build_price_result(crypto, crypto_id, prices.get(crypto_id))
+        if as_of and crypto_id in as_of and result["status"] == "success":
+            _tag_last_known_good(result, as_of[crypto_id])
+        results.append({"crypto": crypto, **result})
+
+    reports = [result["report"] for result in results if result["status"] == "success"]
+    if not reports:
         return {
             "status": "error",
-            "error_message": f"Cryptocurrency '{crypto}' not supported. Available options include: bitcoin, ethereum, litecoin, ripple, cardano, solana, dogecoin, polkadot, polygon, chainlink, uniswap (and their common aliases like btc, eth, etc.)",
+            "error_message": "No price data available for the requested cryptocurrencies.",
+            "results": results,
         }
 
-    # First, get the current price from the same endpoint as get_crypto_price
-    current_price = None
-    try:
-        price_url = "https://api.coingecko.com/api/v3/simple/price"
-        price_params = {'ids': crypto_id, 'vs_currencies': 'usd'}
-        price_response = _make_request_with_retry(price_url, price_params, timeout=10)
-        price_data = price_response.json()
-        if crypto_id in price_data and 'usd' in price_data[crypto_id]:
-            current_price = price_data[crypto_id]['usd']
-    except requests.exceptions.RequestException:
-        pass  # Will use historical data price as fallback
-
-    # Fetch historical data for the last 7 days with hourly intervals for analysis
-    url = f"https://api.coingecko.com/api/v3/coins/{crypto_id}/market_chart"
-    params = {
-        'vs_currency': 'usd',
-        'days': 7,
-        'interval': 'hourly'
+    return {
+        "status": "success",
+        "report": " ".join(reports),
+        "results": results,
     }
 
-    try:
-        response = _make_request_with_retry(url, params, timeout=15)
-        data = response.json()
-
-        if 'prices' not in data or len(data['prices']) < 48:
-            return _generate_mock_trend_prediction(crypto, crypto_id, current_price)
-
-        prices = data['prices']
-        price_values = [p[1] for p in prices]
-
-    except requests.exceptions.RequestException:
-        return _generate_mock_trend_prediction(crypto, crypto_id, current_price)
-
-    # Use the current price from the simple API if available, otherwise use latest from historical data
-    if current_price is None:
-        current_price = price_values[-1]
-
-    # 1. Calculate short-term momentum (last 24 hours vs previous 24 hours)
-    last_24h_prices = price_values[-24:]
-    prev_24h_prices = price_values[-48:-24]
-    last_24h_avg = sum(last_24h_prices) / len(last_24h_prices)
-    prev_24h_avg = sum(prev_24h_prices) / len(prev_24h_prices)
-    momentum = (last_24h_avg - prev_24h_avg) / prev_24h_avg * 100
-
-    # 2. Calculate moving averages (simple)
-    ma_12h = sum(price_values[-12:]) / 12
-    ma_24h = sum(price_values[-24:]) / 24
-    ma_72h = sum(price_values[-72:]) / 72 if len(price_values) >= 72 else ma_24h
-
-    # 3. Calculate volatility (standard deviation of last 24 hours)
-    mean_24h = sum(last_24h_prices) / len(last_24h_prices)
-    variance = sum((p - mean_24h) ** 2 for p in last_24h_prices) / len(last_24h_prices)
-    volatility = (variance ** 0.5) / mean_24h * 100  # As percentage
-
-    # 4. Calculate trend signals
-    signals = []
-    bullish_signals = 0
-    bearish_signals = 0
-
-    # Signal 1: Momentum
-    if momentum > 1:
-        signals.append(f"Bullish momentum: +{momentum:.2f}% gain in last 24h average vs prior 24h")
-        bullish_signals += 1
-    elif momentum < -1:
-        signals.append(f"Bearish momentum: {momentum:.2f}% loss in last 24h average vs prior 24h")
-        bearish_signals += 1
-    else:
-        signals.append(f"Neutral momentum: {momentum:.2f}% change")
-
-    # Signal 2: MA crossover (short-term vs medium-term)
-    if ma_12h > ma_24h:
-        signals.append("Short-term MA (12h) above medium-term MA (24h) - bullish signal")
-        bullish_signals += 1
-    else:
-        signals.append("Short-term MA (12h) below medium-term MA (24h) - bearish signal")
-        bearish_signals += 1
-
-    # Signal 3: Price vs longer-term MA
-    if current_price > ma_72h:
-        signals.append(f"Current price above 72h MA (${ma_72h:,.2f}) - bullish signal")
-        bullish_signals += 1
-    else:
-        signals.append(f"Current price below 72h MA (${ma_72h:,.2f}) - bearish signal")
-        bearish_signals += 1
-
-    # Signal 4: Recent price action (last 6 hours trend)
-    last_6h = price_values[-6:]
-    recent_change = (last_6h[-1] - last_6h[0]) / last_6h[0] * 100
-    if recent_change > 0.5:
-        signals.append(f"Positive recent momentum: +{recent_change:.2f}% in last 6 hours")
-        bullish_signals += 1
-    elif recent_change < -0.5:
-        signals.append(f"Negative recent momentum: {recent_change:.2f}% in last 6 hours")
-        bearish_signals += 1
-
-    # Determine overall prediction
-    if bullish_signals > bearish_signals:
-        prediction = "UP"
-        confidence = min(0.5 + (bullish_signals - bearish_signals) * 0.1, 0.8)
-    elif bearish_signals > bullish_signals:
-        prediction = "DOWN"
-        confidence = min(0.5 + (bearish_signals - bullish_signals) * 0.1, 0.8)
-    else:
-        prediction = "NEUTRAL"
-        confidence = 0.4
-
-    # Adjust confidence based on volatility (higher volatility = lower confidence)
-    if volatility > 5:
-        confidence *= 0.8
-        signals.append(f"High volatility ({volatility:.2f}%) reduces prediction confidence")
-    elif volatility > 3:
-        confidence *= 0.9
-        signals.append(f"Moderate volatility ({volatility:.2f}%)")
-    else:
-        signals.append(f"Low volatility ({volatility:.2f}%) supports prediction stability")
-
-    confidence = round(confidence * 100, 1)
-
-    # Generate report
-    if prediction == "UP":
-        trend_description = "likely to increase"
-    elif prediction == "DOWN":
-        trend_description = "likely to decrease"
-    else:
-        trend_description = "expected to remain relatively stable"
-
-    report = (
-        f"Price Trend Prediction for {crypto.upper()} ({crypto_id}) - Next 24 Hours:\n\n"
-        f"📊 PREDICTION: {prediction}\n"
-        f"📈 Current Price: ${current_price:,.2f}\n"
-        f"🎯 Confidence: {confidence}%\n\n"
-        f"The price is {trend_description} over the next 24 hours.\n\n"
-        f"Analysis Signals:\n" + "\n".join(f"• {s}" for s in signals) + "\n\n"
-        "⚠️ DISCLAIMER: This prediction is based on technical analysis of historical data and should not be considered financial advice. "
-        "Cryptocurrency markets are highly volatile and past performance does not guarantee future results."
+
+def _last_good_batch_result(
+    resolved: dict[str, str | None], crypto_ids: list[str], exc: requests.exceptions.RequestException
+) -> dict[str, Any]:
+    """Build a batch price result from the last-known-good prices, or the request error if there are none."""
+    last_good = _last_good_prices(crypto_ids)
+    if not last_good:
+        return {"status": "error", "error_message": _request_error_message("Failed to retrieve cryptocurrency price data", exc)}
+    return _build_batch_price_result(
+        resolved,
+        {crypto_id: price for crypto_id, (price, _) in last_good.items()},
+        as_of={crypto_id: fetched_at for crypto_id, (_, fetched_at) in last_good.items()},
     )
 
-    return {
-        "status": "success",
-        "report": report,
-        "crypto": crypto,
-        "crypto_id": crypto_id,
-        "prediction": prediction,
-        "confidence_percentage": confidence,
-        "current_price_usd": current_price,
-        "momentum_24h": round(momentum, 2),
-        "volatility_percentage": round(volatility, 2),
-        "bullish_signals": bullish_signals,
-        "bearish_signals": bearish_signals,
-        "signals": signals,
-    }
 
+def get_crypto_price(crypto: str) -> dict[str, Any]:
+    """Fetch the current price of ``crypto`` in USD using CoinGecko API."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return _unsupported_crypto_error(crypto)
+
+    try:
+        return _build_price_result(crypto, crypto_id, _get_cached_price(crypto_id))
+    except requests.exceptions.RequestException as exc:
+        return _last_good_price_result(crypto, crypto_id, exc)
 
-def _generate_mock_trend_prediction(crypto: str, crypto_id: str, current_price: float | None = None) -> dict[str, Any]:
-    """
-    Generate mock trend prediction as fallback when API is unavailable.
 
-    Args:
-        crypto: The cryptocurrency name
-        crypto_id: The cryptocurrency ID
-        current_price: Optional real current price to use instead of mock price
-    """
-    import random
-
-    # Generate mock prediction
-    prediction = random.choice(["UP", "DOWN", "NEUTRAL"])
-    confidence = random.uniform(45, 70)
-    
-    # Use real price if available, otherwise generate mock
-    if current_price is None:
-        current_price = random.uniform(20000, 80000) if crypto_id == 'bitcoin' else random.uniform(100, 5000)
-        is_mock_price = True
-    else:
-        is_mock_price = False
-    
-    momentum = random.uniform(-5, 5)
-    volatility = random.uniform(1, 8)
-
-    if not is_mock_price:
-        # Using real price data
-        signals = [
-            "[PARTIAL MOCK DATA] Using real current price, but historical analysis is simulated",
-            f"Simulated momentum: {momentum:+.2f}%",
-            f"Simulated volatility: {volatility:.2f}%",
-        ]
-        note_text = "[Note: Current price is real-time, but trend analysis is simulated due to historical data unavailability]\n\n"
-    else:
-        # Full mock data
-        signals = [
-            "[MOCK DATA] This is simulated prediction data for demonstration purposes",
-            f"Simulated momentum: {momentum:+.2f}%",
-            f"Simulated volatility: {volatility:.2f}%",
-        ]
-        note_text = "[Note: Real-time data currently unavailable, showing simulated prediction for demonstration purposes]\n\n"
-
-    if prediction == "UP":
-        trend_description = "likely to increase"
-    elif prediction == "DOWN":
-        trend_description = "likely to decrease"
-    else:
-        trend_description = "expected to remain relatively stable"
-
-    report_prefix = "[MOCK DATA] " if is_mock_price else ""
-    report = (
-        f"{report_prefix}Price Trend Prediction for {crypto.upper()} ({crypto_id}) - Next 24 Hours:\n\n"
-        f"📊 PREDICTION: {prediction}\n"
-        f"📈 Current Price: ${current_price:,.2f}\n"
-        f"🎯 Confidence: {confidence:.1f}%\n\n"
-        f"The price is {trend_description} over the next 24 hours.\n\n"
-        f"{note_text}"
-        "⚠️ DISCLAIMER: This prediction is based on technical analysis of historical data and should not be considered financial advice. "
-        "Cryptocurrency markets are highly volatile and past performance does not guarantee future results."
-    )
+async def get_crypto_price_async(crypto: str) -> dict[str, Any]:
+    """Async variant of ``get_crypto_price`` that does not block the event loop."""
+    crypto_id = _resolve_crypto_id(crypto)
+    if not crypto_id:
+        return _unsupported_crypto_error(crypto)
 
-    return {
-        "status": "success",
-        "report": report,
-        "crypto": crypto,
-        "crypto_id": crypto_id,
-        "prediction": prediction,
-        "confidence_percentage": round(confidence, 1),
-        "current_price_usd": current_price,
-        "momentum_24h": round(momentum, 2),
-        "volatility_percentage": round(volatility, 2),
-        "bullish_signals": random.randint(0, 4),
-        "bearish_signals": random.randint(0, 4),
-        "signals": signals,
-        "is_mock_data": True,
-        "is_mock_price": is_mock_price,
-    }
+    try:
+        return _build_price_result(crypto, crypto_id, await _get_cached_price_async(crypto_id))
+    except requests.exceptions.RequestException as exc:
+        return await asyncio.to_thread(_last_good_price_result, crypto, crypto_id, exc)
 
 
-def _generate_mock_price_change_summary(crypto: str, crypto_id: str, days: int) -> dict[str, Any]:
+async def get_crypto_prices_async(cryptos: list[str]) -> dict[str, Any]:
     """
-    Generate mock price change summary as fallback when API is unavailable.
+    Fetch the current USD prices of several cryptocurrencies in one CoinGecko request.
+
+    Cached prices are reused; all remaining IDs are looked up with a single
+    ``/simple/price?ids=...`` call.
 
     Args:
-        crypto: The cryptocurrency name
-        crypto_id: The cryptocurrency ID
-        days: The number of days for the summary
+        cryptos: Cryptocurrency names or symbols (e.g., ['btc', 'eth', 'solana'])
     """
-    import random
-
-    # Generate realistic mock data (using random values within reasonable ranges)
-    base_price = random.uniform(20000, 80000) if crypto_id == 'bitcoin' else random.uniform(1000, 5000)
+    resolved, error = _resolve_batch(cryptos)
+    if error:
+        return error
 
-    # Simulate price changes based on typical crypto volatility
-    volatility_factor = 0.05 * (days ** 0.5)  # Higher volatility for longer periods
-    price_change_percentage = random.uniform(-volatility_factor * 100, volatility_factor * 100)
+    crypto_ids = list(dict.fromkeys(filter(None, resolved.values())))
+    try:
+        prices = await _get_cached_prices_async(crypto_ids)
+    except requests.exceptions.RequestException as exc:
+        return await asyncio.to_thread(_last_good_batch_result, resolved, crypto_ids, exc)
 
-    initial_price = base_price
-    final_price = initial_price * (1 + price_change_percentage / 100)
+    return _build_batch_price_result(resolved, prices)
 
-    # Generate min/max based on some variation around the range
-    min_price = min(initial_price, final_price) * random.uniform(0.95, 0.99)
-    max_price = max(initial_price, final_price) * random.uniform(1.01, 1.05)
 
-    price_change = final_price - initial_price
-    price_change_direction = "increased" if price_change >= 0 else "decreased"
+def get_price_cache_stats() -> dict[str, Any]:
+    """Return hit, miss and coalesce counters for the current-price cache."""
+    return _price_cache.stats()
 
-    # Format the summary report
-    summary = (
-        f"[MOCK DATA] Over the past {days} day{'s' if days != 1 else ''}, "
-        f"{crypto} ({crypto_id}) has {price_change_direction} from ${initial_price:,.2f} to ${final_price:,.2f}. "
-        f"The price changed by ${abs(price_change):,.2f} ({price_change_percentage:+.2f}%). "
-        f"The highest price during this period was ${max_price:,.2f} and the lowest was ${min_price:,.2f}. "
-        f"[Note: Real-time data currently unavailable, showing simulated data for demonstration purposes]"
-    )
 
-    return {
-        "status": "success",
-        "report": summary,
-        "crypto": crypto,
-        "crypto_id": crypto_id,
-        "days": days,
-        "initial_price_usd": initial_price,
-        "final_price_usd": final_price,
-        "min_price_usd": min_price,
-        "max_price_usd": max_price,
-        "price_change_usd": price_change,
-        "price_change_percentage": price_change_percentage,
-        "is_mock_data": True,  # Indicate that this is mock data
-    }
\ No newline at end of file
+def get_price_batcher_stats() -> dict[str, Any]:
+    """Return how many upstream batches served the micro-batched price lookups."""
+    return _price_batcher.stats()
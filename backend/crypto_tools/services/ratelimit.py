@@ -0,0 +1,173 @@
+"""Outbound request budget for CoinGecko shared by every worker process on the host."""
+
+from __future__ import annotations
+
+import contextlib
+import email.utils
+import os
+import struct
+import threading
+import time
+from typing import Any, Iterator
+
+import requests
+
+from .timeseries import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms fall back to the thread lock
+    fcntl = None
+
+# Sustained request rate, burst size and the longest a caller will queue for a slot.
+# A rate of 0 disables the limiter.
+RATE_LIMIT_PER_MINUTE = float(os.getenv("COINGECKO_RATE_LIMIT_PER_MINUTE", "30"))
+RATE_LIMIT_BURST = float(os.getenv("COINGECKO_RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("COINGECKO_RATE_LIMIT_MAX_WAIT", "10"))
+RATE_LIMIT_STATE_FILE = os.path.expanduser(
+    os.getenv("COINGECKO_RATE_LIMIT_STATE_FILE", os.path.join(DATA_DIR, "coingecko-ratelimit.state"))
+)
+
+# tokens, last refill (epoch seconds), blocked until (epoch seconds)
+_STATE = struct.Struct("<ddd")
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when a request would have to wait longer than the configured maximum for a slot."""
+
+
+class SharedTokenBucket:
+    """
+    Token bucket whose state lives in a small file locked with ``flock``.
+
+    Every uvicorn worker on the host opens the same file, so they draw from one
+    budget. ``reserve`` takes a token (letting the balance go negative) and
+    returns how long the caller must wait before sending, which keeps callers
+    in arrival order across processes. A ``Retry-After`` from CoinGecko blocks
+    the whole bucket, not just the worker that received it.
+    """
+
+    def __init__(
+        self,
+        path: str = RATE_LIMIT_STATE_FILE,
+        rate_per_minute: float = RATE_LIMIT_PER_MINUTE,
+        burst: float = RATE_LIMIT_BURST,
+        max_wait: float = RATE_LIMIT_MAX_WAIT,
+    ):
+        self.path = path
+        self.rate = rate_per_minute / 60
+        self.burst = max(burst, 1.0)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.delayed = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    @contextlib.contextmanager
+    def _locked_state(self) -> Iterator[list[float]]:
+        """Yield the mutable ``[tokens, updated_at, blocked_until]`` state and write it back."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.pread(fd, _STATE.size, 0)
+                now = time.time()
+                if len(raw) == _STATE.size:
+                    state = list(_STATE.unpack(raw))
+                else:
+                    state = [self.burst, now, 0.0]
+                # Refill for the time elapsed since the last writer.
+                state[0] = min(self.burst, state[0] + max(0.0, now - state[1]) * self.rate)
+                state[1] = now
+                yield state
+                os.pwrite(fd, _STATE.pack(*state), 0)
+            finally:
+                os.close(fd)
+
+    def reserve(self) -> float:
+        """
+        Claim the next request slot and return the seconds to wait before using it.
+
+        Raises ``RateLimitExceeded`` without claiming a slot when the wait would
+        exceed ``max_wait``.
+        """
+        if not self.enabled:
+            return 0.0
+        with self._locked_state() as state:
+            tokens, now, blocked_until = state
+            wait = max((1 - tokens) / self.rate, blocked_until - now, 0.0)
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimitExceeded(
+                    f"CoinGecko request budget exhausted; next slot in {wait:.1f}s exceeds {self.max_wait:.0f}s"
+                )
+            state[0] = tokens - 1
+        self.granted += 1
+        if wait > 0:
+            self.delayed += 1
+        return wait
+
+    def block_for(self, seconds: float) -> None:
+        """Pause all workers for ``seconds`` (e.g. after a 429 with ``Retry-After``)."""
+        if not self.enabled or seconds <= 0:
+            return
+        with self._locked_state() as state:
+            state[0] = min(state[0], 0.0)
+            state[2] = max(state[2], state[1] + seconds)
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is available."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def stats(self) -> dict[str, Any]:
+        """Return this worker's slot counters and the shared limiter configuration."""
+        return {
+            "enabled": self.enabled,
+            "granted": self.granted,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the delay of a ``Retry-After`` header (seconds or HTTP date), or ``None``."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+_limiter: SharedTokenBucket | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> SharedTokenBucket:
+    """Return the process-wide CoinGecko rate limiter."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = SharedTokenBucket()
+    return _limiter
+
+
+def get_rate_limit_stats() -> dict[str, Any]:
+    """Return this worker's counters for the shared CoinGecko rate limiter."""
+    return get_rate_limiter().stats()
@@ -0,0 +1,316 @@
+"""Registry of CoinGecko coins resolving names, symbols and aliases to coin IDs."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Iterable, Mapping
+
+import requests
+
+from .client import COINGECKO_BASE_URL, make_request_with_retry_async
+from .timeseries import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Snapshot of CoinGecko's /coins/list kept in the data directory, and how often it is refreshed.
+COIN_LIST_PATH = os.path.join(DATA_DIR, "coins.json")
+COIN_LIST_REFRESH_SECONDS = float(os.getenv("CRYPTO_COIN_LIST_REFRESH_SECONDS", "86400"))
+
+# Coins known without a snapshot, ordered by market capitalisation. When several
+# coins share a symbol or name, the one listed here wins over the full list.
+BUNDLED_COINS: tuple[tuple[str, str, str], ...] = (
+    ("bitcoin", "btc", "Bitcoin"),
+    ("ethereum", "eth", "Ethereum"),
+    ("tether", "usdt", "Tether"),
+    ("binancecoin", "bnb", "BNB"),
+    ("solana", "sol", "Solana"),
+    ("ripple", "xrp", "XRP"),
+    ("usd-coin", "usdc", "USDC"),
+    ("staked-ether", "steth", "Lido Staked Ether"),
+    ("dogecoin", "doge", "Dogecoin"),
+    ("cardano", "ada", "Cardano"),
+    ("tron", "trx", "TRON"),
+    ("the-open-network", "ton", "Toncoin"),
+    ("avalanche-2", "avax", "Avalanche"),
+    ("wrapped-bitcoin", "wbtc", "Wrapped Bitcoin"),
+    ("shiba-inu", "shib", "Shiba Inu"),
+    ("chainlink", "link", "Chainlink"),
+    ("polkadot", "dot", "Polkadot"),
+    ("bitcoin-cash", "bch", "Bitcoin Cash"),
+    ("sui", "sui", "Sui"),
+    ("stellar", "xlm", "Stellar"),
+    ("litecoin", "ltc", "Litecoin"),
+    ("near", "near", "NEAR Protocol"),
+    ("leo-token", "leo", "LEO Token"),
+    ("dai", "dai", "Dai"),
+    ("uniswap", "uni", "Uniswap"),
+    ("pepe", "pepe", "Pepe"),
+    ("internet-computer", "icp", "Internet Computer"),
+    ("aptos", "apt", "Aptos"),
+    ("hedera-hashgraph", "hbar", "Hedera"),
+    ("ethereum-classic", "etc", "Ethereum Classic"),
+    ("monero", "xmr", "Monero"),
+    ("bittensor", "tao", "Bittensor"),
+    ("render-token", "render", "Render"),
+    ("crypto-com-chain", "cro", "Cronos"),
+    ("cosmos", "atom", "Cosmos Hub"),
+    ("okb", "okb", "OKB"),
+    ("matic-network", "matic", "Polygon"),
+    ("arbitrum", "arb", "Arbitrum"),
+    ("filecoin", "fil", "Filecoin"),
+    ("kaspa", "kas", "Kaspa"),
+    ("optimism", "op", "Optimism"),
+    ("vechain", "vet", "VeChain"),
+    ("injective-protocol", "inj", "Injective"),
+    ("aave", "aave", "Aave"),
+    ("immutable-x", "imx", "Immutable"),
+    ("stacks", "stx", "Stacks"),
+    ("fetch-ai", "fet", "Fetch.ai"),
+    ("celestia", "tia", "Celestia"),
+    ("the-graph", "grt", "The Graph"),
+    ("maker", "mkr", "Maker"),
+    ("algorand", "algo", "Algorand"),
+    ("thorchain", "rune", "THORChain"),
+    ("sei-network", "sei", "Sei"),
+    ("fantom", "ftm", "Fantom"),
+    ("bonk", "bonk", "Bonk"),
+    ("dogwifcoin", "wif", "dogwifhat"),
+    ("jupiter-exchange-solana", "jup", "Jupiter"),
+    ("ondo-finance", "ondo", "Ondo"),
+    ("ethena", "ena", "Ethena"),
+    ("worldcoin-wld", "wld", "Worldcoin"),
+    ("lido-dao", "ldo", "Lido DAO"),
+    ("quant-network", "qnt", "Quant"),
+    ("arweave", "ar", "Arweave"),
+    ("flow", "flow", "Flow"),
+    ("the-sandbox", "sand", "The Sandbox"),
+    ("decentraland", "mana", "Decentraland"),
+    ("axie-infinity", "axs", "Axie Infinity"),
+    ("tezos", "xtz", "Tezos"),
+    ("eos", "eos", "EOS"),
+    ("elrond-erd-2", "egld", "MultiversX"),
+    ("theta-token", "theta", "Theta Network"),
+    ("gala", "gala", "GALA"),
+    ("chiliz", "chz", "Chiliz"),
+    ("apecoin", "ape", "ApeCoin"),
+    ("mina-protocol", "mina", "Mina Protocol"),
+    ("helium", "hnt", "Helium"),
+    ("akash-network", "akt", "Akash Network"),
+    ("kava", "kava", "Kava"),
+    ("iota", "iota", "IOTA"),
+    ("neo", "neo", "NEO"),
+    ("zcash", "zec", "Zcash"),
+    ("dash", "dash", "Dash"),
+    ("ecash", "xec", "eCash"),
+    ("bitcoin-cash-sv", "bsv", "Bitcoin SV"),
+    ("pax-gold", "paxg", "PAX Gold"),
+    ("tether-gold", "xaut", "Tether Gold"),
+    ("first-digital-usd", "fdusd", "First Digital USD"),
+    ("true-usd", "tusd", "TrueUSD"),
+    ("paypal-usd", "pyusd", "PayPal USD"),
+    ("curve-dao-token", "crv", "Curve DAO"),
+    ("pancakeswap-token", "cake", "PancakeSwap"),
+    ("synthetix-network-token", "snx", "Synthetix"),
+    ("ethereum-name-service", "ens", "Ethereum Name Service"),
+    ("gmx", "gmx", "GMX"),
+    ("compound-governance-token", "comp", "Compound"),
+    ("1inch", "1inch", "1inch"),
+    ("sushi", "sushi", "Sushi"),
+    ("yearn-finance", "yfi", "yearn.finance"),
+    ("basic-attention-token", "bat", "Basic Attention"),
+    ("enjincoin", "enj", "Enjin Coin"),
+    ("loopring", "lrc", "Loopring"),
+    ("ocean-protocol", "ocean", "Ocean Protocol"),
+    ("blur", "blur", "Blur"),
+    ("oasis-network", "rose", "Oasis"),
+    ("harmony", "one", "Harmony"),
+    ("zilliqa", "zil", "Zilliqa"),
+    ("ravencoin", "rvn", "Ravencoin"),
+    ("qtum", "qtum", "Qtum"),
+    ("icon", "icx", "ICON"),
+    ("waves", "waves", "Waves"),
+    ("nervos-network", "ckb", "Nervos Network"),
+    ("conflux-token", "cfx", "Conflux"),
+)
+
+
+class CoinIndex:
+    """
+    Immutable lookup tables over a coin list.
+
+    Exact lookups are single dict probes over interned strings; prefix search
+    bisects one sorted key list. An index is never mutated after construction,
+    so a refresh swaps in a new one without locking readers.
+    """
+
+    def __init__(self, coins: Iterable[tuple[str, str, str]], aliases: Mapping[str, str] | None = None):
+        self.aliases = dict(aliases or {})
+        self.by_id: dict[str, str] = {}
+        self.by_symbol: dict[str, str] = {}
+        self.by_name: dict[str, str] = {}
+        self.names: dict[str, str] = {}
+
+        for coin_id, symbol, name in coins:
+            if not coin_id or coin_id in self.by_id:
+                continue
+            # Interned strings let every table share one object per ID and symbol.
+            coin_id = self.by_id[coin_id] = sys.intern(coin_id)
+            self.names[coin_id] = name
+            # The first coin listed for a symbol or name keeps it.
+            if symbol:
+                self.by_symbol.setdefault(sys.intern(symbol.lower()), coin_id)
+            if name:
+                self.by_name.setdefault(name.lower(), coin_id)
+
+        keys = {**self.by_name, **self.by_symbol, **self.by_id, **self.aliases}
+        self._sorted_keys = sorted(keys)
+        self._sorted_ids = [keys[key] for key in self._sorted_keys]
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def resolve(self, query: str) -> str | None:
+        """Return the coin ID for an alias, ID, symbol or name (case-insensitive), or ``None``."""
+        key = query.strip().lower()
+        return self.aliases.get(key) or self.by_id.get(key) or self.by_symbol.get(key) or self.by_name.get(key)
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict[str, str]]:
+        """Return up to ``limit`` distinct coins with an ID, symbol, name or alias starting with ``prefix``."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        matches: dict[str, None] = {}
+        start = bisect.bisect_left(self._sorted_keys, prefix)
+        for position in range(start, len(self._sorted_keys)):
+            if not self._sorted_keys[position].startswith(prefix):
+                break
+            matches.setdefault(self._sorted_ids[position])
+            if len(matches) >= limit:
+                break
+        return [{"id": coin_id, "name": self.names.get(coin_id, coin_id)} for coin_id in matches]
+
+
+def _read_snapshot(path: str) -> list[tuple[str, str, str]] | None:
+    """Return the coins stored in a /coins/list snapshot, or ``None`` when missing or unreadable."""
+    try:
+        with open(path, "rb") as handle:
+            payload = json.load(handle)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Ignoring unreadable coin list snapshot {path}: {exc}")
+        return None
+    return [
+        (str(coin.get("id", "")), str(coin.get("symbol", "")), str(coin.get("name", "")))
+        for coin in payload
+        if isinstance(coin, dict)
+    ]
+
+
+def _write_snapshot(path: str, payload: list[dict[str, Any]]) -> None:
+    """Atomically replace the snapshot at ``path`` with ``payload``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+class CoinRegistry:
+    """
+    Process-wide coin index built from the bundled coins plus the local /coins/list snapshot.
+
+    ``aliases`` take precedence over every other lookup.
+    """
+
+    def __init__(self, aliases: Mapping[str, str], snapshot_path: str = COIN_LIST_PATH):
+        self.aliases = aliases
+        self.snapshot_path = snapshot_path
+        self._index: CoinIndex | None = None
+        self._lock = threading.Lock()
+        self.loaded_at = 0.0
+
+    @property
+    def index(self) -> CoinIndex:
+        return self._index if self._index is not None else self.load()
+
+    def load(self) -> CoinIndex:
+        """Build the index from the bundled coins and the local snapshot, once."""
+        with self._lock:
+            if self._index is None:
+                self._swap(_read_snapshot(self.snapshot_path) or [])
+            return self._index
+
+    def _swap(self, coins: list[tuple[str, str, str]]) -> None:
+        """Replace the index; caller must hold the lock."""
+        self._index = CoinIndex([*BUNDLED_COINS, *coins], self.aliases)
+        self.loaded_at = time.time()
+
+    def resolve(self, query: str) -> str | None:
+        """Return the coin ID for ``query`` or ``None`` when it is unknown."""
+        return self.index.resolve(query)
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict[str, str]]:
+        """Return coins whose ID, symbol, name or alias starts with ``prefix``."""
+        return self.index.search(prefix, limit)
+
+    def snapshot_age(self) -> float | None:
+        """Return the age of the local snapshot in seconds, or ``None`` if there is none."""
+        try:
+            return time.time() - os.path.getmtime(self.snapshot_path)
+        except OSError:
+            return None
+
+    async def refresh(self) -> int:
+        """Download /coins/list, persist it as the local snapshot and swap in a new index."""
+        response = await make_request_with_retry_async(f"{COINGECKO_BASE_URL}/coins/list", {}, timeout=30, max_retries=1)
+        payload = response.json()
+        if not isinstance(payload, list) or not payload:
+            raise requests.exceptions.RequestException("CoinGecko returned an empty coin list")
+
+        await asyncio.to_thread(_write_snapshot, self.snapshot_path, payload)
+        coins = [(str(coin.get("id", "")), str(coin.get("symbol", "")), str(coin.get("name", ""))) for coin in payload]
+        with self._lock:
+            self._swap(coins)
+        return len(self._index)
+
+    def stats(self) -> dict[str, Any]:
+        """Return index sizes and the age of the local snapshot."""
+        index = self.index
+        return {
+            "coins": len(index),
+            "symbols": len(index.by_symbol),
+            "aliases": len(index.aliases),
+            "snapshot_age_seconds": self.snapshot_age(),
+            "loaded_at": self.loaded_at,
+        }
+
+
+async def run_coin_list_refresher(registry: CoinRegistry, interval: float = COIN_LIST_REFRESH_SECONDS) -> None:
+    """Keep ``registry`` current, refreshing whenever its snapshot is older than ``interval``."""
+    while True:
+        age = registry.snapshot_age()
+        if age is None or age >= interval:
+            try:
+                count = await registry.refresh()
+                logger.info(f"Coin registry refreshed with {count} coins")
+                age = 0.0
+            except requests.exceptions.RequestException as exc:
+                logger.warning(f"Coin registry refresh failed: {exc}")
+                # Try again well before the next full interval.
+                age = max(0.0, interval - min(interval, 3600))
+        await asyncio.sleep(max(60.0, interval - age))
@@ -0,0 +1,164 @@
+"""Incrementally maintained rolling-window statistics over price series."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Any
+
+import numpy as np
+
+from .series import PriceSeries
+
+
+class RollingWindow:
+    """
+    Min, max, mean and standard deviation of the points in a sliding time window.
+
+    Min and max come from monotonic deques and mean / variance from Welford
+    running moments that also support removing the oldest point, so both
+    ``push`` and ``evict_before`` are O(1) amortised per point and
+    ``snapshot`` is O(1).
+    """
+
+    __slots__ = ("span_ms", "_points", "_mins", "_maxs", "_mean", "_m2")
+
+    def __init__(self, span_ms: int):
+        self.span_ms = span_ms
+        self._points: deque[tuple[int, float]] = deque()
+        self._mins: deque[tuple[int, float]] = deque()
+        self._maxs: deque[tuple[int, float]] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @classmethod
+    def from_series(cls, series: PriceSeries, span_ms: int) -> RollingWindow:
+        window = cls(span_ms)
+        for timestamp, price in zip(series.timestamps.tolist(), series.prices.tolist()):
+            window.push(timestamp, price)
+        return window
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def last_point(self) -> tuple[int, float] | None:
+        return self._points[-1] if self._points else None
+
+    def push(self, timestamp: int, price: float) -> None:
+        """Append a point newer than every point in the window, evicting points that fall out of the span."""
+        point = (timestamp, price)
+        self._points.append(point)
+        delta = price - self._mean
+        self._mean += delta / len(self._points)
+        self._m2 += delta * (price - self._mean)
+
+        while self._mins and self._mins[-1][1] >= price:
+            self._mins.pop()
+        self._mins.append(point)
+        while self._maxs and self._maxs[-1][1] <= price:
+            self._maxs.pop()
+        self._maxs.append(point)
+
+        self.evict_before(timestamp - self.span_ms)
+
+    def evict_before(self, start_ms: int) -> None:
+        """Drop the points older than ``start_ms``."""
+        points = self._points
+        while points and points[0][0] < start_ms:
+            timestamp, price = points.popleft()
+            if not points:
+                self._mean = self._m2 = 0.0
+            else:
+                delta = price - self._mean
+                self._mean -= delta / len(points)
+                self._m2 = max(0.0, self._m2 - delta * (price - self._mean))
+            if self._mins[0][0] == timestamp:
+                self._mins.popleft()
+            if self._maxs[0][0] == timestamp:
+                self._maxs.popleft()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the window's count, first / last / min / max prices, mean and population std."""
+        count = len(self._points)
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "first_timestamp": self._points[0][0],
+            "last_timestamp": self._points[-1][0],
+            "first": self._points[0][1],
+            "last": self._points[-1][1],
+            "min": self._mins[0][1],
+            "max": self._maxs[0][1],
+            "mean": self._mean,
+            "std": math.sqrt(self._m2 / count),
+        }
+
+
+class RollingStatsBook:
+    """
+    Rolling windows per ``(coin_id, interval, days)`` kept in sync with the history store.
+
+    Each read compares the window with the stored series: points appended since
+    the last read are pushed incrementally, old points are evicted as the window
+    start moves forward. Only when stored points the window already holds were
+    rewritten (CoinGecko replaces its provisional latest point on the next
+    fetch) is the window rebuilt from the store.
+    """
+
+    def __init__(self, max_windows: int = 256):
+        self.max_windows = max_windows
+        self._windows: OrderedDict[tuple[str, str, int], RollingWindow] = OrderedDict()
+        self._lock = threading.Lock()
+        self.incremental = 0
+        self.rebuilds = 0
+
+    def window_stats(self, coin_id: str, interval: str, days: int, series: PriceSeries, start_ms: int) -> dict[str, Any]:
+        """
+        Return the snapshot of the ``days`` window of ``series`` starting at ``start_ms``.
+
+        ``series`` is the stored series (or any view of it covering the window).
+        """
+        key = (coin_id, interval, days)
+        with self._lock:
+            window = self._windows.get(key)
+            tail = self._new_points(window, series) if window is not None else None
+            if tail is None:
+                window = RollingWindow.from_series(series.since(start_ms), days * 86_400_000)
+                self.rebuilds += 1
+            else:
+                for timestamp, price in zip(tail.timestamps.tolist(), tail.prices.tolist()):
+                    window.push(timestamp, price)
+                self.incremental += 1
+            window.evict_before(start_ms)
+            self._windows[key] = window
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+            return window.snapshot()
+
+    @staticmethod
+    def _new_points(window: RollingWindow, series: PriceSeries) -> PriceSeries | None:
+        """Return the points of ``series`` after the window's last point, or ``None`` if that point changed."""
+        last = window.last_point
+        if last is None:
+            return None
+        index = int(np.searchsorted(series.timestamps, last[0], side="left"))
+        if index == len(series) or series.timestamps[index] != last[0] or series.prices[index] != last[1]:
+            return None
+        return PriceSeries(series.timestamps[index + 1:], series.prices[index + 1:])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return how often windows were updated incrementally versus rebuilt."""
+        with self._lock:
+            return {
+                "windows": len(self._windows),
+                "incremental_updates": self.incremental,
+                "rebuilds": self.rebuilds,
+            }
@@ -0,0 +1,163 @@
+"""Shared price feed that polls CoinGecko once and fans updates out to subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSubscription:
+    """
+    One subscriber's queue of price updates.
+
+    At most one pending update is kept per coin: when the consumer falls behind,
+    a newer price replaces the unsent one instead of queueing behind it. Memory
+    per subscriber is therefore bounded by the number of subscribed coins.
+    """
+
+    def __init__(self, coin_ids: Iterable[str]):
+        self.coin_ids = frozenset(coin_ids)
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self.delivered = 0
+        self.coalesced = 0
+
+    def push(self, coin_id: str, update: dict[str, Any]) -> None:
+        """Queue ``update`` for ``coin_id``, replacing an undelivered older one."""
+        if coin_id in self._pending:
+            self.coalesced += 1
+        self._pending[coin_id] = update
+        self._ready.set()
+
+    async def next_updates(self) -> list[dict[str, Any]]:
+        """Wait for and return all pending updates, latest per coin."""
+        await self._ready.wait()
+        self._ready.clear()
+        updates = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(updates)
+        return updates
+
+
+class PriceFeed:
+    """
+    Background poller shared by every streaming client.
+
+    Each cycle fetches the union of all subscribed coins with one call to
+    ``fetch_prices`` and pushes changed prices to the interested subscribers
+    and to ``on_price``, if given, as ``on_price(coin_id, timestamp_ms, price)``.
+    The poller runs only while there is at least one subscriber.
+    """
+
+    def __init__(
+        self,
+        fetch_prices: Callable[[list[str]], Awaitable[dict[str, float | None]]],
+        poll_interval: float,
+        on_price: Callable[[str, int, float], Any] | None = None,
+    ):
+        self.fetch_prices = fetch_prices
+        self.poll_interval = poll_interval
+        self.on_price = on_price
+        self._subscribers: set[PriceSubscription] = set()
+        self._latest: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+        self.polls = 0
+        self.failed_polls = 0
+
+    def subscribe(self, coin_ids: Iterable[str]) -> PriceSubscription:
+        """Register a subscriber, replaying the latest known prices and starting the poller if idle."""
+        subscription = PriceSubscription(coin_ids)
+        self._subscribers.add(subscription)
+        for coin_id in subscription.coin_ids:
+            if coin_id in self._latest:
+                subscription.push(coin_id, self._latest[coin_id])
+
+        loop = asyncio.get_running_loop()
+        # A poller left behind by a closed event loop (e.g. a finished test client) is replaced.
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: PriceSubscription) -> None:
+        """Remove a subscriber; the poller stops on its next cycle once none are left."""
+        self._subscribers.discard(subscription)
+
+    def subscribed_coins(self) -> list[str]:
+        """Return the union of coins wanted by current subscribers."""
+        coins: set[str] = set()
+        for subscription in self._subscribers:
+            coins.update(subscription.coin_ids)
+        return sorted(coins)
+
+    def publish(self, coin_id: str, price: float) -> None:
+        """Fan a new price out to every subscriber of ``coin_id`` if it changed."""
+        previous = self._latest.get(coin_id)
+        if previous is not None and previous["price_usd"] == price:
+            return
+
+        update = {
+            "crypto_id": coin_id,
+            "price_usd": price,
+            "timestamp": int(time.time() * 1000),
+        }
+        self._latest[coin_id] = update
+        for subscription in self._subscribers:
+            if coin_id in subscription.coin_ids:
+                subscription.push(coin_id, update)
+        if self.on_price is not None:
+            self.on_price(coin_id, update["timestamp"], price)
+
+    async def poll_once(self) -> None:
+        """Fetch all subscribed coins with one upstream call and publish the results."""
+        coins = self.subscribed_coins()
+        if not coins:
+            return
+        self.polls += 1
+        try:
+            prices = await self.fetch_prices(coins)
+        except requests.exceptions.RequestException as exc:
+            self.failed_polls += 1
+            logger.warning(f"Price feed poll failed: {exc}")
+            return
+
+        for coin_id, price in prices.items():
+            if price is not None:
+                self.publish(coin_id, price)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                await self.poll_once()
+            except Exception:  # noqa: BLE001 - keep the shared poller alive
+                self.failed_polls += 1
+                logger.exception("Unexpected error in price feed poller")
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        """Stop the poller and drop all subscribers."""
+        self._subscribers.clear()
+        task, self._task = self._task, None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        """Return subscriber, poll and coalescing counters for monitoring."""
+        return {
+            "subscribers": len(self._subscribers),
+            "coins": self.subscribed_coins(),
+            "polls": self.polls,
+            "failed_polls": self.failed_polls,
+            "coalesced_updates": sum(subscription.coalesced for subscription in self._subscribers),
+            "poll_interval_seconds": self.poll_interval,
+        }
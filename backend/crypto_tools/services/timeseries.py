@@ -0,0 +1,133 @@
+"""Local, memory-mapped store for CoinGecko ``market_chart`` price history."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+import tempfile
+import threading
+from typing import Iterator
+
+import numpy as np
+
+from .series import PriceSeries
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms fall back to the thread lock
+    fcntl = None
+
+DATA_DIR = os.path.expanduser(os.getenv("CRYPTO_DATA_DIR", "~/.cache/agent-dev/crypto"))
+
+# Step between points for each stored granularity, in milliseconds.
+INTERVAL_STEP_MS = {
+    "5m": 300_000,
+    "hourly": 3_600_000,
+    "daily": 86_400_000,
+}
+
+_SAFE_NAME = re.compile(r"[^a-z0-9._-]")
+
+
+class PriceHistoryStore:
+    """
+    Per-coin price series persisted as flat binary files and read through ``np.memmap``.
+
+    Each ``<root>/<interval>/<coin_id>.bin`` file holds ``n`` little-endian int64
+    millisecond timestamps followed by ``n`` float64 USD prices, sorted by time.
+    Files are rewritten atomically (write to a temporary file, then rename), so
+    readers in this or other worker processes never observe a partial series and
+    existing memory maps stay valid.
+    """
+
+    def __init__(self, root: str = DATA_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, coin_id: str, interval: str) -> str:
+        if interval not in INTERVAL_STEP_MS:
+            raise ValueError(f"Unsupported interval '{interval}'")
+        name = _SAFE_NAME.sub("_", coin_id.lower())
+        return os.path.join(self.root, interval, f"{name}.bin")
+
+    @contextlib.contextmanager
+    def _write_lock(self, path: str) -> Iterator[None]:
+        """Serialise writers across threads and, where supported, across processes."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, coin_id: str, interval: str) -> PriceSeries:
+        """Return the stored series of a coin; both of its arrays are read-only memory-mapped views."""
+        try:
+            handle = open(self._path(coin_id, interval), "rb")
+        except FileNotFoundError:
+            return PriceSeries.empty()
+
+        # Size and mappings come from the same open file, so a concurrent
+        # rename by a writer cannot make them disagree.
+        with handle:
+            count = os.fstat(handle.fileno()).st_size // 16
+            if count == 0:
+                return PriceSeries.empty()
+            timestamps = np.memmap(handle, dtype="<i8", mode="r", offset=0, shape=(count,))
+            prices = np.memmap(handle, dtype="<f8", mode="r", offset=count * 8, shape=(count,))
+        return PriceSeries(timestamps, prices)
+
+    def merge(self, coin_id: str, interval: str, timestamps: np.ndarray, prices: np.ndarray) -> None:
+        """
+        Merge freshly fetched points into the stored series.
+
+        Stored points at or after the first new timestamp are replaced by the new
+        points, which drops the provisional "latest" point of the previous fetch.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(timestamps) == 0:
+            return
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, prices = timestamps[order], prices[order]
+
+        path = self._path(coin_id, interval)
+        with self._write_lock(path):
+            old = self.read(coin_id, interval).between(end_ms=int(timestamps[0]))
+            merged_ts = np.concatenate([old.timestamps, timestamps])
+            merged_px = np.concatenate([old.prices, prices])
+            self._write(path, merged_ts, merged_px)
+
+    @staticmethod
+    def _write(path: str, timestamps: np.ndarray, prices: np.ndarray) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(timestamps.astype("<i8", copy=False).tobytes())
+                handle.write(prices.astype("<f8", copy=False).tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+
+_store: PriceHistoryStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceHistoryStore:
+    """Return the process-wide price history store rooted at ``CRYPTO_DATA_DIR``."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceHistoryStore(DATA_DIR)
+    return _store
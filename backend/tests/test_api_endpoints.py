@@ -1,8 +1,10 @@
 """Comprehensive tests for all API endpoints."""
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 import sys
 import os
@@ -145,7 +147,7 @@ class TestCityInfoEndpoints:
 class TestCryptoEndpoints:
     """Tests for cryptocurrency endpoints."""
 
-    @patch('api.services.crypto.get_crypto_price')
+    @patch('api.services.crypto.get_crypto_price_async')
     def test_get_price_success(self, mock_get_price):
         """Test successful crypto price request."""
         mock_get_price.return_value = {
@@ -161,7 +163,7 @@ class TestCryptoEndpoints:
         assert data["status"] == "success"
         assert "price_usd" in data
 
-    @patch('api.services.crypto.get_crypto_price')
+    @patch('api.services.crypto.get_crypto_price_async')
     def test_get_price_with_symbol(self, mock_get_price):
         """Test crypto price request with symbol."""
         mock_get_price.return_value = {
@@ -181,7 +183,7 @@ class TestCryptoEndpoints:
         response = client.get("/crypto/price/ ")
         assert response.status_code == 400
 
-    @patch('api.services.crypto.get_crypto_price')
+    @patch('api.services.crypto.get_crypto_price_async')
     def test_get_price_error(self, mock_get_price):
         """Test crypto price request with error."""
         mock_get_price.return_value = {
@@ -192,6 +194,212 @@ class TestCryptoEndpoints:
         response = client.get("/crypto/price/unknown")
         assert response.status_code == 500
 
+    @patch('api.services.crypto.get_crypto_prices_async')
+    def test_get_prices_success(self, mock_get_prices):
+        """Test the batch price endpoint."""
+        mock_get_prices.return_value = {
+            "status": "success",
+            "report": "The current price of btc (bitcoin) is $43,567.89 USD.",
+            "results": [{"status": "success", "crypto": "btc", "price_usd": 43567.89}]
+        }
+
+        response = client.get("/crypto/prices?coins=btc, eth")
+        assert response.status_code == 200
+        mock_get_prices.assert_called_once_with(["btc", "eth"])
+
+    def test_get_prices_empty(self):
+        """Test the batch price endpoint without coins."""
+        response = client.get("/crypto/prices?coins=,")
+        assert response.status_code == 400
+
+    @patch('api.services.crypto.predict_crypto_price_trends_async')
+    def test_predict_batch_success(self, mock_predict):
+        """Test the watchlist trend prediction endpoint."""
+        mock_predict.return_value = {
+            "status": "success",
+            "report": "BTC (bitcoin): UP (70% confidence)",
+            "results": [{"status": "success", "crypto": "btc", "prediction": "UP"}]
+        }
+
+        response = client.post("/crypto/predict-batch", json={"coins": ["btc", " eth "]})
+        assert response.status_code == 200
+        mock_predict.assert_called_once_with(["btc", "eth"])
+
+    def test_predict_batch_invalid(self):
+        """Test the watchlist trend prediction endpoint with no or blank coins."""
+        assert client.post("/crypto/predict-batch", json={"coins": []}).status_code == 422
+        assert client.post("/crypto/predict-batch", json={"coins": [" "]}).status_code == 400
+
+    @patch('api.services.crypto.get_crypto_correlations_async')
+    def test_get_correlations(self, mock_correlations):
+        """Test the return correlation endpoint."""
+        mock_correlations.return_value = {"status": "success", "coins": ["bitcoin", "ethereum"], "matrix": [[1.0, 0.8], [0.8, 1.0]]}
+
+        response = client.get("/crypto/correlations?coins=btc, eth&days=14")
+        assert response.status_code == 200
+        mock_correlations.assert_called_once_with(["btc", "eth"], 14)
+
+    def test_get_correlations_needs_two_coins(self):
+        """Test the correlation endpoint with a single coin."""
+        assert client.get("/crypto/correlations?coins=btc").status_code == 400
+
+    @patch('api.services.crypto.forecast_crypto_prices_async')
+    def test_get_forecast(self, mock_forecast):
+        """Test the Monte Carlo forecast endpoint."""
+        mock_forecast.return_value = {"status": "success", "results": []}
+
+        response = client.get("/crypto/forecast?coins=btc,eth&paths=5000")
+        assert response.status_code == 200
+        mock_forecast.assert_called_once_with(["btc", "eth"], 5000)
+
+    @patch('api.services.crypto.backtest_crypto_price_trends_async')
+    def test_backtest_trends(self, mock_backtest):
+        """Test the trend signal backtest endpoint."""
+        mock_backtest.return_value = {"status": "success", "results": []}
+
+        response = client.get("/crypto/backtest?coins=btc&days=180&horizon=12")
+        assert response.status_code == 200
+        mock_backtest.assert_called_once_with(["btc"], 180, 12)
+
+    @patch('api.services.crypto.get_crypto_price_anomalies_async')
+    def test_get_anomalies(self, mock_anomalies):
+        """Test the price anomaly endpoint."""
+        mock_anomalies.return_value = {"status": "success", "anomalies": []}
+
+        response = client.get("/crypto/anomalies/sol?hours=12")
+        assert response.status_code == 200
+        mock_anomalies.assert_called_once_with("sol", 12)
+
+    @patch('crypto_tools.services.live._get_cached_price_async')
+    def test_price_alert_lifecycle(self, mock_price):
+        """Test creating, listing and deleting a price alert."""
+        mock_price.return_value = 2.0
+        response = client.post("/crypto/alerts", json={"coin": "btc", "direction": "below", "threshold": 1.5})
+        assert response.status_code == 200
+        alert_id = response.json()["alert"]["alert_id"]
+
+        listed = client.get("/crypto/alerts?coin=btc").json()
+        assert alert_id in [alert["alert_id"] for alert in listed["active"]]
+        assert client.delete(f"/crypto/alerts/{alert_id}").status_code == 200
+        assert client.delete(f"/crypto/alerts/{alert_id}").status_code == 404
+
+    def test_price_alert_invalid(self):
+        """Test creating price alerts with an invalid direction, threshold or coin."""
+        assert client.post("/crypto/alerts", json={"coin": "btc", "direction": "up", "threshold": 1}).status_code == 422
+        assert client.post("/crypto/alerts", json={"coin": "btc", "direction": "above", "threshold": 0}).status_code == 422
+        assert client.post("/crypto/alerts", json={"coin": "notacoin", "direction": "above", "threshold": 1}).status_code == 400
+
+    @patch('api.services.crypto.get_crypto_price_at_async')
+    def test_get_price_at(self, mock_price_at):
+        """Test the point-in-time price endpoint."""
+        mock_price_at.return_value = {"status": "success", "price_usd": 62000.0}
+
+        response = client.get("/crypto/price-at/btc?at=2024-03-03")
+        assert response.status_code == 200
+        mock_price_at.assert_called_once_with("btc", "2024-03-03")
+
+    @patch('api.services.crypto.get_crypto_price_change_between_async')
+    def test_get_price_change_between(self, mock_between):
+        """Test the date-range price change endpoint."""
+        mock_between.return_value = {"status": "success", "price_change_percentage": 4.2}
+
+        response = client.get("/crypto/price-change/btc?start=2024-03-01&end=2024-03-03")
+        assert response.status_code == 200
+        mock_between.assert_called_once_with("btc", "2024-03-01", "2024-03-03")
+
+    @patch('api.services.crypto.get_crypto_price_history_async')
+    def test_get_price_history(self, mock_history):
+        """Test the downsampled price history endpoint."""
+        mock_history.return_value = {"status": "success", "prices": [[0, 1.0]]}
+
+        response = client.get("/crypto/history/btc?start=1700000000&end=1700086400&points=100")
+        assert response.status_code == 200
+        mock_history.assert_called_once_with("btc", 1700000000, 1700086400, 100)
+
+    def test_get_price_history_invalid_range(self):
+        """Test the price history endpoint with a reversed range."""
+        response = client.get("/crypto/history/btc?start=1700086400&end=1700000000")
+        assert response.status_code == 400
+
+    @patch('api.services.crypto.get_crypto_ohlc_async')
+    def test_get_ohlc(self, mock_ohlc):
+        """Test the OHLC candle endpoint."""
+        mock_ohlc.return_value = {"status": "success", "candles": [[0, 1.0, 2.0, 0.5, 1.5]]}
+
+        response = client.get("/crypto/ohlc/btc?interval=4h&days=30")
+        assert response.status_code == 200
+        mock_ohlc.assert_called_once_with("btc", "4h", 30)
+
+    def test_get_ohlc_invalid_interval(self):
+        """Test the OHLC candle endpoint with a malformed interval."""
+        response = client.get("/crypto/ohlc/btc?interval=weekly")
+        assert response.status_code == 422
+
+    def test_get_cache_stats(self):
+        """Test the price cache statistics endpoint."""
+        response = client.get("/crypto/cache/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert {"hits", "misses", "coalesced"} <= set(data["price_cache"])
+        assert "subscribers" in data["price_feed"]
+
+    def test_search_coins(self):
+        """Test the coin search endpoint."""
+        response = client.get("/crypto/coins/search?q=bitc")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["results"][0]["id"] == "bitcoin"
+
+    def test_get_circuit_breakers(self):
+        """Test the circuit breaker state endpoint."""
+        response = client.get("/crypto/circuit-breakers")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert isinstance(data["circuit_breakers"], dict)
+
+    @patch('crypto_tools.services.live._get_cached_prices_async')
+    def test_stream_prices_websocket(self, mock_get_prices):
+        """Test the WebSocket price stream."""
+        mock_get_prices.return_value = {"bitcoin": 43567.89}
+
+        with client.websocket_connect("/crypto/stream/ws?coins=btc") as websocket:
+            message = websocket.receive_json()
+
+        assert message["type"] == "prices"
+        assert message["updates"][0]["crypto_id"] == "bitcoin"
+        assert message["updates"][0]["price_usd"] == 43567.89
+
+    @patch('crypto_tools.services.live._get_cached_prices_async')
+    def test_stream_prices_subscribes_only_while_sending(self, mock_get_prices):
+        """Test that the SSE stream subscribes once sending starts and always unsubscribes."""
+        from api.routers.crypto import stream_prices
+        from crypto_tools.services import get_price_feed_stats
+
+        mock_get_prices.return_value = {"bitcoin": 43567.89}
+        request = MagicMock()
+        request.is_disconnected = AsyncMock(return_value=True)
+
+        async def open_and_drop():
+            await stream_prices(request, coins="btc")
+            return get_price_feed_stats()["subscribers"]
+
+        async def open_and_drain():
+            response = await stream_prices(request, coins="btc")
+            async for _ in response.body_iterator:
+                pass
+            return get_price_feed_stats()["subscribers"]
+
+        assert asyncio.run(open_and_drop()) == 0
+        assert asyncio.run(open_and_drain()) == 0
+
+    def test_stream_prices_unsupported(self):
+        """Test the SSE price stream with an unsupported cryptocurrency."""
+        response = client.get("/crypto/stream?coins=notacoin")
+        assert response.status_code == 400
+
 
 class TestLawEndpoints:
     """Tests for legal information endpoints."""
@@ -0,0 +1,32 @@
+import asyncio
+import inspect
+from unittest.mock import AsyncMock, patch
+
+from crypto_expert import tools
+from crypto_expert.agent import root_agent
+
+
+def test_agent_tools_use_public_names():
+    names = [tool.__name__ for tool in root_agent.tools]
+    assert names == [
+        "get_crypto_price",
+        "get_crypto_prices",
+        "get_crypto_price_change_summary",
+        "get_crypto_price_at",
+        "get_crypto_price_change_between",
+        "get_crypto_correlations",
+        "get_crypto_price_anomalies",
+        "predict_crypto_price_trend",
+        "predict_crypto_price_trends",
+        "forecast_crypto_prices",
+    ]
+    assert all(inspect.iscoroutinefunction(tool) for tool in root_agent.tools)
+    assert "_async" not in root_agent.instruction
+
+
+def test_agent_tool_awaits_async_service():
+    expected = {"status": "success", "crypto": "bitcoin", "price_usd": 50000.0}
+    with patch.object(tools, "get_crypto_price_async", AsyncMock(return_value=expected)) as service:
+        result = asyncio.run(tools.get_crypto_price("btc"))
+    assert result == expected
+    service.assert_awaited_once_with("btc")
@@ -3,7 +3,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from api.main import app
-from crypto_tools.services.price import get_crypto_price_change_summary
+from crypto_tools.services import get_crypto_price_change_summary
 
 
 def test_get_crypto_price_change_summary():
@@ -34,7 +34,7 @@ def test_get_crypto_price_change_summary():
 
 def test_mock_data_generation():
     """Test the mock data generation functionality directly."""
-    from crypto_tools.services.price import _generate_mock_price_change_summary
+    from crypto_tools.services.history import _generate_mock_price_change_summary
 
     # Test mock data generation
     result = _generate_mock_price_change_summary("bitcoin", "bitcoin", 7)
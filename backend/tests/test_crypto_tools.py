@@ -0,0 +1,1867 @@
+"""Tests for the cryptocurrency tool services with the CoinGecko API mocked out."""
+
+import asyncio
+import email.utils
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import numpy as np
+import pytest
+import requests
+
+from crypto_tools.services import analytics, breaker, client, history, lastgood, live, price, ratelimit, timeseries
+from crypto_tools.services.alerts import AlertBook, ThresholdIndex
+from crypto_tools.services.anomaly import AnomalyBook, EwmaDetector
+from crypto_tools.services.backtest import backtest_trend_signals, rolling_trend_indicators
+from crypto_tools.services.batcher import MicroBatcher
+from crypto_tools.services.breaker import CircuitBreaker, CircuitOpenError
+from crypto_tools.services.marketchart import market_chart_points
+from crypto_tools.services.ohlc import parse_candle_interval, resample_ohlc
+from crypto_tools.services.cache import StaleWhileRevalidateCache, TTLCache
+from crypto_tools.services.correlation import align_series, correlation_matrix, log_returns
+from crypto_tools.services.downsample import lttb
+from crypto_tools.services.forecast import fit_drift_volatility, simulate_price_bands
+from crypto_tools.services.indicators import compute_trend_indicators, price_matrix, tail_means
+from crypto_tools.services.registry import CoinIndex, CoinRegistry
+from crypto_tools.services.rolling import RollingStatsBook, RollingWindow
+from crypto_tools.services.series import PriceSeries
+from crypto_tools.services.stream import PriceFeed
+from crypto_tools.services.analytics import predict_crypto_price_trend_async, predict_crypto_price_trends_async
+from crypto_tools.services.price import get_crypto_price, get_crypto_price_async, get_crypto_prices_async
+
+
+def _mock_response(payload, status_code=200):
+    """Build a mock ``requests.Response`` returning ``payload`` as JSON."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.content = json.dumps(payload).encode()
+    response.json.return_value = payload
+    return response
+
+
+def _hourly_prices(count=168, start=100.0, step=0.5, end_ms=None):
+    """Build a ``market_chart`` style list of hourly ``[timestamp, price]`` pairs ending now."""
+    end_ms = end_ms if end_ms is not None else int(time.time() * 1000)
+    first_ms = end_ms - (count - 1) * 3_600_000
+    return [[first_ms + i * 3_600_000, start + i * step] for i in range(count)]
+
+
+def _reference_indicators(price_values, current_price):
+    """Scalar reference implementation of the original trend prediction maths."""
+    last_24h = price_values[-24:]
+    prev_24h = price_values[-48:-24]
+    momentum = (sum(last_24h) / 24 - sum(prev_24h) / 24) / (sum(prev_24h) / 24) * 100
+    ma_12h = sum(price_values[-12:]) / 12
+    ma_24h = sum(price_values[-24:]) / 24
+    ma_72h = sum(price_values[-72:]) / 72 if len(price_values) >= 72 else ma_24h
+    variance = sum((p - ma_24h) ** 2 for p in last_24h) / 24
+    volatility = variance ** 0.5 / ma_24h * 100
+    recent_change = (price_values[-1] - price_values[-6]) / price_values[-6] * 100
+
+    bullish = bearish = 0
+    if momentum > 1:
+        bullish += 1
+    elif momentum < -1:
+        bearish += 1
+    if ma_12h > ma_24h:
+        bullish += 1
+    else:
+        bearish += 1
+    if current_price > ma_72h:
+        bullish += 1
+    else:
+        bearish += 1
+    if recent_change > 0.5:
+        bullish += 1
+    elif recent_change < -0.5:
+        bearish += 1
+
+    return momentum, ma_72h, volatility, bullish, bearish
+
+
+def _loop_progress_probe():
+    """
+    Return ``(blocking, watch)``: ``blocking`` waits up to a second for the ``watch``
+    coroutine to run on the event loop and reports whether it did.
+    """
+    started, progressed = threading.Event(), threading.Event()
+
+    def blocking(*args, **kwargs):
+        started.set()
+        return {"status": "success", "loop_progressed": progressed.wait(1)}
+
+    async def watch():
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        progressed.set()
+
+    return blocking, watch
+
+
+def _mock_async_client(handler):
+    """Return an ``httpx.AsyncClient`` that answers requests with ``handler``."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _patch_async_client(handler):
+    """Patch the shared async client with one that answers requests with ``handler``."""
+    return patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(handler))
+
+
+def _answer(payload, seen=None):
+    """Build a handler answering every request with ``payload``, appending the requests to ``seen``."""
+    def handler(request):
+        if seen is not None:
+            seen.append(request)
+        return httpx.Response(200, json=payload)
+
+    return handler
+
+
+def _down(request):
+    """Handler for an unreachable CoinGecko."""
+    raise httpx.ConnectError("down")
+
+
+def _no_retry_sleep():
+    """Skip the async client's retry back-off."""
+    return patch("crypto_tools.services.client.asyncio.sleep", new_callable=AsyncMock)
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(tmp_path, monkeypatch):
+    """Give every test its own shared session, closed breakers, empty caches and private local stores."""
+    client.close_session()
+    breaker.reset_circuit_breakers()
+    price._price_cache.clear()
+    history._summary_cache.clear()
+    history._rolling_stats.clear()
+    live._anomaly_book.clear()
+    live._alert_book.clear()
+    monkeypatch.setattr(timeseries, "_store", timeseries.PriceHistoryStore(str(tmp_path / "history")))
+    monkeypatch.setattr(ratelimit, "_limiter", ratelimit.SharedTokenBucket(str(tmp_path / "ratelimit.state"), rate_per_minute=0))
+    last_good_store = lastgood.LastKnownGoodStore(str(tmp_path / "last_known_good.sqlite3"))
+    monkeypatch.setattr(lastgood, "_store", last_good_store)
+    yield
+    last_good_store.close()
+    client.close_session()
+    breaker.reset_circuit_breakers()
+    price._price_cache.clear()
+    history._summary_cache.clear()
+    history._rolling_stats.clear()
+    live._anomaly_book.clear()
+    live._alert_book.clear()
+
+
+class TestSharedSession:
+    """Tests for the pooled CoinGecko session."""
+
+    def test_session_is_shared(self):
+        """The same session is returned on every call."""
+        assert client.get_session() is client.get_session()
+
+    def test_session_uses_bounded_pool(self):
+        """HTTPS requests go through a bounded, blocking connection pool."""
+        adapter = client.get_session().get_adapter("https://api.coingecko.com")
+        assert adapter._pool_maxsize == client.POOL_MAXSIZE
+        assert adapter._pool_block is True
+
+    def test_close_session_resets(self):
+        """Closing the session makes the next call build a new one."""
+        first = client.get_session()
+        client.close_session()
+        assert client.get_session() is not first
+
+    def test_get_crypto_price_uses_session(self):
+        """Price lookups are issued through the shared session."""
+        session = client.get_session()
+        with patch.object(session, "get", return_value=_mock_response({"bitcoin": {"usd": 50000.0}})) as mock_get:
+            result = get_crypto_price("btc")
+
+        assert result["status"] == "success"
+        assert result["price_usd"] == 50000.0
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs["params"]["ids"] == "bitcoin"
+
+    def test_retry_after_connection_error(self):
+        """A transient connection error is retried on the same session."""
+        session = client.get_session()
+        responses = [requests.exceptions.ConnectionError("boom"), _mock_response({"ethereum": {"usd": 3000.0}})]
+        with patch.object(session, "get", side_effect=responses), patch("crypto_tools.services.client.time.sleep") as mock_sleep:
+            result = get_crypto_price("eth")
+
+        assert result["status"] == "success"
+        mock_sleep.assert_called_once()
+        assert 1 <= mock_sleep.call_args.args[0] <= 1 + client.BACKOFF_JITTER
+
+
+class TestAsyncClient:
+    """Tests for the asyncio CoinGecko client and async price services."""
+
+    @pytest.mark.asyncio
+    async def test_client_of_another_running_loop_is_closed(self):
+        """Replacing the client of a loop that is still running closes it on that loop."""
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            async def create():
+                return client.get_async_client()
+
+            previous = asyncio.run_coroutine_threadsafe(create(), other_loop).result(timeout=5)
+            current = client.get_async_client()
+            for _ in range(100):
+                if previous.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert current is not previous
+            assert previous.is_closed
+            assert not current.is_closed
+        finally:
+            await client.close_async_client()
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+
+    @pytest.mark.asyncio
+    async def test_get_crypto_price_async(self):
+        """Async price lookups resolve aliases and parse the payload."""
+        def handler(request):
+            assert request.url.params["ids"] == "solana"
+            return httpx.Response(200, json={"solana": {"usd": 150.0}})
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(handler)):
+            result = await get_crypto_price_async("SOL")
+
+        assert result["status"] == "success"
+        assert result["crypto_id"] == "solana"
+        assert result["price_usd"] == 150.0
+
+    @pytest.mark.asyncio
+    async def test_async_retry_uses_non_blocking_sleep(self):
+        """Rate-limited responses back off with ``asyncio.sleep``."""
+        responses = iter([httpx.Response(429), httpx.Response(200, json={"bitcoin": {"usd": 1.0}})])
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(lambda request: next(responses))), \
+                patch("crypto_tools.services.client.asyncio.sleep", new_callable=AsyncMock) as mock_sleep, \
+                patch("crypto_tools.services.client.time.sleep") as mock_blocking_sleep:
+            result = await get_crypto_price_async("btc")
+
+        assert result["status"] == "success"
+        mock_sleep.assert_awaited_once()
+        assert 1 <= mock_sleep.call_args.args[0] <= 1 + client.BACKOFF_JITTER
+        mock_blocking_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_client_errors_map_to_requests(self):
+        """Upstream HTTP errors surface as ``requests`` exceptions with a status code."""
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(lambda request: httpx.Response(404))):
+            with pytest.raises(requests.exceptions.HTTPError) as exc_info:
+                await client.make_request_with_retry_async("https://example.test/x", {}, max_retries=0)
+
+        assert exc_info.value.response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_predict_trend_async(self):
+        """Trend prediction combines the live price with the hourly history."""
+        def handler(request):
+            if request.url.path.endswith("/simple/price"):
+                return httpx.Response(200, json={"ethereum": {"usd": 250.0}})
+            return httpx.Response(200, json={"prices": _hourly_prices()})
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(handler)):
+            result = await predict_crypto_price_trend_async("eth")
+
+        assert result["status"] == "success"
+        assert result["prediction"] == "UP"
+        assert result["current_price_usd"] == 250.0
+        assert "is_mock_data" not in result
+
+
+class TestCircuitBreaker:
+    """Tests for failing fast while CoinGecko is degraded."""
+
+    def test_opens_after_threshold_and_rejects_calls(self):
+        """Consecutive failures open the breaker, which then rejects calls."""
+        circuit = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+        circuit.record_failure()
+        circuit.before_call()
+        circuit.record_failure()
+
+        assert circuit.state == "open"
+        with pytest.raises(CircuitOpenError):
+            circuit.before_call()
+        assert circuit.snapshot()["rejected_calls"] == 1
+
+    def test_half_open_trial_closes_or_reopens(self):
+        """After the reset timeout one trial call decides the next state."""
+        circuit = CircuitBreaker("test", failure_threshold=1, reset_timeout=0, half_open_max_calls=1)
+        circuit.record_failure()
+        assert circuit.state == "half_open"
+
+        circuit.before_call()
+        circuit.record_failure()
+        circuit.before_call()
+        circuit.record_success()
+
+        assert circuit.state == "closed"
+        states = [transition["to"] for transition in circuit.snapshot()["transitions"]]
+        assert states == ["open", "half_open", "open", "half_open", "closed"]
+
+    def test_open_breaker_skips_retries(self):
+        """Once the endpoint breaker opens, requests fail without sleeping or calling upstream."""
+        session = client.get_session()
+        with patch.object(session, "get", side_effect=requests.exceptions.ConnectionError("down")) as mock_get, \
+                patch("crypto_tools.services.client.time.sleep") as mock_sleep:
+            breaker.get_circuit_breaker("simple/price").failure_threshold = 2
+            with pytest.raises(requests.exceptions.ConnectionError):
+                client.make_request_with_retry(f"{client.COINGECKO_BASE_URL}/simple/price", {})
+            with pytest.raises(CircuitOpenError):
+                client.make_request_with_retry(f"{client.COINGECKO_BASE_URL}/simple/price", {})
+
+        assert mock_get.call_count == 2
+        assert mock_sleep.call_count == 1
+        assert breaker.get_circuit_breaker_states()["simple/price"]["state"] == "open"
+
+    def test_client_errors_are_not_retried(self):
+        """A 404 is raised at once and does not count against the breaker."""
+        session = client.get_session()
+        with patch.object(session, "get", return_value=_mock_response({}, status_code=404)) as mock_get, \
+                patch("crypto_tools.services.client.time.sleep") as mock_sleep:
+            mock_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.make_request_with_retry(f"{client.COINGECKO_BASE_URL}/coins/bitcoin/market_chart", {})
+
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+        assert breaker.get_circuit_breaker_states()["coins/{id}/market_chart"]["state"] == "closed"
+
+    def test_open_breaker_falls_back_immediately(self):
+        """Price lookups use the fallback path without touching the network while open."""
+        circuit = breaker.get_circuit_breaker("simple/price")
+        for _ in range(circuit.failure_threshold):
+            circuit.record_failure()
+
+        with patch.object(client.get_session(), "get") as mock_get:
+            result = get_crypto_price("btc")
+
+        mock_get.assert_not_called()
+        assert result["status"] == "error"
+
+
+class TestRateLimiter:
+    """Tests for the outbound CoinGecko budget shared across workers."""
+
+    def test_workers_share_one_budget(self, tmp_path):
+        """Two buckets on the same file draw from the same tokens."""
+        path = str(tmp_path / "bucket.state")
+        worker_a = ratelimit.SharedTokenBucket(path, rate_per_minute=60, burst=2, max_wait=10)
+        worker_b = ratelimit.SharedTokenBucket(path, rate_per_minute=60, burst=2, max_wait=10)
+
+        assert worker_a.reserve() == 0
+        assert worker_b.reserve() == 0
+        assert worker_a.reserve() == pytest.approx(1.0, abs=0.05)
+        assert worker_b.reserve() == pytest.approx(2.0, abs=0.05)
+
+    def test_wait_beyond_maximum_is_rejected(self, tmp_path):
+        """A slot further away than ``max_wait`` raises instead of queueing."""
+        bucket = ratelimit.SharedTokenBucket(str(tmp_path / "bucket.state"), rate_per_minute=60, burst=1, max_wait=0.5)
+        bucket.reserve()
+
+        with pytest.raises(ratelimit.RateLimitExceeded):
+            bucket.reserve()
+        assert bucket.stats()["rejected"] == 1
+
+    def test_retry_after_is_honoured_and_shared(self, tmp_path, monkeypatch):
+        """A 429 waits for ``Retry-After`` and pauses the budget for other workers."""
+        path = str(tmp_path / "bucket.state")
+        monkeypatch.setattr(ratelimit, "_limiter", ratelimit.SharedTokenBucket(path, rate_per_minute=600, burst=10, max_wait=10))
+        limited = _mock_response({}, status_code=429)
+        limited.headers = {"Retry-After": "3"}
+        session = client.get_session()
+        with patch.object(session, "get", side_effect=[limited, _mock_response({"bitcoin": {"usd": 1.0}})]), \
+                patch("crypto_tools.services.client.time.sleep") as mock_sleep:
+            client.make_request_with_retry(f"{client.COINGECKO_BASE_URL}/simple/price", {})
+
+        assert 3 <= mock_sleep.call_args_list[0].args[0] <= 3 * (1 + client.BACKOFF_JITTER)
+        other_worker = ratelimit.SharedTokenBucket(path, rate_per_minute=600, burst=10, max_wait=10)
+        assert other_worker.reserve() > 2
+
+    @pytest.mark.asyncio
+    async def test_async_limiter_lock_is_taken_off_the_loop(self, tmp_path, monkeypatch):
+        """The async path takes the limiter's file lock in worker threads, never on the event loop thread."""
+        bucket = ratelimit.SharedTokenBucket(str(tmp_path / "bucket.state"), rate_per_minute=600, burst=10, max_wait=10)
+        monkeypatch.setattr(ratelimit, "_limiter", bucket)
+        threads = []
+        for name in ("reserve", "block_for"):
+            method = getattr(bucket, name)
+            monkeypatch.setattr(bucket, name, lambda *args, method=method: threads.append(threading.get_ident()) or method(*args))
+        responses = iter([httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200, json={})])
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(lambda request: next(responses))), \
+                patch("crypto_tools.services.client.asyncio.sleep", new_callable=AsyncMock):
+            await client.make_request_with_retry_async(f"{client.COINGECKO_BASE_URL}/simple/price", {})
+
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+
+    def test_long_retry_after_gives_up(self):
+        """A ``Retry-After`` beyond the maximum wait fails immediately."""
+        limited = _mock_response({}, status_code=429)
+        limited.headers = {"Retry-After": "3600"}
+        limited.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+        with patch.object(client.get_session(), "get", return_value=limited) as mock_get, \
+                patch("crypto_tools.services.client.time.sleep") as mock_sleep:
+            with pytest.raises(requests.exceptions.HTTPError):
+                client.make_request_with_retry(f"{client.COINGECKO_BASE_URL}/simple/price", {})
+
+        assert mock_get.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_parse_retry_after(self):
+        """Both delta-seconds and HTTP-date forms are understood."""
+        future = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+        assert ratelimit.parse_retry_after("5") == 5.0
+        assert 28 <= ratelimit.parse_retry_after(future) <= 30
+        assert ratelimit.parse_retry_after("soon") is None
+
+
+class TestCoinRegistry:
+    """Tests for resolving coins through the registry index."""
+
+    def test_resolves_ids_symbols_names_and_aliases(self):
+        """Lookups are case-insensitive and aliases win over the index."""
+        index = CoinIndex([("avalanche-2", "avax", "Avalanche"), ("shiba-inu", "shib", "Shiba Inu")], {"avalanche": "avalanche-2"})
+
+        assert index.resolve("AVAX") == "avalanche-2"
+        assert index.resolve("shiba inu") == "shiba-inu"
+        assert index.resolve("shiba-inu") == "shiba-inu"
+        assert index.resolve(" avalanche ") == "avalanche-2"
+        assert index.resolve("unknown") is None
+
+    def test_prefix_search_returns_distinct_coins(self):
+        """Prefix search matches any key once per coin."""
+        index = CoinIndex([("bitcoin", "btc", "Bitcoin"), ("bitcoin-cash", "bch", "Bitcoin Cash"), ("ethereum", "eth", "Ethereum")])
+
+        assert [coin["id"] for coin in index.search("bit")] == ["bitcoin", "bitcoin-cash"]
+        assert index.search("bit", limit=1) == [{"id": "bitcoin", "name": "Bitcoin"}]
+        assert index.search("") == []
+
+    def test_snapshot_extends_bundled_coins(self, tmp_path):
+        """Snapshot coins are indexed, but bundled coins keep contested symbols."""
+        path = tmp_path / "coins.json"
+        path.write_text('[{"id": "bitcoin-fake", "symbol": "btc", "name": "Fake"}, {"id": "newcoin", "symbol": "nwc", "name": "New Coin"}]')
+        registry = CoinRegistry({}, snapshot_path=str(path))
+
+        assert registry.resolve("nwc") == "newcoin"
+        assert registry.resolve("btc") == "bitcoin"
+        assert registry.resolve("bitcoin-fake") == "bitcoin-fake"
+
+    @pytest.mark.asyncio
+    async def test_refresh_persists_snapshot(self, tmp_path):
+        """A refresh downloads /coins/list, writes the snapshot and swaps the index."""
+        def handler(request):
+            assert request.url.path.endswith("/coins/list")
+            return httpx.Response(200, json=[{"id": "freshcoin", "symbol": "frsh", "name": "Fresh"}])
+
+        registry = CoinRegistry({}, snapshot_path=str(tmp_path / "coins.json"))
+        assert registry.resolve("frsh") is None
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(handler)):
+            await registry.refresh()
+
+        assert registry.resolve("frsh") == "freshcoin"
+        assert CoinRegistry({}, snapshot_path=str(tmp_path / "coins.json")).resolve("fresh") == "freshcoin"
+
+    def test_prices_resolve_coins_beyond_the_aliases(self):
+        """Price lookups accept any registry coin, not only the alias table."""
+        with patch.object(client.get_session(), "get", return_value=_mock_response({"avalanche-2": {"usd": 30.0}})) as mock_get:
+            result = get_crypto_price("Avalanche")
+
+        assert result["crypto_id"] == "avalanche-2"
+        assert mock_get.call_args.kwargs["params"]["ids"] == "avalanche-2"
+
+    def test_polygon_resolves_to_registry_id(self):
+        """Polygon's name and symbol resolve to its CoinGecko ID, not a made-up 'polygon' ID."""
+        assert price._resolve_crypto_id("matic") == price._resolve_crypto_id("Polygon") == "matic-network"
+
+
+class TestPriceCache:
+    """Tests for the TTL price cache and single-flight coalescing."""
+
+    def test_entries_expire_after_ttl(self):
+        """Values are served until their TTL elapses."""
+        cache = TTLCache(ttl=0.05)
+        cache.set("bitcoin", 1.0)
+        assert cache.get("bitcoin") == 1.0
+        time.sleep(0.06)
+        assert cache.get("bitcoin") is None
+
+    def test_cache_is_bounded(self):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_sync_single_flight(self):
+        """Concurrent threads missing the same key trigger one load."""
+        cache = TTLCache(ttl=60)
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(1)
+            return 42.0
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("btc", loader))) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == [42.0] * 20
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_async_single_flight(self):
+        """200 concurrent coroutines for one coin share one upstream call."""
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 50000.0
+
+        results = await asyncio.gather(*(cache.get_or_load_async("bitcoin", loader) for _ in range(200)))
+
+        assert set(results) == {50000.0}
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 199
+        assert await cache.get_or_load_async("bitcoin", loader) == 50000.0
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_failures_are_shared_and_not_cached(self):
+        """A failing load propagates to every waiter and leaves no entry behind."""
+        cache = TTLCache(ttl=60)
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise requests.exceptions.ConnectionError("down")
+
+        results = await asyncio.gather(*(cache.get_or_load_async("eth", loader) for _ in range(5)), return_exceptions=True)
+
+        assert all(isinstance(result, requests.exceptions.ConnectionError) for result in results)
+        assert cache.stats()["size"] == 0
+
+    def test_get_crypto_price_is_cached(self):
+        """Repeated lookups by alias hit the cache keyed by CoinGecko ID."""
+        session = client.get_session()
+        with patch.object(session, "get", return_value=_mock_response({"bitcoin": {"usd": 50000.0}})) as mock_get:
+            assert get_crypto_price("btc")["price_usd"] == 50000.0
+            assert get_crypto_price("bitcoin")["price_usd"] == 50000.0
+
+        mock_get.assert_called_once()
+        stats = price.get_price_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+class TestStaleWhileRevalidate:
+    """Tests for serving aging summaries while refreshing them in the background."""
+
+    def test_fresh_entries_skip_the_loader(self):
+        """Entries within their freshness limit are served without reloading."""
+        cache = StaleWhileRevalidateCache(lambda key: (60, 120))
+        loader = MagicMock(return_value="value")
+
+        assert cache.get_or_load("k", loader) == "value"
+        assert cache.get_or_load("k", loader) == "value"
+        assert loader.call_count == 1
+        assert cache.stats()["fresh_hits"] == 1
+
+    def test_stale_entry_is_served_and_refreshed_once(self):
+        """A stale entry returns at once while one background reload replaces it."""
+        cache = StaleWhileRevalidateCache(lambda key: (0, 60))
+        cache.set("k", "old")
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(1)
+            return "new"
+
+        assert cache.get_or_load("k", loader) == "old"
+        assert cache.get_or_load("k", loader) == "old"
+        release.set()
+        cache._executor.shutdown(wait=True)
+
+        assert len(calls) == 1
+        assert cache._entries["k"][1] == "new"
+        assert cache.stats()["stale_hits"] == 2
+
+    def test_expired_entry_loads_inline(self):
+        """Entries past the staleness limit are reloaded before returning."""
+        cache = StaleWhileRevalidateCache(lambda key: (0, 0))
+        cache.set("k", "old")
+
+        assert cache.get_or_load("k", lambda: "new") == "new"
+        assert cache.stats()["misses"] == 1
+
+    def test_concurrent_stale_hits_share_one_pool(self):
+        """Threads refreshing stale keys at once create a single worker pool."""
+        cache = StaleWhileRevalidateCache(lambda key: (0, 60))
+        for key in range(8):
+            cache.set(key, "old")
+        pools = []
+        real_pool = ThreadPoolExecutor
+
+        def slow_pool(*args, **kwargs):
+            time.sleep(0.01)  # widen the window between the check and the assignment
+            pools.append(real_pool(*args, **kwargs))
+            return pools[-1]
+
+        barrier = threading.Barrier(8)
+
+        def hit(key):
+            barrier.wait()
+            cache.get_or_load(key, lambda: "new")
+
+        with patch("crypto_tools.services.cache.ThreadPoolExecutor", side_effect=slow_pool):
+            threads = [threading.Thread(target=hit, args=(key,)) for key in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        cache.close()
+
+        assert len(pools) == 1
+        assert pools[0]._shutdown
+
+    def test_close_shuts_down_refresh_workers(self):
+        """Closing stops the worker pool; entries stay and a later stale hit starts a new pool."""
+        cache = StaleWhileRevalidateCache(lambda key: (0, 60))
+        cache.set("k", "old")
+        cache.get_or_load("k", lambda: "new")
+        executor = cache._executor
+
+        cache.close()
+        cache.close()
+
+        assert executor._shutdown
+        assert cache._executor is None
+        assert cache.stats()["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_background_refresh_keeps_stale_value(self):
+        """A failing async refresh leaves the stale entry in place."""
+        cache = StaleWhileRevalidateCache(lambda key: (0, 60))
+        cache.set("k", "old")
+        loader = AsyncMock(side_effect=requests.exceptions.ConnectionError("down"))
+
+        assert await cache.get_or_load_async("k", loader) == "old"
+        await asyncio.gather(*cache._tasks)
+
+        assert cache._entries["k"][1] == "old"
+        assert cache.stats()["failed_refreshes"] == 1
+
+    def test_summary_is_served_from_cache(self):
+        """A repeated summary request is answered without another upstream call."""
+        payload = {"prices": _hourly_prices(count=24 * 30)}
+        with patch.object(client.get_session(), "get", return_value=_mock_response(payload)) as mock_get:
+            first = history.get_crypto_price_change_summary("btc", 30)
+            second = history.get_crypto_price_change_summary("bitcoin", 30)
+
+        assert mock_get.call_count == 1
+        assert first["final_price_usd"] == second["final_price_usd"]
+        assert second["crypto"] == "bitcoin"
+        assert "is_mock_data" not in second
+
+    def test_mock_fallback_is_not_cached(self):
+        """Upstream failures fall back to mock data without caching it."""
+        with patch.object(client.get_session(), "get", side_effect=requests.exceptions.ConnectionError("down")), \
+                patch("crypto_tools.services.client.time.sleep"):
+            result = history.get_crypto_price_change_summary("eth", 90)
+
+        assert result["is_mock_data"] is True
+        assert history.get_summary_cache_stats()["size"] == 0
+
+
+class TestBatchPrices:
+    """Tests for multi-coin price lookups."""
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_single_request(self):
+        """All aliases resolve into one ``ids=`` request."""
+        payload = {"bitcoin": {"usd": 50000.0}, "ethereum": {"usd": 3000.0}, "solana": {"usd": 150.0}}
+        seen = []
+        with _patch_async_client(_answer(payload, seen)):
+            result = await get_crypto_prices_async(["btc", "ETH", "solana", "bitcoin"])
+
+        assert [request.url.params["ids"] for request in seen] == ["bitcoin,ethereum,solana"]
+        assert result["status"] == "success"
+        assert [entry["price_usd"] for entry in result["results"]] == [50000.0, 3000.0, 150.0, 50000.0]
+
+    @pytest.mark.asyncio
+    async def test_batch_reuses_cached_prices(self):
+        """Only coins missing from the cache are requested upstream."""
+        price._price_cache.set("bitcoin", 50000.0)
+        seen = []
+        with _patch_async_client(_answer({"ethereum": {"usd": 3000.0}}, seen)):
+            result = await get_crypto_prices_async(["btc", "eth"])
+
+        assert [request.url.params["ids"] for request in seen] == ["ethereum"]
+        assert result["status"] == "success"
+
+    @pytest.mark.asyncio
+    async def test_batch_reports_unsupported_coins(self):
+        """Unknown coins are reported per entry without failing the batch."""
+        with _patch_async_client(_answer({"bitcoin": {"usd": 50000.0}})):
+            result = await get_crypto_prices_async(["btc", "notacoin"])
+
+        assert result["status"] == "success"
+        assert result["results"][1]["status"] == "error"
+        assert "not supported" in result["results"][1]["error_message"]
+
+    @pytest.mark.asyncio
+    async def test_batch_validation(self):
+        """Empty and oversized batches are rejected."""
+        assert (await get_crypto_prices_async([]))["status"] == "error"
+        assert (await get_crypto_prices_async(["btc"] * (price.MAX_PRICE_BATCH_SIZE + 1)))["status"] == "error"
+
+
+class TestMicroBatcher:
+    """Tests for merging concurrent lookups into one upstream call."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_keys_share_one_fetch(self):
+        """Different keys requested within the window are fetched together."""
+        calls = []
+
+        async def fetch_many(keys):
+            calls.append(sorted(keys))
+            return {key: key.upper() for key in keys}
+
+        batcher = MicroBatcher(fetch_many, window=0.01, max_batch_size=50)
+        results = await asyncio.gather(*(batcher.load(key) for key in ["a", "b", "c", "a"]))
+
+        assert results == ["A", "B", "C", "A"]
+        assert calls == [["a", "b", "c"]]
+        assert batcher.stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_early(self):
+        """Reaching ``max_batch_size`` flushes without waiting for the window."""
+        calls = []
+
+        async def fetch_many(keys):
+            calls.append(len(keys))
+            return {}
+
+        batcher = MicroBatcher(fetch_many, window=10, max_batch_size=2)
+        results = await asyncio.wait_for(asyncio.gather(batcher.load("a"), batcher.load("b")), timeout=1)
+
+        assert results == [None, None]
+        assert calls == [2]
+
+    @pytest.mark.asyncio
+    async def test_fetch_errors_reach_every_waiter(self):
+        """A failed batch fails all of its waiters."""
+        async def fetch_many(keys):
+            raise requests.exceptions.ConnectionError("down")
+
+        batcher = MicroBatcher(fetch_many, window=0.005, max_batch_size=10)
+        results = await asyncio.gather(batcher.load("a"), batcher.load("b"), return_exceptions=True)
+
+        assert all(isinstance(result, requests.exceptions.ConnectionError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_parallel_price_lookups_are_batched(self):
+        """Parallel async price lookups for different coins issue one request."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.params["ids"])
+            return httpx.Response(200, json={"bitcoin": {"usd": 50000.0}, "ethereum": {"usd": 3000.0}})
+
+        with patch("crypto_tools.services.client.get_async_client", return_value=_mock_async_client(handler)):
+            btc, eth = await asyncio.gather(get_crypto_price_async("btc"), get_crypto_price_async("eth"))
+
+        assert seen == ["bitcoin,ethereum"]
+        assert btc["price_usd"] == 50000.0
+        assert eth["price_usd"] == 3000.0
+
+
+class TestPriceFeed:
+    """Tests for the shared streaming price poller."""
+
+    @pytest.mark.asyncio
+    async def test_one_poll_serves_every_subscriber(self):
+        """All subscribed coins are fetched together and fanned out per coin."""
+        calls = []
+
+        async def fetch_prices(ids):
+            calls.append(ids)
+            return {"bitcoin": 50000.0, "ethereum": 3000.0, "solana": None}
+
+        feed = PriceFeed(fetch_prices, poll_interval=60)
+        first = feed.subscribe(["bitcoin", "ethereum"])
+        second = feed.subscribe(["ethereum", "solana"])
+        try:
+            first_updates = await asyncio.wait_for(first.next_updates(), timeout=1)
+            second_updates = await asyncio.wait_for(second.next_updates(), timeout=1)
+        finally:
+            await feed.close()
+
+        assert calls == [["bitcoin", "ethereum", "solana"]]
+        assert {update["crypto_id"] for update in first_updates} == {"bitcoin", "ethereum"}
+        assert [update["price_usd"] for update in second_updates] == [3000.0]
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_latest_price_only(self):
+        """Unread updates for a coin are replaced rather than queued."""
+        feed = PriceFeed(AsyncMock(return_value={}), poll_interval=60)
+        subscription = feed.subscribe(["bitcoin"])
+        try:
+            for value in (1.0, 2.0, 3.0):
+                feed.publish("bitcoin", value)
+            feed.publish("bitcoin", 3.0)
+            updates = await asyncio.wait_for(subscription.next_updates(), timeout=1)
+        finally:
+            await feed.close()
+
+        assert [update["price_usd"] for update in updates] == [3.0]
+        assert subscription.coalesced == 2
+
+    @pytest.mark.asyncio
+    async def test_poll_errors_keep_the_feed_running(self):
+        """A failed upstream poll is counted and the next poll proceeds."""
+        fetch_prices = AsyncMock(side_effect=[requests.exceptions.ConnectionError("down"), {"bitcoin": 1.0}])
+        feed = PriceFeed(fetch_prices, poll_interval=0.001)
+        subscription = feed.subscribe(["bitcoin"])
+        try:
+            updates = await asyncio.wait_for(subscription.next_updates(), timeout=1)
+        finally:
+            await feed.close()
+
+        assert updates[0]["price_usd"] == 1.0
+        assert feed.stats()["failed_polls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_coin_is_rejected(self):
+        """Opening a stream for an unknown coin returns an error payload."""
+        subscription, error = live.open_price_stream(["btc", "notacoin"])
+
+        assert subscription is None
+        assert error["status"] == "error"
+
+
+class TestPriceHistoryStore:
+    """Tests for the local memory-mapped price history store."""
+
+    def test_merge_and_read_round_trip(self, tmp_path):
+        """Merged points are read back as memory-mapped arrays in time order."""
+        store = timeseries.PriceHistoryStore(str(tmp_path))
+        store.merge("bitcoin", "hourly", [3, 1, 2], [30.0, 10.0, 20.0])
+
+        series = store.read("bitcoin", "hourly")
+        assert isinstance(series.prices, np.memmap)
+        assert series.timestamps.tolist() == [1, 2, 3]
+        assert series.prices.tolist() == [10.0, 20.0, 30.0]
+
+    def test_merge_replaces_overlapping_tail(self, tmp_path):
+        """New points replace stored points from their first timestamp onwards."""
+        store = timeseries.PriceHistoryStore(str(tmp_path))
+        store.merge("bitcoin", "hourly", [1, 2, 3, 4], [1.0, 2.0, 3.0, 3.5])
+        store.merge("bitcoin", "hourly", [3, 5], [3.1, 5.0])
+
+        series = store.read("bitcoin", "hourly")
+        assert series.timestamps.tolist() == [1, 2, 3, 5]
+        assert series.prices.tolist() == [1.0, 2.0, 3.1, 5.0]
+
+    def test_missing_series_is_empty(self, tmp_path):
+        """Unknown coins read as empty series."""
+        series = timeseries.PriceHistoryStore(str(tmp_path)).read("nothing", "daily")
+        assert len(series) == 0 and series.last_timestamp is None
+
+    def test_time_range_slices_are_views(self, tmp_path):
+        """Slicing a stored series by time range shares the memory-mapped buffers."""
+        store = timeseries.PriceHistoryStore(str(tmp_path))
+        store.merge("bitcoin", "hourly", np.arange(0, 100, 10), np.arange(10, dtype=np.float64))
+        series = store.read("bitcoin", "hourly")
+
+        window = series.between(25, 70)
+
+        assert window.timestamps.tolist() == [30, 40, 50, 60]
+        assert window.prices.tolist() == [3.0, 4.0, 5.0, 6.0]
+        assert np.shares_memory(window.prices, series.prices)
+        assert series.since(90).prices.tolist() == [9.0]
+        assert len(series.between(70, 25)) == 0
+
+    def test_series_validation_and_compact_prices(self):
+        """Series need matching 1-D columns, and prices can be stored as float32."""
+        with pytest.raises(ValueError):
+            PriceSeries([1, 2, 3], [1.0, 2.0])
+
+        series = PriceSeries([1, 2], [1.5, 2.5])
+        compact = series.astype(np.float32)
+        assert compact.prices.dtype == np.float32
+        assert compact.nbytes == series.nbytes - 8
+        assert compact.timestamps is series.timestamps
+
+    def test_overlapping_windows_served_locally(self):
+        """A 14-day fetch also serves the 7-day window without another request."""
+        session = client.get_session()
+        payload = {"prices": _hourly_prices(count=14 * 24)}
+        with patch.object(session, "get", return_value=_mock_response(payload)) as mock_get:
+            long_window = history.get_crypto_price_change_summary("btc", 14)
+            short_window = history.get_crypto_price_change_summary("btc", 7)
+
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs["params"]["days"] == 14
+        assert "is_mock_data" not in long_window and "is_mock_data" not in short_window
+        assert short_window["initial_price_usd"] > long_window["initial_price_usd"]
+
+    def test_only_missing_tail_is_fetched(self):
+        """Stale stored history is topped up with a small incremental request."""
+        now_ms = int(time.time() * 1000)
+        stale_end = now_ms - 3 * 3_600_000
+        timeseries.get_price_store().merge(
+            "ethereum", "hourly", *np.array(_hourly_prices(count=7 * 24 + 2, end_ms=stale_end)).T
+        )
+
+        session = client.get_session()
+        tail = {"prices": _hourly_prices(count=24, start=500.0, step=1.0, end_ms=now_ms)}
+        with patch.object(session, "get", return_value=_mock_response(tail)) as mock_get:
+            result = history.get_crypto_price_change_summary("eth", 7)
+
+        assert mock_get.call_args.kwargs["params"]["days"] == 1
+        assert result["final_price_usd"] == 523.0
+
+
+class TestRollingStats:
+    """Tests for incrementally maintained window statistics."""
+
+    def test_window_matches_full_recompute(self):
+        """Min, max, mean and std match NumPy over the window after every push."""
+        rng = np.random.default_rng(7)
+        prices = 100 + rng.normal(0, 5, 500).cumsum()
+        window = RollingWindow(span_ms=49)
+
+        for timestamp, value in enumerate(prices):
+            window.push(timestamp, float(value))
+            expected = prices[max(0, timestamp - 49):timestamp + 1]
+            stats = window.snapshot()
+            assert stats["count"] == len(expected)
+            assert stats["first"] == expected[0] and stats["last"] == expected[-1]
+            assert stats["min"] == expected.min() and stats["max"] == expected.max()
+            assert stats["mean"] == pytest.approx(expected.mean())
+            assert stats["std"] == pytest.approx(expected.std())
+
+    def test_book_pushes_appended_points(self):
+        """New stored points are pushed onto the window; rewritten points trigger a rebuild."""
+        book = RollingStatsBook()
+        series = PriceSeries(np.arange(10), np.arange(10, dtype=np.float64))
+        book.window_stats("bitcoin", "hourly", 1, series.between(end_ms=8), 0)
+
+        stats = book.window_stats("bitcoin", "hourly", 1, series, 2)
+        assert (stats["first"], stats["last"], stats["count"]) == (2.0, 9.0, 8)
+        assert book.stats()["incremental_updates"] == 1
+
+        rewritten = PriceSeries(np.arange(10), np.r_[np.arange(9, dtype=np.float64), 42.0])
+        stats = book.window_stats("bitcoin", "hourly", 1, rewritten, 2)
+        assert stats["max"] == 42.0
+        assert book.stats()["rebuilds"] == 2
+
+    def test_summary_reads_window_stats(self):
+        """Summaries report the window mean and standard deviation alongside min and max."""
+        payload = {"prices": _hourly_prices(count=7 * 24, start=100.0, step=1.0)}
+        with patch.object(client.get_session(), "get", return_value=_mock_response(payload)):
+            result = history.get_crypto_price_change_summary("btc", 7)
+
+        expected = np.array([point[1] for point in payload["prices"]])
+        assert result["min_price_usd"] == expected.min()
+        assert result["average_price_usd"] == pytest.approx(expected.mean())
+        assert result["price_stddev_usd"] == pytest.approx(expected.std())
+
+
+class TestOhlc:
+    """Tests for resampling price series into OHLC candles."""
+
+    def test_parse_candle_interval(self):
+        """Intervals are a count followed by m, h or d."""
+        assert parse_candle_interval("5m") == 300_000
+        assert parse_candle_interval("4H") == 4 * 3_600_000
+        for invalid in ("", "0h", "1w", "h"):
+            with pytest.raises(ValueError):
+                parse_candle_interval(invalid)
+
+    def test_resample_matches_bucketed_points(self):
+        """Candles are epoch-aligned and skip buckets without points."""
+        hour = 3_600_000
+        series = PriceSeries([0, hour, 2 * hour, 3 * hour, 8 * hour], [10.0, 12.0, 9.0, 11.0, 20.0])
+
+        open_times, ohlc = resample_ohlc(series, 4 * hour)
+
+        assert open_times.tolist() == [0, 8 * hour]
+        assert ohlc.tolist() == [[10.0, 12.0, 9.0, 11.0], [20.0, 20.0, 20.0, 20.0]]
+
+    @pytest.mark.asyncio
+    async def test_ohlc_from_hourly_history(self):
+        """Four-hour candles over a week come from one hourly market_chart fetch."""
+        seen = []
+        with _patch_async_client(_answer({"prices": _hourly_prices(count=7 * 24)}, seen)):
+            result = await history.get_crypto_ohlc_async("btc", "4h", 7)
+
+        assert result["status"] == "success"
+        assert [request.url.params["interval"] for request in seen] == ["hourly"]
+        assert result["source_interval"] == "hourly"
+        first_open_time, first_open, high, low, close = result["candles"][1]
+        assert first_open_time % (4 * 3_600_000) == 0
+        assert high == close and low == first_open
+
+    @pytest.mark.asyncio
+    async def test_minute_candles_need_short_window(self):
+        """Sub-hour candles only exist for one-day windows, fetched without an interval parameter."""
+        assert (await history.get_crypto_ohlc_async("btc", "5m", 7))["status"] == "error"
+        assert (await history.get_crypto_ohlc_async("btc", "7m", 1))["status"] == "error"
+
+        now_ms = int(time.time() * 1000)
+        payload = {"prices": [[now_ms - i * 300_000, 100.0 + i] for i in range(288, -1, -1)]}
+        seen = []
+        with _patch_async_client(_answer(payload, seen)):
+            result = await history.get_crypto_ohlc_async("btc", "15m", 1)
+
+        assert result["status"] == "success"
+        assert "interval" not in seen[-1].url.params
+        assert 96 <= len(result["candles"]) <= 98
+
+
+class TestPriceHistoryRange:
+    """Tests for downsampled historical price ranges."""
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        """Downsampling keeps the first and last points and the spikes a chart must show."""
+        prices = np.full(1000, 100.0)
+        prices[400], prices[700] = 250.0, 10.0
+        series = PriceSeries(np.arange(1000) * 3_600_000, prices)
+
+        sampled = lttb(series, 50)
+
+        assert len(sampled) == 50
+        assert sampled.timestamps[0] == 0 and sampled.timestamps[-1] == 999 * 3_600_000
+        assert sampled.prices.max() == 250.0 and sampled.prices.min() == 10.0
+        assert np.all(np.diff(sampled.timestamps) > 0)
+        assert lttb(series.between(0, 10 * 3_600_000), 50).timestamps.tolist() == series.timestamps[:10].tolist()
+
+    @pytest.mark.asyncio
+    async def test_history_range_is_downsampled(self):
+        """A 30-day hourly range is read from the store and reduced to the requested points."""
+        payload = {"prices": _hourly_prices(count=30 * 24)}
+        seen = []
+        with _patch_async_client(_answer(payload, seen)):
+            result = await history.get_crypto_price_history_async("btc", points=200)
+
+        assert result["status"] == "success"
+        assert seen[-1].url.params["interval"] == "hourly"
+        assert result["original_points"] >= 700
+        assert len(result["prices"]) == 200
+        assert result["prices"][-1] == payload["prices"][-1]
+
+    @pytest.mark.asyncio
+    async def test_history_range_validation(self):
+        """Ranges must be ordered, recent enough and ask for a sensible number of points."""
+        now = int(time.time())
+        assert (await history.get_crypto_price_history_async("btc", start=now - 10, end=now - 20))["status"] == "error"
+        assert (await history.get_crypto_price_history_async("btc", start=now - 400 * 86400))["status"] == "error"
+        assert (await history.get_crypto_price_history_async("btc", points=2))["status"] == "error"
+
+
+class TestPointInTime:
+    """Tests for as-of price lookups and date-range summaries over the stored series."""
+
+    def _store_hourly(self, end_ms, count=30 * 24):
+        timeseries.get_price_store().merge("bitcoin", "hourly", *np.array(_hourly_prices(count=count, end_ms=end_ms)).T)
+
+    def test_parse_time_formats(self):
+        """Dates, date-times with offsets and Unix seconds are accepted."""
+        assert history._parse_time("2024-03-03") == 1709424000000
+        assert history._parse_time("2024-03-03T01:00:00+01:00") == 1709424000000
+        assert history._parse_time("1709424000") == history._parse_time(1709424000) == 1709424000000
+        with pytest.raises(ValueError):
+            history._parse_time("March 3rd")
+
+    @pytest.mark.asyncio
+    async def test_price_at_uses_stored_series(self):
+        """A past time covered by the store is answered by binary search; only the current price is fetched."""
+        now_ms = int(time.time() * 1000)
+        self._store_hourly(now_ms)
+        at = (now_ms - 48 * 3_600_000 - 1_000) // 1000
+
+        seen = []
+        with _patch_async_client(_answer({"bitcoin": {"usd": 500.0}}, seen)):
+            result = await history.get_crypto_price_at_async("btc", at)
+
+        assert len(seen) == 1
+        assert "simple/price" in seen[0].url.path
+        assert result["status"] == "success"
+        assert result["timestamp"] == now_ms - 49 * 3_600_000
+        assert result["price_usd"] == 100.0 + (30 * 24 - 50) * 0.5
+        assert result["latest_price_usd"] == 500.0
+        assert result["latest_timestamp"] >= now_ms
+        assert "is_last_known_good" not in result
+
+    @pytest.mark.asyncio
+    async def test_price_at_latest_price_falls_back_when_down(self):
+        """Without CoinGecko the latest price is the newest stored one and the result is tagged with its age."""
+        now_ms = int(time.time() * 1000)
+        self._store_hourly(now_ms - 3 * 86_400_000)
+        at = (now_ms - 10 * 86_400_000) // 1000
+
+        with _patch_async_client(_down), _no_retry_sleep():
+            result = await history.get_crypto_price_at_async("btc", at)
+
+        assert result["status"] == "success"
+        assert result["latest_price_usd"] == 100.0 + (30 * 24 - 1) * 0.5
+        assert result["latest_timestamp"] == now_ms - 3 * 86_400_000
+        assert result["is_last_known_good"] is True
+        assert result["data_age_seconds"] == pytest.approx(3 * 86_400, abs=5)
+
+    @pytest.mark.asyncio
+    async def test_price_at_empty_history_with_price_down(self):
+        """An empty history and a failed price lookup give an error result rather than an exception."""
+        async def handler(request):
+            if "market_chart" in str(request.url):
+                return httpx.Response(200, json={"prices": []})
+            raise httpx.ConnectError("down")
+
+        at = int(time.time()) - 3 * 86_400
+        with _patch_async_client(handler), _no_retry_sleep():
+            result = await history.get_crypto_price_at_async("btc", at)
+            assert await history._latest_price_async("bitcoin", PriceSeries.empty()) is None
+        assert result["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_price_at_validation(self):
+        """Future, too old and malformed times are rejected."""
+        assert (await history.get_crypto_price_at_async("btc", int(time.time()) + 3600))["status"] == "error"
+        assert (await history.get_crypto_price_at_async("btc", "2001-01-01"))["status"] == "error"
+        assert "Invalid date" in (await history.get_crypto_price_at_async("btc", "yesterday"))["error_message"]
+
+    @pytest.mark.asyncio
+    async def test_change_between_past_range(self):
+        """A closed past range is summarised from the store without any request."""
+        now_ms = int(time.time() * 1000)
+        self._store_hourly(now_ms)
+        start, end = (now_ms - 10 * 86_400_000) // 1000, (now_ms - 5 * 86_400_000) // 1000
+
+        seen = []
+        with _patch_async_client(_answer({}, seen)):
+            result = await history.get_crypto_price_change_between_async("btc", start, end)
+
+        assert seen == []
+        assert result["status"] == "success"
+        assert result["report"].startswith("Between ")
+        assert result["price_change_usd"] == pytest.approx(5 * 24 * 0.5, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_change_between_uses_stale_store_during_outage(self):
+        """A range reaching now is served from the stale store, tagged, when CoinGecko is down."""
+        now_ms = int(time.time() * 1000)
+        self._store_hourly(now_ms - 6 * 3_600_000)
+
+        with _patch_async_client(_down), _no_retry_sleep():
+            result = await history.get_crypto_price_change_between_async("btc", (now_ms - 3 * 86_400_000) // 1000)
+
+        assert result["status"] == "success"
+        assert result["is_last_known_good"] is True
+
+
+class TestCorrelations:
+    """Tests for aligning several coins on one grid and correlating their returns."""
+
+    def _walk(self, returns, jitter_ms=0):
+        """Build hourly ``market_chart`` prices following ``returns``, ending now."""
+        end_ms = int(time.time() * 1000)
+        timestamps = end_ms - (len(returns) - np.arange(len(returns) + 1)) * 3_600_000 + jitter_ms
+        return np.column_stack([timestamps, 100.0 * np.exp(np.r_[0.0, np.cumsum(returns)])]).tolist()
+
+    def test_align_takes_last_price_within_one_step(self):
+        """Grid times take the latest earlier point, and gaps longer than a step stay missing."""
+        series = PriceSeries(np.array([0, 3_590_000, 7_300_000, 18_000_000]), np.array([1.0, 2.0, 3.0, 4.0]))
+        grid, matrix = align_series([series], 0, 18_000_000, 3_600_000)
+
+        assert grid.tolist() == [0, 3_600_000, 7_200_000, 10_800_000, 14_400_000, 18_000_000]
+        assert np.array_equal(matrix[0], [1.0, 2.0, np.nan, 3.0, np.nan, 4.0], equal_nan=True)
+
+    def test_correlation_uses_common_complete_steps(self):
+        """Only steps where every row has a return are correlated."""
+        returns = np.array([[0.1, -0.2, 0.3, np.nan, 0.1], [0.2, -0.4, 0.6, 0.5, 0.2]])
+        corr, observations = correlation_matrix(returns)
+
+        assert observations == 4
+        assert corr[0, 1] == pytest.approx(1.0)
+        assert np.isnan(correlation_matrix(log_returns(np.ones((2, 4))))[0][0, 1])
+
+    @pytest.mark.asyncio
+    async def test_correlations_from_histories(self):
+        """Co-moving coins correlate near 1 and opposite coins near -1, on jittered timestamps."""
+        rng = np.random.default_rng(7)
+        returns = rng.normal(0, 0.01, 30 * 24)
+        charts = {
+            "bitcoin": self._walk(returns),
+            "ethereum": self._walk(2 * returns, jitter_ms=-90_000),
+            "solana": self._walk(-returns, jitter_ms=-30_000),
+        }
+
+        def handler(request):
+            return httpx.Response(200, json={"prices": charts[request.url.path.split("/")[-2]]})
+
+        with _patch_async_client(handler):
+            result = await analytics.get_crypto_correlations_async(["btc", "eth", "sol", "bitcoin"], days=30)
+
+        assert result["status"] == "success"
+        assert result["coins"] == ["bitcoin", "ethereum", "solana"]
+        assert result["matrix"][0][1] == pytest.approx(1.0, abs=1e-3)
+        assert result["matrix"][0][2] == pytest.approx(-1.0, abs=1e-3)
+        assert result["observations"] >= 30 * 24 - 2
+        assert "Most correlated: bitcoin and ethereum" in result["report"]
+        assert "and solana (-1.00)" in result["report"]
+        assert result["returns"][1]["volatility_per_hour_percentage"] == pytest.approx(
+            2 * result["returns"][0]["volatility_per_hour_percentage"], rel=1e-3
+        )
+
+    @pytest.mark.asyncio
+    async def test_correlation_validation(self):
+        """Fewer than two distinct coins, unknown coins and bad periods are rejected."""
+        assert (await analytics.get_crypto_correlations_async(["btc", "bitcoin"]))["status"] == "error"
+        assert (await analytics.get_crypto_correlations_async(["btc", "notacoin"]))["status"] == "error"
+        assert (await analytics.get_crypto_correlations_async(["btc", "eth"], days=0))["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_async_correlations_use_stored_history_during_outage(self, monkeypatch):
+        """A coin whose load fails is correlated from its stored history and the result is tagged."""
+        returns = np.random.default_rng(3).normal(0, 0.01, 7 * 24)
+        for crypto_id, chart in (("bitcoin", self._walk(returns)), ("ethereum", self._walk(returns))):
+            timeseries.get_price_store().merge(crypto_id, "hourly", *np.array(chart).T)
+
+        async def fake_history(crypto_id, days, interval):
+            if crypto_id == "ethereum":
+                raise requests.exceptions.ConnectionError("down")
+            return history._stored_history(crypto_id, days, interval)
+
+        monkeypatch.setattr(history, "_load_price_history_async", fake_history)
+        result = await analytics.get_crypto_correlations_async(["btc", "eth"], days=7)
+
+        assert result["status"] == "success"
+        assert result["matrix"][0][1] == pytest.approx(1.0)
+        assert result["is_last_known_good"] is True
+
+
+class TestForecast:
+    """Tests for the Monte Carlo price-band forecasts."""
+
+    def test_fit_recovers_drift_and_volatility(self):
+        """Series of different lengths are fitted together; too short ones get NaN."""
+        returns = np.random.default_rng(1).normal(0.001, 0.02, 5_000)
+        long = 100.0 * np.exp(np.r_[0.0, np.cumsum(returns)])
+        drift, volatility, observations = fit_drift_volatility([long, long[-101:], long[:1]])
+
+        assert drift[0] == pytest.approx(returns.mean())
+        assert volatility[0] == pytest.approx(returns.std(ddof=1))
+        assert observations.tolist() == [5_000, 100, 0]
+        assert np.isnan(drift[2])
+
+    def test_bands_match_lognormal_quantiles(self):
+        """Simulated percentiles match the closed-form GBM quantiles at each horizon."""
+        bands, probability_up = simulate_price_bands(
+            np.array([100.0, 50.0]), np.array([0.0, 0.001]), np.array([0.01, 0.02]),
+            [24, 168], 50_000, np.random.default_rng(2), percentiles=(50, 84.134),
+        )
+
+        assert bands.shape == (2, 2, 2)
+        assert bands[0, 0, 0] == pytest.approx(100.0, rel=2e-3)
+        assert bands[0, 1, 1] == pytest.approx(100.0 * np.exp(0.01 * np.sqrt(168)), rel=5e-3)
+        assert bands[1, 1, 0] == pytest.approx(50.0 * np.exp(0.168), rel=5e-3)
+        assert probability_up[0] == pytest.approx([0.5, 0.5], abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_watchlist_forecast(self):
+        """Every coin with enough history gets bands; short histories and unknown coins get errors."""
+        def handler(request):
+            if "/bitcoin/" in request.url.path:
+                return httpx.Response(200, json={"prices": _hourly_prices(count=30 * 24, step=0.1)})
+            return httpx.Response(200, json={"prices": _hourly_prices(count=24)})
+
+        with _patch_async_client(handler):
+            result = await analytics.forecast_crypto_prices_async(["btc", "eth", "notacoin"], paths=1_000)
+
+        assert result["status"] == "success"
+        btc, eth, unknown = result["results"]
+        assert btc["paths"] == 1_000
+        assert btc["current_price_usd"] == 100.0 + (30 * 24 - 1) * 0.1
+        assert btc["horizons"]["24h"]["p5"] < btc["horizons"]["24h"]["p50"] < btc["horizons"]["24h"]["p95"]
+        assert btc["horizons"]["7d"]["probability_up_percentage"] == 100.0
+        assert eth["status"] == "error" and unknown["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_async_forecast_leaves_the_loop_responsive(self, monkeypatch):
+        """The simulation runs in a worker thread while the event loop keeps serving other tasks."""
+        blocking, watch = _loop_progress_probe()
+        monkeypatch.setattr(analytics, "_load_histories_async", AsyncMock(return_value={}))
+        monkeypatch.setattr(analytics, "_build_forecast_result", blocking)
+
+        result, _ = await asyncio.wait_for(
+            asyncio.gather(analytics.forecast_crypto_prices_async(["btc"], paths=1_000), watch()), timeout=5
+        )
+
+        assert result["loop_progressed"] is True
+
+    @pytest.mark.asyncio
+    async def test_forecast_validation(self):
+        """The number of paths is bounded."""
+        assert (await analytics.forecast_crypto_prices_async(["btc"], paths=10))["status"] == "error"
+        assert (await analytics.forecast_crypto_prices_async(["btc"], paths=1_000_000))["status"] == "error"
+
+
+class TestBacktest:
+    """Tests for replaying the trend-prediction signals over stored history."""
+
+    def test_rolling_indicators_match_live_indicators(self):
+        """Every rolling window scores exactly like the live predictor on that window."""
+        prices = 60_000 * np.exp(np.cumsum(np.random.default_rng(4).normal(0, 0.01, 2_000)))
+        rolling = rolling_trend_indicators(prices)
+        live = compute_trend_indicators(np.lib.stride_tricks.sliding_window_view(prices, 72).copy())
+
+        for name, values in live.items():
+            np.testing.assert_allclose(rolling[name], values, rtol=1e-9, err_msg=name)
+        assert np.array_equal(rolling["prediction"], live["prediction"])
+
+    def test_hit_rates_on_a_steady_rise(self):
+        """A steady rise is called UP every hour and every call is right."""
+        result = backtest_trend_signals(np.linspace(100.0, 200.0, 500), horizon=24)
+
+        assert result["windows"] == 500 - 72 - 24 + 1
+        assert result["predictions"]["up"] == result["windows"]
+        assert result["hit_rate"] == 1.0
+        assert result["signals"]["ma_cross_vote"]["hit_rate"] == 1.0
+        assert backtest_trend_signals(np.ones(90))["windows"] == 0
+
+    @pytest.mark.asyncio
+    async def test_backtest_replays_stored_history_beyond_refresh(self):
+        """Hours older than the refreshed 90 days are replayed from the store, with throughput reported."""
+        now_ms = int(time.time() * 1000)
+        timeseries.get_price_store().merge(
+            "bitcoin", "hourly", *np.array(_hourly_prices(count=200 * 24, end_ms=now_ms - 2 * 3_600_000)).T
+        )
+
+        seen = []
+        with _patch_async_client(_answer({"prices": _hourly_prices(count=3, start=100.0 + 200 * 24 * 0.5)}, seen)):
+            result = await analytics.backtest_crypto_price_trends_async(["btc", "notacoin"], days=365)
+
+        assert [request.url.params["days"] for request in seen] == ["1"]
+
+        assert result["status"] == "success"
+        btc, unknown = result["results"]
+        assert btc["history_points"] == 200 * 24 + 3
+        assert btc["windows"] == btc["history_points"] - 72 - 24 + 1
+        assert btc["hit_rate_percentage"] == 100.0
+        assert set(btc["signals"]) == {"momentum", "ma_cross", "ma_72h", "recent"}
+        assert result["windows_evaluated"] == btc["windows"]
+        assert result["windows_per_second"] > 0
+        assert unknown["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_async_backtest_leaves_the_loop_responsive(self, monkeypatch):
+        """The stored-history reads and the replay run in a worker thread, not on the event loop."""
+        blocking, watch = _loop_progress_probe()
+        monkeypatch.setattr(analytics, "_load_histories_async", AsyncMock(return_value={}))
+        monkeypatch.setattr(analytics, "_build_backtest_result", blocking)
+
+        result, _ = await asyncio.wait_for(asyncio.gather(analytics.backtest_crypto_price_trends_async(["notacoin"]), watch()), timeout=5)
+
+        assert result["loop_progressed"] is True
+
+    @pytest.mark.asyncio
+    async def test_backtest_validation(self):
+        """Periods and horizons are bounded."""
+        assert (await analytics.backtest_crypto_price_trends_async(["btc"], days=400))["status"] == "error"
+        assert (await analytics.backtest_crypto_price_trends_async(["btc"], horizon=0))["status"] == "error"
+
+
+class TestAnomalyDetection:
+    """Tests for the incremental EWMA z-score anomaly detectors."""
+
+    def _detector(self):
+        return EwmaDetector(half_life_ms=24 * 3_600_000, threshold=4.0, warmup=24, min_step_ms=300_000)
+
+    def test_flags_sudden_move_after_warmup(self):
+        """Ordinary moves pass, a jump far outside the usual spread is flagged with its z-score."""
+        detector = self._detector()
+        returns = np.random.default_rng(6).normal(0, 0.005, 100)
+        prices = 100.0 * np.exp(np.cumsum(returns))
+        flagged = [detector.observe(i * 3_600_000, p) for i, p in enumerate(prices.tolist())]
+
+        assert not any(flagged)
+        anomaly = detector.observe(100 * 3_600_000, prices[-1] * 0.92)
+        assert anomaly["change_percentage"] == -8.0
+        assert anomaly["z_score"] < -4
+        assert detector.snapshot(0)["anomalies"] == [anomaly]
+        assert detector.snapshot(101 * 3_600_000)["anomalies"] == []
+
+    def test_warmup_and_tick_spacing(self):
+        """Nothing is flagged before warm-up, and ticks closer than the minimum step are skipped."""
+        detector = self._detector()
+        assert detector.observe(0, 100.0) is None
+        assert detector.observe(3_600_000, 150.0) is None
+        assert detector.observe(3_660_000, 10.0) is None
+        assert detector.observations == 1
+        assert detector.last_price == 150.0
+
+    def test_returns_are_scaled_to_hourly_moves(self):
+        """A 5-minute tick moving as much as a typical hour is not an anomaly after hourly warm-up."""
+        detector = self._detector()
+        prices = 100.0 * np.exp(np.cumsum(np.tile([0.01, -0.01], 50)))
+        for i, p in enumerate(prices.tolist()):
+            detector.observe(i * 3_600_000, p)
+
+        last = 99 * 3_600_000
+        assert detector.observe(last + 300_000, prices[-1] * 1.003) is None
+        assert detector.observe(last + 600_000, prices[-1] * 1.003 * 1.04) is not None
+
+    def test_book_feeds_only_new_store_points(self):
+        """A stored series is fed once; later calls only feed the points appended since."""
+        book = AnomalyBook(half_life_ms=24 * 3_600_000, threshold=4.0)
+        series = PriceSeries(*np.array(_hourly_prices(count=48)).T)
+        assert book.observe_series("bitcoin", series) == 48
+        assert book.observe_series("bitcoin", series) == 0
+        longer = PriceSeries(*np.array(_hourly_prices(count=50, end_ms=series.last_timestamp + 2 * 3_600_000)).T)
+        assert book.observe_series("bitcoin", longer) == 2
+        assert book.stats()["prices_observed"] == 50
+
+    @pytest.mark.asyncio
+    async def test_anomalies_from_history_without_refetch(self):
+        """The week of hourly history is fetched once; the next question reuses the store and detector."""
+        now_ms = int(time.time() * 1000)
+        returns = np.random.default_rng(8).normal(0, 0.005, 168)
+        returns[-3] = 0.07
+        prices = 100.0 * np.exp(np.cumsum(returns))
+        chart = [[now_ms - (167 - i) * 3_600_000, p] for i, p in enumerate(prices.tolist())]
+
+        seen = []
+        with _patch_async_client(_answer({"prices": chart}, seen)):
+            result = await analytics.get_crypto_price_anomalies_async("sol")
+            again = await analytics.get_crypto_price_anomalies_async("sol", hours=1)
+
+        assert len(seen) == 1
+        assert result["status"] == "success"
+        assert [anomaly["timestamp"] for anomaly in result["anomalies"]] == [chart[-3][0]]
+        assert result["anomalies"][0]["direction"] == "up"
+        assert "1 unusual price move for SOL (solana)" in result["report"]
+        assert again["anomalies"] == []
+
+    @pytest.mark.asyncio
+    async def test_feed_prices_reach_detector(self):
+        """Prices published by the streaming feed are observed by the anomaly detectors."""
+        book = AnomalyBook(half_life_ms=24 * 3_600_000, threshold=4.0)
+        feed = PriceFeed(AsyncMock(return_value={"bitcoin": 100.0}), poll_interval=60, on_price=book.observe)
+        feed.subscribe(["bitcoin"])
+        await feed.poll_once()
+        await feed.close()
+
+        assert book.snapshot("bitcoin", 0)["last_price"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_anomaly_validation(self):
+        """Unknown coins and out-of-range windows are rejected."""
+        assert (await analytics.get_crypto_price_anomalies_async("notacoin"))["status"] == "error"
+        assert (await analytics.get_crypto_price_anomalies_async("btc", hours=0))["status"] == "error"
+        assert (await analytics.get_crypto_price_anomalies_async("btc", hours=200))["status"] == "error"
+
+
+class TestPriceAlerts:
+    """Tests for threshold-indexed price alerts."""
+
+    def test_index_pops_only_crossed_thresholds(self):
+        """Crossed alerts are a prefix or suffix of the sorted thresholds."""
+        index = ThresholdIndex()
+        for threshold, alert_id in ((30.0, "c"), (10.0, "a"), (20.0, "b"), (20.0, "b2")):
+            index.add(threshold, alert_id)
+
+        assert index.thresholds == [10.0, 20.0, 20.0, 30.0]
+        assert index.pop_at_or_below(5.0) == []
+        assert index.pop_at_or_below(20.0) == ["a", "b", "b2"]
+        assert index.remove(30.0, "c") and not index.remove(30.0, "c")
+        index.add(15.0, "d")
+        assert index.pop_at_or_above(16.0) == [] and index.pop_at_or_above(15.0) == ["d"]
+        assert not len(index)
+
+    def test_evaluate_triggers_once(self):
+        """Above and below alerts fire when crossed and are then removed."""
+        book = AlertBook()
+        above = book.add("bitcoin", "above", 100.0, 95.0)
+        below = book.add("bitcoin", "below", 90.0, 95.0)
+        book.add("ethereum", "above", 1.0, 0.5)
+
+        assert book.evaluate("bitcoin", 95.0, 1) == []
+        triggered = book.evaluate("bitcoin", 100.0, 2)
+        assert [alert["alert_id"] for alert in triggered] == [above["alert_id"]]
+        assert triggered[0]["triggered_price"] == 100.0
+        assert book.evaluate("bitcoin", 101.0, 3) == []
+        assert [alert["alert_id"] for alert in book.evaluate("bitcoin", 80.0, 4)] == [below["alert_id"]]
+        assert book.stats()["active_alerts"] == 1
+        assert [alert["alert_id"] for alert in book.recently_triggered("bitcoin")] == [below["alert_id"], above["alert_id"]]
+
+    def test_validation_and_capacity(self):
+        """Unknown directions, non-positive thresholds and a full book are rejected."""
+        book = AlertBook(max_alerts=1)
+        with pytest.raises(ValueError):
+            book.add("bitcoin", "sideways", 1.0, 0.5)
+        with pytest.raises(ValueError):
+            book.add("bitcoin", "above", 0.0, 0.5)
+        alert = book.add("bitcoin", "above", 1.0, 0.5)
+        with pytest.raises(ValueError):
+            book.add("bitcoin", "below", 0.25, 0.5)
+        assert book.remove(alert["alert_id"])["alert_id"] == alert["alert_id"]
+        assert book.remove(alert["alert_id"]) is None
+        assert book.stats()["coins"] == 0
+
+    def test_already_satisfied_alerts_are_rejected(self):
+        """An alert on the current side of the price would fire at once, so it is rejected."""
+        book = AlertBook()
+        with pytest.raises(ValueError, match="already at or above"):
+            book.add("bitcoin", "above", 100.0, 100.0)
+        with pytest.raises(ValueError, match="already at or below"):
+            book.add("bitcoin", "below", 110.0, 100.0)
+
+        alert = book.add("bitcoin", "above", 110.0, 100.0)
+        assert alert["price_at_creation"] == 100.0
+        assert book.evaluate("bitcoin", 105.0, 1) == []
+        assert [triggered["alert_id"] for triggered in book.evaluate("bitcoin", 110.0, 2)] == [alert["alert_id"]]
+
+    @pytest.mark.asyncio
+    async def test_create_checks_current_price(self):
+        """Service alerts are checked against the fetched price, or the last-known-good one during an outage."""
+        with _patch_async_client(_answer({"bitcoin": {"usd": 60_000.0}})):
+            rejected = await live.create_price_alert_async("btc", "below", 70_000)
+            created = await live.create_price_alert_async("btc", "below", 50_000)
+        assert rejected["status"] == "error"
+        assert "already at or below" in rejected["error_message"]
+        assert created["alert"]["price_at_creation"] == 60_000.0
+
+        price._price_cache.clear()
+        with _patch_async_client(_down), _no_retry_sleep():
+            assert (await live.create_price_alert_async("btc", "above", 80_000))["alert"]["price_at_creation"] == 60_000.0
+            assert (await live.create_price_alert_async("eth", "above", 5_000))["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_create_list_and_delete(self):
+        """Alerts are registered by coin symbol, listed and deleted through the service functions."""
+        price._price_cache.set("bitcoin", 60_000.0)
+        created = await live.create_price_alert_async("btc", "above", 100_000, note="take profit")
+        assert created["status"] == "success"
+        assert created["alert"]["crypto_id"] == "bitcoin"
+        assert "bitcoin above $100,000.00 (take profit)" in created["report"]
+        assert (await live.create_price_alert_async("notacoin", "above", 1.0))["status"] == "error"
+        assert (await live.create_price_alert_async("btc", "up", 1.0))["status"] == "error"
+
+        assert [alert["alert_id"] for alert in live.get_price_alerts("bitcoin")["active"]] == [created["alert"]["alert_id"]]
+        assert live.get_price_alerts("eth")["active"] == []
+        assert live.delete_price_alert(created["alert"]["alert_id"])["status"] == "success"
+        assert live.delete_price_alert(created["alert"]["alert_id"])["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_triggered_alert_is_not_streamed(self, monkeypatch):
+        """A polled price crossing a threshold triggers the alert without pushing it to the shared stream."""
+        feed = PriceFeed(AsyncMock(return_value={"bitcoin": 101_000.0}), poll_interval=60, on_price=live._on_feed_price)
+        monkeypatch.setattr(live, "_price_feed", feed)
+        price._price_cache.set("bitcoin", 90_000.0)
+        alert = (await live.create_price_alert_async("btc", "above", 100_000))["alert"]
+        await live.create_price_alert_async("btc", "above", 200_000)
+
+        subscription = feed.subscribe(["bitcoin"])
+        try:
+            updates = await asyncio.wait_for(subscription.next_updates(), timeout=1)
+        finally:
+            await feed.close()
+
+        assert [update["crypto_id"] for update in updates] == ["bitcoin"]
+        assert all("alert_id" not in update for update in updates)
+        listed = live.get_price_alerts("btc")
+        assert [triggered["alert_id"] for triggered in listed["triggered"]] == [alert["alert_id"]]
+        assert listed["triggered"][0]["triggered_price"] == 101_000.0
+        assert len(listed["active"]) == 1
+
+
+class TestMarketChartParsing:
+    """Tests for reading only the prices array out of raw market_chart bodies."""
+
+    def test_reads_only_prices(self):
+        """Prices are parsed from the raw body without decoding the other arrays."""
+        payload = {
+            "market_caps": [[1, 9.0e11], [2, 9.1e11]],
+            "prices": [[1700000000000, 42000.5], [1700003600000, 4.21e4]],
+            "total_volumes": [[1, 3.0e10], [2, 3.1e10]],
+        }
+        response = _mock_response(payload)
+        response.json.side_effect = AssertionError("json fallback used")
+
+        series = market_chart_points(response)
+
+        assert series.timestamps.dtype == np.int64
+        assert series.timestamps.tolist() == [1700000000000, 1700003600000]
+        assert series.prices.tolist() == [42000.5, 42100.0]
+
+    def test_whitespace_and_empty_prices(self):
+        """Pretty-printed and empty payloads are handled by the fast path."""
+        response = _mock_response({})
+        response.content = b'{"prices": [ [ 1 , 2.5 ] ,\n [ 3 , 4 ] ] }'
+        assert market_chart_points(response).prices.tolist() == [2.5, 4.0]
+
+        response.content = b'{"prices": [ ], "market_caps": [[1, 2]]}'
+        assert len(market_chart_points(response)) == 0
+
+    def test_irregular_payload_falls_back_to_json(self):
+        """Points the fast path cannot read are decoded with json, skipping missing prices."""
+        payload = {"prices": [[1, 10.0], [2, None], [3, 30.0]]}
+
+        series = market_chart_points(_mock_response(payload))
+
+        assert series.timestamps.tolist() == [1, 3]
+        assert series.prices.tolist() == [10.0, 30.0]
+
+
+class TestTrendIndicators:
+    """Tests for the vectorized trend indicator engine."""
+
+    def test_tail_means(self):
+        """Tail means match explicit slices."""
+        matrix = np.arange(20, dtype=float).reshape(2, 10)
+        means = tail_means(matrix, (1, 3, 10))
+        assert means[1].tolist() == [9.0, 19.0]
+        assert means[3].tolist() == [8.0, 18.0]
+        assert means[10].tolist() == [4.5, 14.5]
+
+    def test_price_matrix_pads_short_series(self):
+        """Short series are right-aligned and left-padded with NaN."""
+        matrix = price_matrix([np.arange(100.0), np.arange(50.0)])
+        assert matrix.shape == (2, 72)
+        assert matrix[0, -1] == 99.0 and matrix[1, -1] == 49.0
+        assert np.isnan(matrix[1, :22]).all()
+        assert not np.isnan(matrix[1, 22:]).any()
+
+    def test_matches_scalar_reference_for_many_coins(self):
+        """The vectorized pass agrees with the per-coin scalar maths."""
+        rng = np.random.default_rng(7)
+        histories = [100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=length))) for length in (168, 168, 60, 48, 100)]
+        current = [None, 120.0, None, 90.0, None]
+
+        indicators = compute_trend_indicators(
+            price_matrix(histories),
+            np.array([np.nan if price is None else price for price in current]),
+        )
+
+        for row, (series, current_price) in enumerate(zip(histories, current)):
+            values = series.tolist()
+            momentum, ma_72h, volatility, bullish, bearish = _reference_indicators(
+                values, current_price if current_price is not None else values[-1]
+            )
+            assert indicators["momentum"][row] == pytest.approx(momentum)
+            assert indicators["ma_72h"][row] == pytest.approx(ma_72h)
+            assert indicators["volatility"][row] == pytest.approx(volatility)
+            assert indicators["bullish_signals"][row] == bullish
+            assert indicators["bearish_signals"][row] == bearish
+            assert indicators["prediction"][row] == np.sign(bullish - bearish)
+
+    def test_steady_uptrend_is_bullish(self):
+        """A steady rise produces an UP prediction with capped confidence."""
+        indicators = compute_trend_indicators(price_matrix([np.linspace(100, 200, 168)]))
+        assert indicators["prediction"][0] == 1
+        assert indicators["bullish_signals"][0] == 4
+        assert indicators["confidence"][0] == pytest.approx(0.8)
+
+
+class TestTrendPredictionBatch:
+    """Tests for scoring a watchlist of trend predictions at once."""
+
+    @pytest.mark.asyncio
+    async def test_batch_prediction_scores_all_coins(self):
+        """Every coin with enough history gets a real prediction."""
+        def handler(request):
+            if request.url.path.endswith("/simple/price"):
+                return httpx.Response(200, json={"bitcoin": {"usd": 300.0}, "ethereum": {"usd": 1.0}})
+            if "/bitcoin/" in request.url.path:
+                return httpx.Response(200, json={"prices": _hourly_prices(step=1.0)})
+            return httpx.Response(200, json={"prices": _hourly_prices(start=200.0, step=-1.0)})
+
+        with _patch_async_client(handler):
+            result = await predict_crypto_price_trends_async(["btc", "eth", "notacoin"])
+
+        assert result["status"] == "success"
+        btc, eth, unknown = result["results"]
+        assert btc["prediction"] == "UP"
+        assert eth["prediction"] == "DOWN"
+        assert "is_mock_data" not in btc and "is_mock_data" not in eth
+        assert unknown["status"] == "error"
+        assert "BTC (bitcoin): UP" in result["report"]
+
+    @pytest.mark.asyncio
+    async def test_async_batch_loads_histories_with_bounded_concurrency(self, monkeypatch):
+        """Histories load concurrently up to the limit, and a failed coin falls back to mock data."""
+        monkeypatch.setattr(history, "TREND_BATCH_CONCURRENCY", 2)
+        active = peak = 0
+
+        async def fake_history(crypto_id, days, interval):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if crypto_id == "solana":
+                raise requests.exceptions.ConnectionError("down")
+            return PriceSeries(*np.array(_hourly_prices(step=1.0)).T)
+
+        async def fake_prices(crypto_ids):
+            return {crypto_id: None for crypto_id in crypto_ids}
+
+        monkeypatch.setattr(history, "_load_price_history_async", fake_history)
+        monkeypatch.setattr(analytics, "_get_cached_prices_async", fake_prices)
+        result = await predict_crypto_price_trends_async(["btc", "eth", "sol", "ada"])
+
+        assert peak == 2
+        btc, eth, sol, ada = result["results"]
+        assert btc["prediction"] == "UP" and "is_mock_data" not in btc
+        assert sol["is_mock_data"] is True
+
+    @pytest.mark.asyncio
+    async def test_batch_prediction_matches_single_prediction(self):
+        """The batch path produces the same result as both single-coin paths."""
+        def fake_get(url, params=None, timeout=None):
+            if url.endswith("/simple/price"):
+                return _mock_response({"solana": {"usd": 150.0}})
+            return _mock_response({"prices": _hourly_prices(start=120.0, step=0.2)})
+
+        with patch.object(client.get_session(), "get", side_effect=fake_get):
+            single = analytics.predict_crypto_price_trend("sol")
+        with _patch_async_client(_answer({"solana": {"usd": 150.0}})):
+            batch = (await predict_crypto_price_trends_async(["sol"]))["results"][0]
+            single_async = await predict_crypto_price_trend_async("sol")
+
+        batch.pop("crypto")
+        single.pop("crypto")
+        single_async.pop("crypto")
+        assert batch == single == single_async
+
+
+class TestLastKnownGood:
+    """Tests for serving stored real data instead of mock data when CoinGecko is down."""
+
+    def test_store_keeps_newest_price(self, tmp_path):
+        """Older writes never replace a newer price, and expired prices are not returned."""
+        store = lastgood.LastKnownGoodStore(str(tmp_path / "prices.sqlite3"))
+        now = time.time()
+        store.record_prices({"bitcoin": 50000.0, "ethereum": None}, fetched_at=now)
+        store.record_prices({"bitcoin": 40000.0}, fetched_at=now - 60)
+        store.record_prices({"solana": 100.0}, fetched_at=now - 3600)
+
+        assert store.get_prices(["bitcoin", "ethereum", "solana"], max_age=600) == {"bitcoin": (50000.0, now)}
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_price_falls_back_to_last_known_good(self):
+        """A failed lookup returns the last fetched price, tagged with its age."""
+        session = client.get_session()
+        with patch.object(session, "get", return_value=_mock_response({"bitcoin": {"usd": 50000.0}})):
+            get_crypto_price("btc")
+        price._price_cache.clear()
+
+        with patch.object(session, "get", side_effect=requests.exceptions.ConnectionError("down")), \
+                patch("crypto_tools.services.client.time.sleep"):
+            result = get_crypto_price("btc")
+        with _patch_async_client(_down), _no_retry_sleep():
+            batch = await get_crypto_prices_async(["btc", "eth"])
+
+        assert result["status"] == "success"
+        assert result["price_usd"] == 50000.0
+        assert result["is_last_known_good"] is True
+        assert result["report"].startswith("[LAST KNOWN GOOD DATA, less than a minute old]")
+        btc, eth = batch["results"]
+        assert btc["is_last_known_good"] is True
+        assert eth["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_async_fallback_reads_off_the_loop(self, monkeypatch):
+        """Async lookups read the last-known-good store in worker threads, never on the event loop thread."""
+        store = lastgood.get_last_good_store()
+        store.record_prices({"bitcoin": 50000.0})
+        get_prices = store.get_prices
+        threads = []
+        monkeypatch.setattr(store, "get_prices", lambda *args: threads.append(threading.get_ident()) or get_prices(*args))
+        down = AsyncMock(side_effect=requests.exceptions.ConnectionError("down"))
+
+        with patch("crypto_tools.services.price._make_request_with_retry_async", down):
+            single = await get_crypto_price_async("btc")
+            batch = await get_crypto_prices_async(["btc", "eth"])
+            alert = await live.create_price_alert_async("btc", "above", 60000.0)
+
+        assert single["price_usd"] == batch["results"][0]["price_usd"] == 50000.0
+        assert alert["alert"]["price_at_creation"] == 50000.0
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+
+    def test_price_error_without_stored_price(self):
+        """Without any stored price the upstream error is still reported."""
+        with patch.object(client.get_session(), "get", side_effect=requests.exceptions.ConnectionError("down")), \
+                patch("crypto_tools.services.client.time.sleep"):
+            result = get_crypto_price("btc")
+
+        assert result["status"] == "error"
+
+    def test_summary_served_from_stored_history(self):
+        """A summary during an outage uses stored history instead of mock data."""
+        end_ms = int(time.time() * 1000) - 2 * 3_600_000
+        timeseries.get_price_store().merge(
+            "ethereum", "hourly", *np.array(_hourly_prices(count=7 * 24 + 2, end_ms=end_ms)).T
+        )
+
+        with patch.object(client.get_session(), "get", side_effect=requests.exceptions.ConnectionError("down")), \
+                patch("crypto_tools.services.client.time.sleep"):
+            summary = history.get_crypto_price_change_summary("eth", 7)
+            trend = analytics.predict_crypto_price_trend("eth")
+
+        assert "is_mock_data" not in summary
+        assert summary["is_last_known_good"] is True
+        assert summary["report"].startswith("[LAST KNOWN GOOD DATA, 2 hours old]")
+        assert summary["final_price_usd"] == 100.0 + (7 * 24 + 1) * 0.5
+        assert trend["is_last_known_good"] is True
+        assert trend["prediction"] == "UP"
+
+    def test_mock_data_used_when_nothing_stored(self):
+        """Mock data remains the last resort when no real data is stored."""
+        with patch.object(client.get_session(), "get", side_effect=requests.exceptions.ConnectionError("down")), \
+                patch("crypto_tools.services.client.time.sleep"):
+            summary = history.get_crypto_price_change_summary("eth", 7)
+
+        assert summary["is_mock_data"] is True
+        assert "is_last_known_good" not in summary